@@ -0,0 +1,148 @@
+"""Бенчмарк програвання журналу (services.ledger) на синтетичних логах.
+
+Запуск:
+
+    python -m benchmarks.bench_ledger          # 5 років
+    python -m benchmarks.bench_ledger 10       # 10 років
+
+Порівнює старий цикл зі strptime на кожну строку (як був у імпорті/експорті),
+потоковий backend, pandas backend і balance_as_of у тимчасовій SQLite
+(без чекпоінтів / з чекпоінтами). Перевіряє, що всі дають однаковий баланс
+(старий цикл рахує наївний час і може розходитись на ночах переходу DST).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import config
+
+
+def _synthetic_logs(years: int, seed: int = 7) -> list[tuple]:
+    """(event_type, timestamp, value, event_ts, event_date), впорядковані за часом."""
+    from database.api.logs import log_time_columns
+
+    rnd = random.Random(seed)
+    rows = []
+
+    def add(event, ts_str, value=None):
+        event_date, event_ts = log_time_columns(ts_str)
+        rows.append((event, ts_str, value, event_ts, event_date))
+
+    # журнал закінчується вчора: завершені періоди можуть мати чекпоінти
+    d = datetime.now(config.KYIV).date() - timedelta(days=365 * years)
+    add("fuel_set", f"{d.isoformat()} 06:00:00", "500")
+    for _ in range(365 * years):
+        ds = d.isoformat()
+        for code, h0 in (("m", 7), ("d", 12), ("e", 17)):
+            if rnd.random() < 0.9:
+                add(f"{code}_start", f"{ds} {h0:02d}:{rnd.randint(0, 29):02d}:00")
+                add(f"{code}_end", f"{ds} {h0 + 3:02d}:{rnd.randint(0, 59):02d}:00")
+        if rnd.random() < 0.1:
+            add("x_start", f"{ds} 22:{rnd.randint(0, 59):02d}:00")
+            nd = (d + timedelta(days=1)).isoformat()
+            add("x_end", f"{nd} 01:{rnd.randint(0, 59):02d}:00")
+        if rnd.random() < 0.4:
+            add("refill", f"{ds} 15:{rnd.randint(0, 59):02d}:00", str(rnd.choice([100, 150, 200])))
+        if d.day == 1 and d.month == 1:
+            add("total_hours_set", f"{ds} 06:30:00", str(rnd.randint(1000, 2000)))
+        d += timedelta(days=1)
+
+    rows.sort(key=lambda r: r[3])
+    return rows
+
+
+def _legacy_replay(rows, rate: float) -> tuple[float, float]:
+    """Старий цикл: strptime на кожну _start/_end строку."""
+    running_fuel = 0.0
+    running_hours = 0.0
+    active_shifts = {}
+    for event, ts_str, value, _, _ in rows:
+        if event == "refill":
+            running_fuel += float(value or 0)
+        elif event == "fuel_set":
+            running_fuel = float(value or 0)
+        elif event.endswith("_start"):
+            active_shifts[event.split("_")[0]] = ts_str
+        elif event.endswith("_end"):
+            shift = event.split("_")[0]
+            if shift in active_shifts:
+                start_ts = datetime.strptime(active_shifts[shift], "%Y-%m-%d %H:%M:%S")
+                end_ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
+                delta = (end_ts - start_ts).total_seconds() / 3600.0
+                running_hours += delta
+                running_fuel -= delta * rate
+                del active_shifts[shift]
+        elif event == "total_hours_set":
+            running_hours = float(value or 0)
+    return running_fuel, running_hours
+
+
+def _timed(fn, repeat: int = 3):
+    best = None
+    res = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn()
+        dt = (time.perf_counter() - t0) * 1000.0
+        best = dt if best is None else min(best, dt)
+    return best, res
+
+
+def main(argv: list[str]):
+    years = int(argv[0]) if argv else 5
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["SQLITE_PATH"] = path
+    config.SQLITE_PATH = path
+
+    from database.models import get_connection, init_db
+    from services.ledger import balance_as_of, replay_periods
+    from services.ledger.balance import _period_or_none
+
+    try:
+        rows = _synthetic_logs(years)
+        rate = float(config.FUEL_CONSUMPTION)
+        engine_rows = [(r[0], r[2], r[3], r[4]) for r in rows]
+        print(f"{years} років, подій: {len(rows)}, витрата {rate} л/год")
+
+        results = {}
+        t, results["legacy"] = _timed(lambda: _legacy_replay(rows, rate))
+        print(f"{'legacy strptime loop':<34} {t:>9.1f} ms")
+        for backend in ("python", "pandas"):
+            t, (bal, closes) = _timed(lambda: replay_periods(engine_rows, None, rate, _period_or_none, backend))
+            results[backend] = (bal.fuel, bal.hours)
+            print(f"{'engine ' + backend + ' (+month closes)':<34} {t:>9.1f} ms  ({len(closes)} періодів)")
+
+        init_db()
+        with get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO logs (event_type, timestamp, user_name, value, event_date, event_ts) VALUES (?,?,?,?,?,?)",
+                [(r[0], r[1], "bench", r[2], r[4], r[3]) for r in rows],
+            )
+
+        t, bal = _timed(lambda: balance_as_of(save=False))
+        print(f"{'balance_as_of, без чекпоінтів':<34} {t:>9.1f} ms")
+        balance_as_of()
+        t, bal = _timed(lambda: balance_as_of())
+        results["balance_as_of"] = (bal.fuel, bal.hours)
+        print(f"{'balance_as_of, з чекпоінтами':<34} {t:>9.1f} ms")
+
+        ref = results["python"]
+        for name, (fuel, hours) in results.items():
+            ok = abs(fuel - ref[0]) < 1e-6 and abs(hours - ref[1]) < 1e-6
+            print(f"  {name:<16} fuel={fuel:.3f} hours={hours:.3f} {'OK' if ok else 'MISMATCH'}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,141 @@
+"""Бенчмарк запитів по logs: LIKE по timestamp vs event_date/event_ts + індекси.
+
+Запуск (тимчасова SQLite, реальна БД не чіпається):
+
+    python -m benchmarks.bench_logs_queries            # 10k, 50k, 100k, 200k подій
+    python -m benchmarks.bench_logs_queries 20000 500000
+
+Для кожного розміру історії друкує середній час (мс) старого і нового варіанту
+запиту. Нові запити мають лишатися ~пласкими при рості історії.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import config
+from database.api.logs import log_time_columns
+
+SIZES = (10_000, 50_000, 100_000, 200_000)
+REPEAT = 50
+
+SCHEMA = """
+CREATE TABLE logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT,
+    timestamp TEXT,
+    user_name TEXT,
+    value TEXT,
+    driver_name TEXT,
+    is_synced INTEGER DEFAULT 0,
+    receipt_number TEXT,
+    event_date TEXT,
+    event_ts INTEGER
+)
+"""
+
+INDEXES = (
+    "CREATE INDEX idx_logs_event_date_type ON logs (event_date, event_type)",
+    "CREATE INDEX idx_logs_event_ts ON logs (event_ts)",
+    "CREATE INDEX idx_logs_unsynced ON logs (id) WHERE is_synced = 0",
+)
+
+# (назва, старий запит, новий запит); параметри: day
+QUERIES = (
+    (
+        "completed_shifts",
+        "SELECT event_type FROM logs WHERE timestamp LIKE ? AND event_type IN ('m_end', 'd_end', 'e_end', 'x_end')",
+        "SELECT event_type FROM logs WHERE event_date = ? AND event_type IN ('m_end', 'd_end', 'e_end', 'x_end')",
+    ),
+    (
+        "refills_for_date",
+        "SELECT timestamp, user_name, value FROM logs WHERE event_type = 'refill' AND timestamp LIKE ? ORDER BY timestamp",
+        "SELECT timestamp, user_name, value FROM logs WHERE event_date = ? AND event_type = 'refill' ORDER BY event_ts, id",
+    ),
+    (
+        "has_logs_for_date",
+        "SELECT 1 FROM logs WHERE timestamp LIKE ? LIMIT 1",
+        "SELECT 1 FROM logs WHERE event_date = ? LIMIT 1",
+    ),
+    (
+        "unsynced",
+        "SELECT * FROM logs WHERE is_synced = 0 ORDER BY id",
+        "SELECT id, event_type, timestamp, user_name, value, driver_name, receipt_number FROM logs WHERE is_synced = 0 ORDER BY id",
+    ),
+)
+
+
+def _gen_rows(n: int):
+    """~8 подій на день: 2 зміни (start/end), заправка, інколи fuel_set."""
+    start = datetime(2020, 1, 1, 7, 30)
+    rows = []
+    day = 0
+    while len(rows) < n:
+        base = start + timedelta(days=day)
+        for ev, minutes in (("m_start", 0), ("m_end", 240), ("d_start", 300), ("d_end", 600), ("refill", 620)):
+            ts = (base + timedelta(minutes=minutes + random.randint(0, 20))).strftime("%Y-%m-%d %H:%M:%S")
+            event_date, event_ts = log_time_columns(ts)
+            value = str(random.randint(20, 80)) if ev == "refill" else None
+            rows.append((ev, ts, "bench", value, None, 1, None, event_date, event_ts))
+        day += 1
+    rows = rows[:n]
+    # останні 20 подій — ще не синхронізовані
+    for i in range(max(0, len(rows) - 20), len(rows)):
+        rows[i] = rows[i][:5] + (0,) + rows[i][6:]
+    return rows
+
+
+def _timed(conn, query: str, params: tuple) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        conn.execute(query, params).fetchall()
+    return (time.perf_counter() - t0) * 1000.0 / REPEAT
+
+
+def run(size: int) -> list[tuple[str, float, float]]:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(path)
+        conn.execute(SCHEMA)
+        rows = _gen_rows(size)
+        conn.executemany(
+            """
+            INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, is_synced, receipt_number, event_date, event_ts)
+            VALUES (?,?,?,?,?,?,?,?,?)
+            """,
+            rows,
+        )
+        for ddl in INDEXES:
+            conn.execute(ddl)
+        conn.commit()
+        conn.execute("ANALYZE")
+
+        day = rows[-1][7]
+        out = []
+        for name, old_q, new_q in QUERIES:
+            old_params = (f"{day}%",) if "?" in old_q else ()
+            new_params = (day,) if "?" in new_q else ()
+            out.append((name, _timed(conn, old_q, old_params), _timed(conn, new_q, new_params)))
+        conn.close()
+        return out
+    finally:
+        os.remove(path)
+
+
+def main(argv: list[str]):
+    sizes = [int(x) for x in argv] or list(SIZES)
+    random.seed(42)
+    print(f"TZ={config.TIMEZONE}, повторів на запит: {REPEAT}")
+    print(f"{'events':>8}  {'query':<18} {'LIKE, ms':>10} {'indexed, ms':>12}")
+    for size in sizes:
+        for name, old_ms, new_ms in run(size):
+            print(f"{size:>8}  {name:<18} {old_ms:>10.3f} {new_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,160 @@
+"""Бенчмарк SQLite-профілю: латентність читань під час конкурентних записів.
+
+Запуск (тимчасова SQLite, реальна БД не чіпається):
+
+    python -m benchmarks.bench_sqlite_profile              # 5 с на профіль
+    python -m benchmarks.bench_sqlite_profile 10           # 10 с на профіль
+
+Порівнює дефолти sqlite3 (rollback journal, synchronous=FULL, без mmap) з профілем
+із config (database.models.sqlite_profile: WAL, NORMAL, mmap, cache, temp_store).
+Писач імітує add_log + CAS старту/стопу зміни; читачі — дашборд (state + завершені
+зміни за сьогодні). Друкує p50/p95/max читання, к-сть записів і "database is locked".
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import config
+from database.api.logs import log_time_columns
+from database.models import _apply_sqlite_profile, sqlite_profile
+
+READERS = 3
+SEED_EVENTS = 20_000
+
+
+def _connect(path: str, profile: dict | None) -> sqlite3.Connection:
+    """profile=None — дефолти sqlite3 без PRAGMA (як було раніше)."""
+    busy_s = (profile or {}).get("busy_timeout_ms", 10_000) / 1000.0
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_s)
+    if profile is not None:
+        _apply_sqlite_profile(conn, profile)
+    return conn
+
+
+def _seed(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE logs (id INTEGER PRIMARY KEY, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT,
+                           driver_name TEXT, receipt_number TEXT, is_synced INTEGER DEFAULT 0,
+                           event_date TEXT, event_ts INTEGER)
+        """
+    )
+    conn.execute("CREATE INDEX idx_logs_event_date_type ON logs (event_date, event_type)")
+    conn.execute("CREATE TABLE generator_state (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        "INSERT INTO generator_state (key, value) VALUES (?, ?)",
+        [("status", "OFF"), ("active_shift", "none"), ("current_fuel", "100.0"), ("total_hours", "0.0")],
+    )
+    rows = []
+    for i in range(SEED_EVENTS):
+        ts = f"2025-{1 + (i // 2000) % 12:02d}-{1 + (i // 100) % 28:02d} 08:{i % 60:02d}:00"
+        event_date, event_ts = log_time_columns(ts)
+        rows.append(("m_end" if i % 2 else "m_start", ts, "bench", event_date, event_ts))
+    conn.executemany(
+        "INSERT INTO logs (event_type, timestamp, user_name, event_date, event_ts) VALUES (?,?,?,?,?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _writer(path: str, profile: dict | None, stop: threading.Event, out: dict):
+    conn = _connect(path, profile)
+    i = 0
+    while not stop.is_set():
+        ts = datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")
+        event_date, event_ts = log_time_columns(ts)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE generator_state SET value = ? WHERE key = 'status'",
+                ("ON" if i % 2 == 0 else "OFF",),
+            )
+            conn.execute(
+                "INSERT INTO logs (event_type, timestamp, user_name, event_date, event_ts) VALUES (?,?,?,?,?)",
+                ("m_start" if i % 2 == 0 else "m_end", ts, "bench", event_date, event_ts),
+            )
+            conn.commit()
+            out["writes"] += 1
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            if "locked" in str(e).lower():
+                out["locked"] += 1
+        i += 1
+    conn.close()
+
+
+def _reader(path: str, profile: dict | None, stop: threading.Event, out: dict):
+    conn = _connect(path, profile)
+    today = datetime.now(config.KYIV).strftime("%Y-%m-%d")
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            conn.execute("SELECT key, value FROM generator_state").fetchall()
+            conn.execute(
+                "SELECT event_type FROM logs WHERE event_date = ? AND event_type IN ('m_end', 'd_end', 'e_end', 'x_end')",
+                (today,),
+            ).fetchall()
+            out["lat"].append((time.perf_counter() - t0) * 1000.0)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e).lower():
+                out["locked"] += 1
+    conn.close()
+
+
+def run(profile: dict | None, seconds: float) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        _seed(path)
+        stop = threading.Event()
+        w_out = {"writes": 0, "locked": 0}
+        r_outs = [{"lat": [], "locked": 0} for _ in range(READERS)]
+        threads = [threading.Thread(target=_writer, args=(path, profile, stop, w_out))]
+        threads += [threading.Thread(target=_reader, args=(path, profile, stop, o)) for o in r_outs]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        lat = sorted(x for o in r_outs for x in o["lat"])
+        return {
+            "reads": len(lat),
+            "p50": statistics.median(lat) if lat else 0.0,
+            "p95": lat[int(len(lat) * 0.95) - 1] if lat else 0.0,
+            "max": lat[-1] if lat else 0.0,
+            "writes": w_out["writes"],
+            "locked": w_out["locked"] + sum(o["locked"] for o in r_outs),
+        }
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+
+def main(argv: list[str]):
+    seconds = float(argv[0]) if argv else 5.0
+    tuned = sqlite_profile()
+    print(f"{READERS} читачі + 1 писач, {seconds:.0f} с на профіль; профіль: {tuned}")
+    print(f"{'profile':<10} {'reads':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'writes':>8} {'locked':>7}")
+    for name, profile in (("default", None), ("tuned", tuned)):
+        r = run(profile, seconds)
+        print(
+            f"{name:<10} {r['reads']:>8} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['max']:>9.3f} "
+            f"{r['writes']:>8} {r['locked']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
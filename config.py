@@ -57,6 +57,69 @@ POSTGRES_DSN = (os.getenv("POSTGRES_DSN", "") or "").strip()
 # Якщо не задано, бот спробує створити БД через звичайний DSN (може не мати прав).
 POSTGRES_ADMIN_DSN = (os.getenv("POSTGRES_ADMIN_DSN", "") or "").strip()
 
+# Пул з'єднань Postgres (для SQLite використовується одне з'єднання на потік)
+try:
+    DB_POOL_MIN_SIZE = max(0, int(os.getenv("DB_POOL_MIN", "1")))
+except Exception:
+    DB_POOL_MIN_SIZE = 1
+
+try:
+    DB_POOL_MAX_SIZE = max(1, int(os.getenv("DB_POOL_MAX", "10")))
+except Exception:
+    DB_POOL_MAX_SIZE = 10
+
+try:
+    DB_POOL_TIMEOUT_SEC = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+except Exception:
+    DB_POOL_TIMEOUT_SEC = 30.0
+
+# Профіль SQLite (застосовується до кожного нового з'єднання)
+SQLITE_JOURNAL_MODE = (os.getenv("SQLITE_JOURNAL_MODE", "WAL") or "WAL").strip().upper()
+SQLITE_SYNCHRONOUS = (os.getenv("SQLITE_SYNCHRONOUS", "NORMAL") or "NORMAL").strip().upper()
+
+try:
+    SQLITE_MMAP_MB = max(0, int(os.getenv("SQLITE_MMAP_MB", "128")))
+except Exception:
+    SQLITE_MMAP_MB = 128
+
+try:
+    SQLITE_CACHE_MB = max(0, int(os.getenv("SQLITE_CACHE_MB", "16")))
+except Exception:
+    SQLITE_CACHE_MB = 16
+
+try:
+    SQLITE_BUSY_TIMEOUT_MS = max(0, int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000")))
+except Exception:
+    SQLITE_BUSY_TIMEOUT_MS = 10000
+
+# Обслуговування SQLite зі scheduler: PRAGMA optimize (год) і WAL checkpoint (хв)
+try:
+    SQLITE_OPTIMIZE_INTERVAL_H = float(os.getenv("SQLITE_OPTIMIZE_INTERVAL_H", "6"))
+except Exception:
+    SQLITE_OPTIMIZE_INTERVAL_H = 6.0
+
+try:
+    SQLITE_CHECKPOINT_INTERVAL_MIN = float(os.getenv("SQLITE_CHECKPOINT_INTERVAL_MIN", "15"))
+except Exception:
+    SQLITE_CHECKPOINT_INTERVAL_MIN = 15.0
+
+# Потоки пулу "db" для async-фасаду database.db_async (хендлери/scheduler)
+try:
+    DB_ASYNC_WORKERS = max(1, int(os.getenv("DB_ASYNC_WORKERS", "4")))
+except Exception:
+    DB_ASYNC_WORKERS = 4
+
+# Кеш read-моделі generator_state (сек). Зміни з цього процесу видно одразу,
+# TTL потрібен лише як страховка від змін іншим процесом.
+try:
+    STATE_CACHE_TTL_SEC = float(os.getenv("STATE_CACHE_TTL", "30"))
+except Exception:
+    STATE_CACHE_TTL_SEC = 30.0
+
+# Компактний стан генератора в одній строці generator_state_v2 (CAS старту/стопу
+# одним UPDATE). Перемикати можна між запусками: дані переносяться автоматично.
+STATE_V2_ENABLED = _env_bool("STATE_V2", False)
+
 # --- REDIS ---
 REDIS_ENABLED = _env_bool("REDIS_ENABLED", False)
 REDIS_URL = (os.getenv("REDIS_URL", "redis://localhost:6379/0") or "").strip()
@@ -76,6 +139,98 @@ SHEET_NAME = os.getenv("SHEET_NAME", "ЛЮТИЙ")
 # Окрема вкладка для журналу подій (крок 4)
 LOGS_SHEET_NAME = os.getenv("LOGS_SHEET_NAME", "ПОДІЇ")
 
+# Кеш Sheets-сесії: скільки секунд тримати spreadsheet/worksheet без повторного запиту метаданих
+try:
+    SHEETS_WS_TTL_SEC = max(0, int(os.getenv("SHEETS_WS_TTL_SEC", "600")))
+except Exception:
+    SHEETS_WS_TTL_SEC = 600
+
+# Індекс дата -> рядок колонки A (utils.sheets_dates): скільки секунд не перечитувати колонку
+try:
+    SHEETS_DATE_INDEX_TTL_SEC = max(0, int(os.getenv("SHEETS_DATE_INDEX_TTL_SEC", "300")))
+except Exception:
+    SHEETS_DATE_INDEX_TTL_SEC = 300
+
+# Експорт вкладки журналу подій: розмір блоку logs.id (один запит на блок, контрольна сума на блок)
+try:
+    EVENTS_EXPORT_CHUNK = max(50, int(os.getenv("EVENTS_EXPORT_CHUNK", "500")))
+except Exception:
+    EVENTS_EXPORT_CHUNK = 500
+
+# Ліміти запитів до Sheets API (квоти Google "на хвилину на користувача") і повтори для 429/5xx
+try:
+    SHEETS_READ_PER_MIN = max(0, int(os.getenv("SHEETS_READ_PER_MIN", "60")))
+except Exception:
+    SHEETS_READ_PER_MIN = 60
+
+try:
+    SHEETS_WRITE_PER_MIN = max(0, int(os.getenv("SHEETS_WRITE_PER_MIN", "60")))
+except Exception:
+    SHEETS_WRITE_PER_MIN = 60
+
+# Запас токенів (запитів підряд без очікування) на бакет; 0 = ліміт/6 (~10 с квоти)
+try:
+    SHEETS_BURST = max(0, int(os.getenv("SHEETS_BURST", "0")))
+except Exception:
+    SHEETS_BURST = 0
+
+try:
+    SHEETS_RETRY_MAX = max(0, int(os.getenv("SHEETS_RETRY_MAX", "5")))
+except Exception:
+    SHEETS_RETRY_MAX = 5
+
+try:
+    SHEETS_RETRY_BASE_SEC = max(0.0, float(os.getenv("SHEETS_RETRY_BASE_SEC", "1")))
+except Exception:
+    SHEETS_RETRY_BASE_SEC = 1.0
+
+# Фоновий синк з Sheets за подіями БД (services.google_sync.sync_worker)
+SHEETS_SYNC_ENABLED = _env_bool("SHEETS_SYNC_ENABLED", True)
+
+try:
+    SHEETS_SYNC_DEBOUNCE_SEC = max(0.0, float(os.getenv("SHEETS_SYNC_DEBOUNCE_SEC", "3")))
+except Exception:
+    SHEETS_SYNC_DEBOUNCE_SEC = 3.0
+
+try:
+    SHEETS_SYNC_MAX_DELAY_SEC = max(0.0, float(os.getenv("SHEETS_SYNC_MAX_DELAY_SEC", "15")))
+except Exception:
+    SHEETS_SYNC_MAX_DELAY_SEC = 15.0
+
+try:
+    SHEETS_SYNC_FALLBACK_SEC = max(0, int(os.getenv("SHEETS_SYNC_FALLBACK_SEC", "900")))
+except Exception:
+    SHEETS_SYNC_FALLBACK_SEC = 900
+
+# Дзеркало основної вкладки в пам'яті (services.google_sync_parts.mirror):
+# дані не старші TTL с; фонове оновлення — лише поки були читання за останні IDLE с
+try:
+    SHEETS_MIRROR_TTL_SEC = max(0, int(os.getenv("SHEETS_MIRROR_TTL_SEC", "30")))
+except Exception:
+    SHEETS_MIRROR_TTL_SEC = 30
+
+try:
+    SHEETS_MIRROR_IDLE_SEC = max(0, int(os.getenv("SHEETS_MIRROR_IDLE_SEC", "600")))
+except Exception:
+    SHEETS_MIRROR_IDLE_SEC = 600
+
+# Пул потоків для gspread (окремо від DB-пулу): потоки (мінімум 2), ліміт черги (0 — без ліміту)
+# і таймаут читань на шляху користувача, сек (0 — без таймауту)
+try:
+    SHEETS_EXECUTOR_WORKERS = max(2, int(os.getenv("SHEETS_EXECUTOR_WORKERS", "3")))
+except Exception:
+    SHEETS_EXECUTOR_WORKERS = 3
+
+try:
+    SHEETS_EXECUTOR_QUEUE = max(0, int(os.getenv("SHEETS_EXECUTOR_QUEUE", "20")))
+except Exception:
+    SHEETS_EXECUTOR_QUEUE = 20
+
+try:
+    SHEETS_EXECUTOR_TIMEOUT_SEC = max(0.0, float(os.getenv("SHEETS_EXECUTOR_TIMEOUT_SEC", "30")))
+except Exception:
+    SHEETS_EXECUTOR_TIMEOUT_SEC = 30.0
+
 # --- ЧАС ТА МІСЦЕ ---
 TIMEZONE = os.getenv("TIMEZONE", "Europe/Kyiv")
 KYIV = pytz.timezone(TIMEZONE)
@@ -124,6 +279,19 @@ try:
 except Exception:
     FUEL_ALERT_COOLDOWN_MIN = 60
 
+# Чекпоінти балансу палива/мотогодин (services.ledger): кінець кожного місяця або дня
+LEDGER_CHECKPOINT_PERIOD = (os.getenv("LEDGER_CHECKPOINT_PERIOD", "month") or "month").strip().lower()
+if LEDGER_CHECKPOINT_PERIOD not in ("month", "day"):
+    LEDGER_CHECKPOINT_PERIOD = "month"
+
+# Backend програвання журналу: auto | python | pandas.
+# auto — pandas лише для довгих хвостів (від LEDGER_VECTOR_MIN_ROWS подій)
+LEDGER_BACKEND = (os.getenv("LEDGER_BACKEND", "auto") or "auto").strip().lower()
+try:
+    LEDGER_VECTOR_MIN_ROWS = max(0, int(os.getenv("LEDGER_VECTOR_MIN_ROWS", "200000")))
+except Exception:
+    LEDGER_VECTOR_MIN_ROWS = 200000
+
 # Нагадування "натисніть СТОП" за N хв до WORK_END_TIME
 try:
     STOP_REMINDER_MIN_BEFORE_END = int(os.getenv("STOP_REMINDER_MIN", "15"))
@@ -139,18 +307,39 @@ if __name__ == "__main__":
     print(f"DB backend: {DB_BACKEND}")
     if DB_BACKEND == "sqlite":
         print(f"SQLite path: {SQLITE_PATH}")
+        print(
+            f"SQLite profile: journal={SQLITE_JOURNAL_MODE}, sync={SQLITE_SYNCHRONOUS}, "
+            f"mmap={SQLITE_MMAP_MB}MB, cache={SQLITE_CACHE_MB}MB, busy={SQLITE_BUSY_TIMEOUT_MS}ms"
+        )
     if DB_BACKEND == "postgres":
         print(f"Postgres DSN: {'(set)' if bool(POSTGRES_DSN) else '(missing)'}")
         print(f"Postgres admin DSN: {'(set)' if bool(POSTGRES_ADMIN_DSN) else '(missing)'}")
+        print(f"Postgres pool: {DB_POOL_MIN_SIZE}..{DB_POOL_MAX_SIZE} (timeout {DB_POOL_TIMEOUT_SEC}s)")
+    print(f"DB async workers: {DB_ASYNC_WORKERS}")
+    print(f"State v2: {STATE_V2_ENABLED}")
     print(f"Redis enabled: {REDIS_ENABLED}")
     print(f"Таблиця: {SHEET_NAME}")
     print(f"ID таблиці: {SHEET_ID}")
     print(f"Вкладка логів: {LOGS_SHEET_NAME}")
+    print(f"TTL кешу вкладок Sheets: {SHEETS_WS_TTL_SEC} с, індексу дат: {SHEETS_DATE_INDEX_TTL_SEC} с")
+    print(f"Блок експорту журналу: {EVENTS_EXPORT_CHUNK} подій")
+    print(
+        f"Ліміти Sheets API: читання {SHEETS_READ_PER_MIN}/хв, записи {SHEETS_WRITE_PER_MIN}/хв, "
+        f"запас {SHEETS_BURST or 'ліміт/6'}, "
+        f"повторів {SHEETS_RETRY_MAX} (база {SHEETS_RETRY_BASE_SEC} с)"
+    )
+    print(
+        f"Фоновий синк: {SHEETS_SYNC_ENABLED} (debounce {SHEETS_SYNC_DEBOUNCE_SEC} с, "
+        f"макс. затримка {SHEETS_SYNC_MAX_DELAY_SEC} с, fallback {SHEETS_SYNC_FALLBACK_SEC} с)"
+    )
+    print(f"Дзеркало вкладки: TTL {SHEETS_MIRROR_TTL_SEC} с, фонове оновлення до {SHEETS_MIRROR_IDLE_SEC} с після читання")
+    print(f"Пул Sheets: {SHEETS_EXECUTOR_WORKERS} потоків, черга до {SHEETS_EXECUTOR_QUEUE}, таймаут читань {SHEETS_EXECUTOR_TIMEOUT_SEC} с")
     print(f"Адміни: {ADMIN_IDS}")
     print(f"Витрата палива: {FUEL_CONSUMPTION} л/год")
     print(f"Ліміт ТО: {MAINTENANCE_LIMIT} год")
     print(f"Поріг алерту палива: {FUEL_ALERT_THRESHOLD_L} л")
     print(f"Cooldown алерту: {FUEL_ALERT_COOLDOWN_MIN} хв")
+    print(f"Чекпоінти балансу: {LEDGER_CHECKPOINT_PERIOD}, backend: {LEDGER_BACKEND} (pandas від {LEDGER_VECTOR_MIN_ROWS})")
     print(f"Нагадування СТОП: за {STOP_REMINDER_MIN_BEFORE_END} хв")
     print(f"Реєстрація: {'Відкрита' if REGISTRATION_OPEN else 'Закрита'}")
     print("=" * 60 + "\n")
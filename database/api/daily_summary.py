@@ -0,0 +1,317 @@
+"""Денний підсумок журналу (daily_summary): одна строка на дату.
+
+Строка дати містить зміни (час і користувачі старту/стопу), заправки (сума,
+чеки, водії), залишок палива на початок і кінець дня, мотогодини на кінець дня
+та відкриті на кінець дня зміни (для коректного підрахунку через північ).
+
+- Оновлюється в тій самій транзакції, що й INSERT у logs (_conn_insert_log):
+  перераховується лише дата події; наступні дні — тільки якщо змінився
+  баланс на кінець дня (back-dated запис).
+- Експорт/брифінг читають O(днів) строк замість O(всіх подій).
+- Після масових змін logs (імпорт, зміна FUEL_RATE) — rebuild_daily_summary()
+  або `python -m database.api.daily_summary rebuild [YYYY-MM-DD]`.
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime
+
+import config
+from database.models import get_connection
+
+SHIFT_CODES = ("m", "d", "e", "x")
+
+_SUMMARY_COLUMNS = (
+    "date, shifts, refill_total, refills, fuel_start, fuel_end, hours_end, open_shifts, events, updated_at"
+)
+
+
+def _fuel_rate() -> float:
+    try:
+        return float(getattr(config, "FUEL_CONSUMPTION", 0.0) or 0.0)
+    except Exception:
+        return 0.0
+
+
+def _to_float(v) -> float:
+    try:
+        return float(v or 0.0)
+    except Exception:
+        return 0.0
+
+
+def empty_carry() -> dict:
+    """Баланс "до першої події": паливо, мотогодини, відкриті зміни {code: [event_ts, timestamp]}."""
+    return {"fuel": 0.0, "hours": 0.0, "open": {}}
+
+
+def fold_day(rows, carry: dict, rate: float | None = None) -> dict:
+    """Згортає події одного дня (впорядковані за event_ts, id) у строку daily_summary.
+
+    rows: (event_type, timestamp, user_name, value, driver_name, receipt_number, event_ts)
+    carry: баланс на кінець попереднього дня (empty_carry() для першого дня).
+
+    Баланс рахує спільний рушій services.ledger (ті самі правила, що в експорті/імпорті).
+    """
+    from services.ledger.engine import Balance, apply_event
+
+    rate = _fuel_rate() if rate is None else float(rate)
+    carried = dict(carry.get("open") or {})
+    bal = Balance(
+        float(carry.get("fuel", 0.0)),
+        float(carry.get("hours", 0.0)),
+        {code: opened[0] for code, opened in carried.items()},
+    )
+    open_ts_str = {code: opened[1] for code, opened in carried.items()}
+
+    shifts = {code: {} for code in SHIFT_CODES}
+    refills = []
+
+    for event, ts_str, user, value, driver, receipt, event_ts in rows:
+        event = str(event or "")
+        apply_event(bal, event, value, event_ts, rate)
+
+        if event.endswith("_start"):
+            code = event.split("_")[0]
+            if code in shifts:
+                shifts[code]["start"] = ts_str
+                shifts[code]["start_user"] = user or ""
+            open_ts_str[code] = ts_str
+
+        elif event.endswith("_end"):
+            code = event.split("_")[0]
+            if code in shifts:
+                shifts[code]["end"] = ts_str
+                shifts[code]["end_user"] = user or ""
+
+        elif event == "refill":
+            refills.append([_to_float(value), driver or "", receipt or ""])
+
+    return {
+        "shifts": shifts,
+        "refill_total": sum(r[0] for r in refills),
+        "refills": refills,
+        "fuel_start": float(carry.get("fuel", 0.0)),
+        "fuel_end": bal.fuel,
+        "hours_end": bal.hours,
+        "open_shifts": {code: [ts, open_ts_str.get(code, "")] for code, ts in bal.open_shifts.items()},
+        "events": bal.events,
+    }
+
+
+def carry_of(summary: dict) -> dict:
+    return {
+        "fuel": float(summary.get("fuel_end", 0.0) or 0.0),
+        "hours": float(summary.get("hours_end", 0.0) or 0.0),
+        "open": dict(summary.get("open_shifts") or {}),
+    }
+
+
+def _row_to_summary(row) -> dict:
+    date_s, shifts, refill_total, refills, fuel_start, fuel_end, hours_end, open_shifts, events, updated_at = row
+    return {
+        "date": date_s,
+        "shifts": json.loads(shifts or "{}"),
+        "refill_total": float(refill_total or 0.0),
+        "refills": json.loads(refills or "[]"),
+        "fuel_start": float(fuel_start or 0.0),
+        "fuel_end": float(fuel_end or 0.0),
+        "hours_end": float(hours_end or 0.0),
+        "open_shifts": json.loads(open_shifts or "{}"),
+        "events": int(events or 0),
+        "updated_at": updated_at or "",
+    }
+
+
+def _summary_params(date_s: str, s: dict, now_s: str) -> tuple:
+    return (
+        date_s,
+        json.dumps(s["shifts"], ensure_ascii=False, sort_keys=True),
+        float(s["refill_total"]),
+        json.dumps(s["refills"], ensure_ascii=False),
+        float(s["fuel_start"]),
+        float(s["fuel_end"]),
+        float(s["hours_end"]),
+        json.dumps(s["open_shifts"], sort_keys=True),
+        int(s["events"]),
+        now_s,
+    )
+
+
+_UPSERT_SQL = f"""
+    INSERT INTO daily_summary ({_SUMMARY_COLUMNS})
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(date) DO UPDATE SET
+        shifts = excluded.shifts,
+        refill_total = excluded.refill_total,
+        refills = excluded.refills,
+        fuel_start = excluded.fuel_start,
+        fuel_end = excluded.fuel_end,
+        hours_end = excluded.hours_end,
+        open_shifts = excluded.open_shifts,
+        events = excluded.events,
+        updated_at = excluded.updated_at
+"""
+
+
+def _now_s() -> str:
+    return datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _conn_day_rows(conn, date_s: str):
+    return conn.execute(
+        """
+        SELECT event_type, timestamp, user_name, value, driver_name, receipt_number, event_ts
+        FROM logs
+        WHERE event_date = ?
+        ORDER BY event_ts IS NULL, event_ts, timestamp, id
+        """,
+        (date_s,),
+    ).fetchall()
+
+
+def _conn_carry_before(conn, date_s: str) -> dict:
+    row = conn.execute(
+        f"SELECT {_SUMMARY_COLUMNS} FROM daily_summary WHERE date < ? ORDER BY date DESC LIMIT 1",
+        (date_s,),
+    ).fetchone()
+    return carry_of(_row_to_summary(row)) if row else empty_carry()
+
+
+def _conn_refresh_daily_summary(conn, date_s: str | None):
+    """Перераховує строку дати date_s (+ каскад на наступні дні, якщо змінився баланс).
+
+    Викликається в межах транзакції запису в logs.
+    """
+    if not date_s:
+        return
+
+    rate = _fuel_rate()
+    now_s = _now_s()
+    carry = _conn_carry_before(conn, date_s)
+
+    # дата події + усі наступні дні, що вже є в summary або в logs
+    later = conn.execute(
+        """
+        SELECT date FROM daily_summary WHERE date > ?
+        UNION
+        SELECT DISTINCT event_date FROM logs WHERE event_date > ?
+        ORDER BY 1
+        """,
+        (date_s, date_s),
+    ).fetchall()
+    dates = [date_s] + [r[0] for r in later if r[0]]
+
+    for d in dates:
+        old = conn.execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM daily_summary WHERE date = ?",
+            (d,),
+        ).fetchone()
+        old_carry = carry_of(_row_to_summary(old)) if old else None
+
+        rows = _conn_day_rows(conn, d)
+        if not rows:
+            conn.execute("DELETE FROM daily_summary WHERE date = ?", (d,))
+            continue
+
+        s = fold_day(rows, carry, rate)
+        conn.execute(_UPSERT_SQL, _summary_params(d, s, now_s))
+        carry = carry_of(s)
+
+        # наступні дні не зміняться, якщо баланс на кінець цього дня той самий
+        if old_carry is not None and old_carry == carry:
+            break
+
+
+def _conn_rebuild_daily_summary(conn, from_date: str | None = None) -> int:
+    """Повний перерахунок daily_summary (від from_date включно). Повертає к-сть днів."""
+    rate = _fuel_rate()
+    now_s = _now_s()
+
+    if from_date:
+        carry = _conn_carry_before(conn, from_date)
+        conn.execute("DELETE FROM daily_summary WHERE date >= ?", (from_date,))
+        rows = conn.execute(
+            """
+            SELECT event_date, event_type, timestamp, user_name, value, driver_name, receipt_number, event_ts
+            FROM logs
+            WHERE event_date >= ?
+            ORDER BY event_date, event_ts IS NULL, event_ts, timestamp, id
+            """,
+            (from_date,),
+        ).fetchall()
+    else:
+        carry = empty_carry()
+        conn.execute("DELETE FROM daily_summary")
+        rows = conn.execute(
+            """
+            SELECT event_date, event_type, timestamp, user_name, value, driver_name, receipt_number, event_ts
+            FROM logs
+            WHERE event_date IS NOT NULL
+            ORDER BY event_date, event_ts IS NULL, event_ts, timestamp, id
+            """
+        ).fetchall()
+
+    params = []
+    day_rows = []
+    cur_date = None
+    for r in rows:
+        if r[0] != cur_date:
+            if day_rows:
+                s = fold_day(day_rows, carry, rate)
+                params.append(_summary_params(cur_date, s, now_s))
+                carry = carry_of(s)
+            cur_date = r[0]
+            day_rows = []
+        day_rows.append(tuple(r[1:]))
+    if day_rows:
+        s = fold_day(day_rows, carry, rate)
+        params.append(_summary_params(cur_date, s, now_s))
+
+    if params:
+        conn.executemany(_UPSERT_SQL, params)
+    return len(params)
+
+
+def rebuild_daily_summary(from_date: str | None = None) -> int:
+    """Backfill/перерахунок daily_summary однією транзакцією."""
+    with get_connection() as conn:
+        n = _conn_rebuild_daily_summary(conn, from_date)
+    logging.info(f"✅ daily_summary перераховано: {n} днів (від {from_date or 'початку'})")
+    return n
+
+
+def get_daily_summaries(from_date: str | None = None, to_date: str | None = None) -> list[dict]:
+    """Строки daily_summary за період (включно), впорядковані за датою."""
+    query = f"SELECT {_SUMMARY_COLUMNS} FROM daily_summary WHERE 1 = 1"
+    params = []
+    if from_date:
+        query += " AND date >= ?"
+        params.append(from_date)
+    if to_date:
+        query += " AND date <= ?"
+        params.append(to_date)
+    query += " ORDER BY date ASC"
+
+    with get_connection() as conn:
+        rows = conn.execute(query, tuple(params)).fetchall()
+    return [_row_to_summary(r) for r in rows]
+
+
+def get_daily_summary(date_s: str) -> dict | None:
+    rows = get_daily_summaries(date_s, date_s)
+    return rows[0] if rows else None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    if not args or args[0] != "rebuild":
+        print("usage: python -m database.api.daily_summary rebuild [YYYY-MM-DD]")
+        sys.exit(2)
+
+    from database.models import init_db
+
+    init_db()
+    rebuild_daily_summary(args[1] if len(args) > 1 else None)
@@ -0,0 +1,94 @@
+"""Стан інкрементального експорту вкладки журналу (events_export_chunk).
+
+logs.id розбиті на блоки по N (config.EVENTS_EXPORT_CHUNK); для кожного блоку
+зберігається контрольна сума рядків, які було записано у вкладку, і найбільший
+logs.id у ньому. Найбільший max_id — high-water mark: далі дописуються лише новіші
+події; звірка (verify) порівнює суми з БД і переписує лише блоки, що відрізняються.
+
+sheet_key = "<SHEET_ID>:<назва вкладки>" — TEST/PROD таблиці мають окремий стан.
+"""
+
+from datetime import datetime
+
+import config
+from database.models import get_connection
+
+
+def get_export_chunks(sheet_key: str) -> dict:
+    """{chunk: {"checksum", "max_id", "rows"}} для вкладки."""
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT chunk, checksum, max_id, rows_count FROM events_export_chunk WHERE sheet_key = ?",
+            (sheet_key,),
+        ).fetchall()
+    return {int(r[0]): {"checksum": r[1], "max_id": int(r[2] or 0), "rows": int(r[3] or 0)} for r in rows}
+
+
+def get_export_high_water_mark(sheet_key: str) -> int:
+    """Найбільший logs.id, уже записаний у вкладку (0 — нічого)."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT MAX(max_id) FROM events_export_chunk WHERE sheet_key = ?",
+            (sheet_key,),
+        ).fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def save_export_chunks(sheet_key: str, chunks: dict):
+    """Зберігає стан блоків {chunk: {"checksum", "max_id", "rows"}}; None — видалити блок."""
+    if not chunks:
+        return
+    now_s = datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")
+    upserts = []
+    deletes = []
+    for chunk, info in chunks.items():
+        if info is None:
+            deletes.append((sheet_key, int(chunk)))
+        else:
+            upserts.append((sheet_key, int(chunk), int(info["max_id"]), int(info["rows"]), info["checksum"], now_s))
+
+    with get_connection() as conn:
+        if deletes:
+            conn.executemany("DELETE FROM events_export_chunk WHERE sheet_key = ? AND chunk = ?", deletes)
+        if upserts:
+            conn.executemany(
+                """
+                INSERT INTO events_export_chunk (sheet_key, chunk, max_id, rows_count, checksum, exported_at)
+                VALUES (?,?,?,?,?,?)
+                ON CONFLICT(sheet_key, chunk) DO UPDATE SET
+                    max_id = excluded.max_id,
+                    rows_count = excluded.rows_count,
+                    checksum = excluded.checksum,
+                    exported_at = excluded.exported_at
+                """,
+                upserts,
+            )
+
+
+def clear_export_chunks(sheet_key: str | None = None):
+    """Скидає стан експорту вкладки (або всіх вкладок) — наступний експорт почнеться з нуля."""
+    with get_connection() as conn:
+        if sheet_key is None:
+            conn.execute("DELETE FROM events_export_chunk")
+        else:
+            conn.execute("DELETE FROM events_export_chunk WHERE sheet_key = ?", (sheet_key,))
+
+
+def get_logs_by_id_range(first_id: int, last_id: int):
+    """(id, event_type, timestamp, user_name, value, driver_name, receipt_number) для id у [first_id, last_id]."""
+    with get_connection() as conn:
+        return conn.execute(
+            """
+            SELECT id, event_type, timestamp, user_name, value, driver_name, receipt_number
+            FROM logs
+            WHERE id BETWEEN ? AND ?
+            ORDER BY id ASC
+            """,
+            (int(first_id), int(last_id)),
+        ).fetchall()
+
+
+def get_logs_max_id() -> int:
+    with get_connection() as conn:
+        row = conn.execute("SELECT MAX(id) FROM logs").fetchone()
+    return int(row[0] or 0) if row else 0
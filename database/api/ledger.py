@@ -0,0 +1,134 @@
+"""Чекпоінти балансу (ledger_checkpoint): паливо, мотогодини і відкриті зміни
+на кінець періоду (місяця або дня, config.LEDGER_CHECKPOINT_PERIOD).
+
+Строка period_end = баланс після всіх подій з event_ts < upto_ts
+(upto_ts — початок наступного періоду). Запит "баланс на момент T"
+(services.ledger.balance_as_of) бере найближчий чекпоінт і програє лише хвіст logs.
+
+Інвалідація: кожен INSERT у logs (_conn_insert_log) видаляє чекпоінти з
+period_end >= дати події — back-dated записи і корекції не лишають застарілих балансів.
+Чекпоінти збережені з іншою витратою палива (FUEL_RATE) не використовуються.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+import config
+from database.models import _is_postgres, begin_transaction, get_connection
+
+# Спільний advisory-lock (Postgres) для запису/інвалідації чекпоінтів
+_PG_LEDGER_LOCK_ID = 7_410_252
+
+_CHECKPOINT_COLUMNS = "period_end, upto_ts, fuel, hours, open_shifts, events, rate"
+
+
+def _conn_lock_ledger(conn):
+    if _is_postgres():
+        conn.execute("SELECT pg_advisory_xact_lock(?)", (_PG_LEDGER_LOCK_ID,))
+
+
+def _conn_invalidate_ledger(conn, event_date: str | None):
+    """Видаляє чекпоінти, які покривають дату event_date (і всі пізніші)."""
+    _conn_lock_ledger(conn)
+    if event_date:
+        conn.execute("DELETE FROM ledger_checkpoint WHERE period_end >= ?", (event_date,))
+    else:
+        conn.execute("DELETE FROM ledger_checkpoint")
+
+
+def _conn_get_checkpoint(conn, cutoff_ts: int | None, rate: float) -> dict | None:
+    """Найпізніший чекпоінт з upto_ts <= cutoff_ts (None = без обмеження) для витрати rate."""
+    if cutoff_ts is None:
+        row = conn.execute(
+            f"""
+            SELECT {_CHECKPOINT_COLUMNS} FROM ledger_checkpoint
+            WHERE rate = ?
+            ORDER BY upto_ts DESC LIMIT 1
+            """,
+            (float(rate),),
+        ).fetchone()
+    else:
+        row = conn.execute(
+            f"""
+            SELECT {_CHECKPOINT_COLUMNS} FROM ledger_checkpoint
+            WHERE upto_ts <= ? AND rate = ?
+            ORDER BY upto_ts DESC LIMIT 1
+            """,
+            (int(cutoff_ts), float(rate)),
+        ).fetchone()
+    if not row:
+        return None
+
+    period_end, upto_ts, fuel, hours, open_shifts, events, rate_v = row
+    try:
+        opened = {str(k): int(v) for k, v in json.loads(open_shifts or "{}").items()}
+    except Exception:
+        opened = {}
+    return {
+        "period_end": period_end,
+        "upto_ts": int(upto_ts),
+        "fuel": float(fuel or 0.0),
+        "hours": float(hours or 0.0),
+        "open_shifts": opened,
+        "events": int(events or 0),
+        "rate": float(rate_v or 0.0),
+    }
+
+
+def _conn_logs_max_id(conn) -> int:
+    row = conn.execute("SELECT MAX(id) FROM logs").fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def save_checkpoints(checkpoints: list[dict], logs_max_id: int) -> int:
+    """Зберігає чекпоінти, якщо з моменту читання (logs_max_id) в logs нічого не додали.
+
+    Повертає к-сть збережених (0 — журнал змінився, чекпоінти вже могли застаріти).
+    """
+    if not checkpoints:
+        return 0
+
+    now_s = datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")
+    params = [
+        (
+            cp["period_end"],
+            int(cp["upto_ts"]),
+            float(cp["fuel"]),
+            float(cp["hours"]),
+            json.dumps(cp["open_shifts"], sort_keys=True),
+            int(cp["events"]),
+            float(cp["rate"]),
+            now_s,
+        )
+        for cp in checkpoints
+    ]
+
+    with get_connection() as conn:
+        begin_transaction(conn)
+        _conn_lock_ledger(conn)
+        if _conn_logs_max_id(conn) != int(logs_max_id):
+            return 0
+        conn.executemany(
+            f"""
+            INSERT INTO ledger_checkpoint ({_CHECKPOINT_COLUMNS}, created_at)
+            VALUES (?,?,?,?,?,?,?,?)
+            ON CONFLICT(period_end) DO UPDATE SET
+                upto_ts = excluded.upto_ts,
+                fuel = excluded.fuel,
+                hours = excluded.hours,
+                open_shifts = excluded.open_shifts,
+                events = excluded.events,
+                rate = excluded.rate,
+                created_at = excluded.created_at
+            """,
+            params,
+        )
+    return len(params)
+
+
+def clear_ledger_checkpoints():
+    """Видаляє всі чекпоінти (наприклад, після зміни FUEL_RATE або ручних правок logs)."""
+    with get_connection() as conn:
+        _conn_invalidate_ledger(conn, None)
+    logging.info("🧹 Чекпоінти балансу очищено")
@@ -2,15 +2,58 @@ import logging
 from datetime import datetime
 
 import config
-from database.models import get_connection, begin_transaction
+from database.models import get_connection, begin_transaction, notify_change, on_commit
+from database.api.daily_summary import _conn_refresh_daily_summary
+from database.api.ledger import _conn_invalidate_ledger
 from database.api.state import _conn_get_state_float, _conn_get_state_value, _conn_set_state_value
+from database.api.state_repo import cache_apply
+from database.api.state_v2 import _conn_try_start_v2, _conn_try_stop_v2, state_v2_enabled
+
+
+def log_time_columns(ts: str | None) -> tuple[str | None, int | None]:
+    """Типізовані колонки часу для logs: (event_date 'YYYY-MM-DD', event_ts epoch-секунди).
+
+    logs.timestamp — локальний час config.KYIV у форматі 'YYYY-MM-DD HH:MM:SS'.
+    """
+    s = (ts or "").strip()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            dt = datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        return dt.strftime("%Y-%m-%d"), int(config.KYIV.localize(dt).timestamp())
+    # Неповний час: дату все одно беремо з префікса (як раніше робив LIKE 'YYYY-MM-DD%')
+    return (s[:10] or None), None
+
+
+def _conn_insert_log(conn, event, ts: str, user, val=None, driver=None, receipt=None, summary: bool = True):
+    """INSERT у logs в межах вже відкритого conn/транзакції (з event_date/event_ts).
+
+    Чекпоінти балансу з period_end >= дати події інвалідуються (back-dated записи).
+    summary=True — в тій самій транзакції оновлює daily_summary дати події.
+    Масові вставки (імпорт) передають False і роблять rebuild_daily_summary() в кінці.
+    Після коміту будить фоновий синк (database.models.notify_change).
+    """
+    event_date, event_ts = log_time_columns(ts)
+    cur = conn.execute(
+        """
+        INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number, event_date, event_ts)
+        VALUES (?,?,?,?,?,?,?,?)
+        """,
+        (event, ts, user, val, driver, receipt, event_date, event_ts),
+    )
+    _conn_invalidate_ledger(conn, event_date)
+    if summary:
+        _conn_refresh_daily_summary(conn, event_date)
+    notify_change(conn, "logs")
+    return cur
 
 
 def get_today_completed_shifts():
     date_str = datetime.now(config.KYIV).strftime("%Y-%m-%d")
     with get_connection() as conn:
-        query = "SELECT event_type FROM logs WHERE timestamp LIKE ? AND event_type IN ('m_end', 'd_end', 'e_end', 'x_end')"
-        rows = conn.execute(query, (f"{date_str}%",)).fetchall()
+        query = "SELECT event_type FROM logs WHERE event_date = ? AND event_type IN ('m_end', 'd_end', 'e_end', 'x_end')"
+        rows = conn.execute(query, (date_str,)).fetchall()
 
     completed = set()
     for r in rows:
@@ -44,10 +87,7 @@ def add_log(event, user, val=None, driver=None, receipt=None, ts: str | None = N
     """Додає подію в журнал. Тепер підтримує receipt_number."""
     ts_val = ts or datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")
     with get_connection() as conn:
-        conn.execute(
-            "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-            (event, ts_val, user, val, driver, receipt),
-        )
+        _conn_insert_log(conn, event, ts_val, user, val, driver, receipt)
 
 
 def try_start_shift(event_type: str, user_name: str, dt: datetime) -> dict:
@@ -57,6 +97,17 @@ def try_start_shift(event_type: str, user_name: str, dt: datetime) -> dict:
         try:
             begin_transaction(conn)
 
+            if state_v2_enabled():
+                # один CAS-UPDATE строки v2 + INSERT у logs
+                event_date, event_ts = log_time_columns(ts)
+                refused = _conn_try_start_v2(conn, event_type, dt.strftime("%H:%M"), event_date, event_ts)
+                if refused:
+                    conn.commit()
+                    return refused
+                _conn_insert_log(conn, event_type, ts, user_name)
+                conn.commit()
+                return {"ok": True, "ts": ts}
+
             # self-heal мінімальних ключів, якщо state частково відсутній
             _conn_set_state_value(conn, "status", _conn_get_state_value(conn, "status", "OFF") or "OFF")
             _conn_set_state_value(conn, "active_shift", _conn_get_state_value(conn, "active_shift", "none") or "none")
@@ -72,14 +123,13 @@ def try_start_shift(event_type: str, user_name: str, dt: datetime) -> dict:
                 conn.commit()
                 return {"ok": False, "reason": "already_on", "active_shift": active, "start_time": st_time}
 
+            on_commit(conn, lambda: cache_apply("status", "ON"))
+
             _conn_set_state_value(conn, "active_shift", event_type)
             _conn_set_state_value(conn, "last_start_time", dt.strftime("%H:%M"))
             _conn_set_state_value(conn, "last_start_date", dt.strftime("%Y-%m-%d"))
 
-            conn.execute(
-                "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-                (event_type, ts, user_name, None, None, None),
-            )
+            _conn_insert_log(conn, event_type, ts, user_name)
 
             conn.commit()
             return {"ok": True, "ts": ts}
@@ -102,6 +152,15 @@ def try_stop_shift(end_event_type: str, user_name: str, dt: datetime) -> dict:
         try:
             begin_transaction(conn)
 
+            if state_v2_enabled():
+                refused = _conn_try_stop_v2(conn, expected_start)
+                if refused:
+                    conn.commit()
+                    return refused
+                _conn_insert_log(conn, end_event_type, ts, user_name)
+                conn.commit()
+                return {"ok": True, "ts": ts}
+
             # self-heal мінімальних ключів
             _conn_set_state_value(conn, "status", _conn_get_state_value(conn, "status", "OFF") or "OFF")
             _conn_set_state_value(conn, "active_shift", _conn_get_state_value(conn, "active_shift", "none") or "none")
@@ -119,10 +178,7 @@ def try_stop_shift(end_event_type: str, user_name: str, dt: datetime) -> dict:
             _conn_set_state_value(conn, "status", "OFF")
             _conn_set_state_value(conn, "active_shift", "none")
 
-            conn.execute(
-                "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-                (end_event_type, ts, user_name, None, None, None),
-            )
+            _conn_insert_log(conn, end_event_type, ts, user_name)
 
             conn.commit()
             return {"ok": True, "ts": ts}
@@ -137,8 +193,16 @@ def try_stop_shift(end_event_type: str, user_name: str, dt: datetime) -> dict:
 
 
 def get_unsynced():
+    """(id, event_type, timestamp, user_name, value, driver_name, receipt_number) — по частковому індексу."""
     with get_connection() as conn:
-        return conn.execute("SELECT * FROM logs WHERE is_synced = 0 ORDER BY id ASC").fetchall()
+        return conn.execute(
+            """
+            SELECT id, event_type, timestamp, user_name, value, driver_name, receipt_number
+            FROM logs
+            WHERE is_synced = 0
+            ORDER BY id ASC
+            """
+        ).fetchall()
 
 
 def mark_synced(ids):
@@ -161,13 +225,10 @@ def get_logs_for_period(start_date, end_date):
         query = """
             SELECT event_type, timestamp, user_name, value, driver_name, receipt_number
             FROM logs
-            WHERE timestamp >= ? AND timestamp <= ?
-            ORDER BY timestamp ASC
+            WHERE event_date >= ? AND event_date <= ?
+            ORDER BY event_ts IS NULL, event_ts, timestamp, id
         """
-        return conn.execute(
-            query,
-            (start_date + " 00:00:00", end_date + " 23:59:59"),
-        ).fetchall()
+        return conn.execute(query, (start_date, end_date)).fetchall()
 
 
 def get_refills_for_date(date_str: str):
@@ -178,7 +239,7 @@ def get_refills_for_date(date_str: str):
         query = """
             SELECT timestamp, user_name, value, driver_name, receipt_number
             FROM logs
-            WHERE event_type = 'refill' AND timestamp LIKE ?
-            ORDER BY timestamp ASC
+            WHERE event_date = ? AND event_type = 'refill'
+            ORDER BY event_ts IS NULL, event_ts, timestamp, id
         """
-        return conn.execute(query, (f"{date_str}%",)).fetchall()
+        return conn.execute(query, (date_str,)).fetchall()
@@ -1,4 +1,4 @@
-from database.models import get_connection
+from database.models import get_connection, notify_change
 
 
 def toggle_schedule(date_str, hour):
@@ -21,6 +21,7 @@ def toggle_schedule(date_str, hour):
                 """,
                 (date_str, hour),
             )
+        notify_change(conn, "schedule")
     return new_val
 
 
@@ -35,6 +36,7 @@ def set_schedule_range(date_str, start_h, end_h):
                     """,
                     (date_str, h),
                 )
+        notify_change(conn, "schedule")
 
 
 def get_schedule(date_str):
@@ -1,7 +1,9 @@
 import time
 
 import config
-from database.models import get_connection
+from database.models import get_connection, on_commit
+from database.api.state_repo import cache_apply, get_state_snapshot
+from database.api.state_v2 import _conn_v2_get, _conn_v2_set, is_v2_key
 
 _OFFLINE_THRESHOLD_SECONDS = 24 * 60 * 60
 
@@ -9,29 +11,45 @@ _OFFLINE_THRESHOLD_SECONDS = 24 * 60 * 60
 def set_state(key, value):
     """Безпечний set для generator_state (upsert)."""
     with get_connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO generator_state (key, value) VALUES (?, ?)
-            ON CONFLICT(key) DO UPDATE SET value = excluded.value
-            """,
-            (str(key), str(value)),
-        )
+        _conn_upsert_state(conn, key, value)
 
 
-def get_state_value(key: str, default=None):
+def set_states(values: dict):
+    """Кілька ключів generator_state однією транзакцією."""
+    if not values:
+        return
     with get_connection() as conn:
-        row = conn.execute(
-            "SELECT value FROM generator_state WHERE key = ?",
-            (str(key),),
-        ).fetchone()
-        if not row or row[0] is None:
-            return default
-        return row[0]
+        for k, v in values.items():
+            _conn_upsert_state(conn, k, v)
+
+
+def get_state_value(key: str, default=None):
+    """Значення ключа generator_state (з кешу read-моделі)."""
+    return get_state_snapshot().value(str(key), default)
+
+
+def _conn_upsert_state(conn, key, value):
+    if is_v2_key(key):
+        _conn_v2_set(conn, key, value)
+        return
+
+    k, v = str(key), str(value)
+    conn.execute(
+        """
+        INSERT INTO generator_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        (k, v),
+    )
+    on_commit(conn, lambda: cache_apply(k, v))
 
 
 def _conn_get_state_value(conn, key: str, default: str = "") -> str:
     """Читання generator_state в межах вже відкритого conn/транзакції."""
     try:
+        if is_v2_key(key):
+            return _conn_v2_get(conn, key, default)
+
         row = conn.execute(
             "SELECT value FROM generator_state WHERE key = ?",
             (str(key),),
@@ -46,13 +64,7 @@ def _conn_get_state_value(conn, key: str, default: str = "") -> str:
 def _conn_set_state_value(conn, key: str, value: str):
     """Upsert generator_state в межах вже відкритого conn/транзакції."""
     try:
-        conn.execute(
-            """
-            INSERT INTO generator_state (key, value) VALUES (?, ?)
-            ON CONFLICT(key) DO UPDATE SET value = excluded.value
-            """,
-            (str(key), str(value)),
-        )
+        _conn_upsert_state(conn, key, value)
     except Exception:
         # не валимо критичні операції, якщо state тимчасово битий
         pass
@@ -81,12 +93,20 @@ def sheet_mark_ok(ts: int | None = None):
     """
     now_ts = int(ts or time.time())
     try:
-        set_state("sheet_last_ok_ts", str(now_ts))
-        if sheet_is_forced_offline():
-            return
-        set_state("sheet_first_fail_ts", "")
-        set_state("sheet_offline", "0")
-        set_state("sheet_offline_since_ts", "")
+        values = {"sheet_last_ok_ts": str(now_ts)}
+        if not sheet_is_forced_offline():
+            values.update(
+                {
+                    "sheet_first_fail_ts": "",
+                    "sheet_offline": "0",
+                    "sheet_offline_since_ts": "",
+                }
+            )
+
+        # пишемо тільки те, що реально змінилось (типовий випадок — лише sheet_last_ok_ts)
+        snap = get_state_snapshot()
+        changed = {k: v for k, v in values.items() if str(snap.value(k, "") or "") != v}
+        set_states(changed)
     except Exception:
         pass
 
@@ -106,15 +126,16 @@ def sheet_force_offline(ts: int | None = None):
     """Примусово вмикає offline-режим (адмінська дія)."""
     now_ts = int(ts or time.time())
     try:
-        set_state("sheet_offline_forced", "1")
+        values = {"sheet_offline_forced": "1"}
 
         # якщо перша помилка ще не зафіксована — ставимо, щоб було видно в адмінці
         first = str(get_state_value("sheet_first_fail_ts", "") or "").strip()
         if not first:
-            set_state("sheet_first_fail_ts", str(now_ts))
+            values["sheet_first_fail_ts"] = str(now_ts)
 
-        set_state("sheet_offline", "1")
-        set_state("sheet_offline_since_ts", str(now_ts))
+        values["sheet_offline"] = "1"
+        values["sheet_offline_since_ts"] = str(now_ts)
+        set_states(values)
     except Exception:
         pass
 
@@ -125,10 +146,14 @@ def sheet_force_online(ts: int | None = None):
     ВАЖЛИВО: ми не ставимо sheet_last_ok_ts, бо це не гарантує доступність Sheets.
     """
     try:
-        set_state("sheet_offline_forced", "0")
-        set_state("sheet_offline", "0")
-        set_state("sheet_offline_since_ts", "")
-        set_state("sheet_first_fail_ts", "")
+        set_states(
+            {
+                "sheet_offline_forced": "0",
+                "sheet_offline": "0",
+                "sheet_offline_since_ts": "",
+                "sheet_first_fail_ts": "",
+            }
+        )
     except Exception:
         pass
 
@@ -148,8 +173,7 @@ def sheet_check_offline(threshold_seconds: int = _OFFLINE_THRESHOLD_SECONDS) ->
 
         first_ts = int(float(first))
         if (time.time() - first_ts) >= int(threshold_seconds):
-            set_state("sheet_offline", "1")
-            set_state("sheet_offline_since_ts", str(int(time.time())))
+            set_states({"sheet_offline": "1", "sheet_offline_since_ts": str(int(time.time()))})
             return True
 
         return False
@@ -167,31 +191,6 @@ def get_state():
 
     Робимо максимально "невбивно": якщо якихось ключів немає/БД частково зламана —
     повертаємо дефолти замість падіння IndexError/TypeError.
+    Дані беруться з кешованого snapshot (один SELECT на всі ключі при промаху).
     """
-    with get_connection() as conn:
-        def _get(k: str, default: str = "") -> str:
-            return _conn_get_state_value(conn, k, default)
-
-        status = _get("status", "OFF")
-        start_time = _get("last_start_time", "")
-        start_date = _get("last_start_date", "")
-        active_shift = _get("active_shift", "none")
-
-        def _get_f(k: str, default: float = 0.0) -> float:
-            return _conn_get_state_float(conn, k, default)
-
-        total = _get_f("total_hours", 0.0)
-        last_oil = _get_f("last_oil_change", 0.0)
-        last_spark = _get_f("last_spark_change", 0.0)
-        fuel = _get_f("current_fuel", 0.0)
-
-        return {
-            "status": status,
-            "start_time": start_time,
-            "start_date": start_date,
-            "total_hours": total,
-            "last_oil": last_oil,
-            "last_spark": last_spark,
-            "current_fuel": fuel,
-            "active_shift": active_shift,
-        }
+    return get_state_snapshot().as_dict()
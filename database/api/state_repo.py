@@ -0,0 +1,162 @@
+"""Read model для generator_state.
+
+Всі ключі читаються одним запитом у типізований snapshot, який тримається
+в in-process кеші:
+- set_state / _conn_set_state_value оновлюють кеш (write-through) після коміту;
+- "сирі" UPDATE по generator_state мають викликати invalidate_state_cache();
+- TTL — страховка від змін іншим процесом.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+import config
+from database.models import get_connection
+
+_STATE_CACHE_TTL_SECONDS = float(getattr(config, "STATE_CACHE_TTL_SEC", 30.0) or 0.0)
+
+
+def _to_float(v, default: float = 0.0) -> float:
+    try:
+        return float(v or 0.0)
+    except Exception:
+        return float(default)
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Типізований знімок generator_state (raw — всі ключі як у таблиці)."""
+
+    status: str = "OFF"
+    active_shift: str = "none"
+    start_time: str = ""
+    start_date: str = ""
+    total_hours: float = 0.0
+    last_oil: float = 0.0
+    last_spark: float = 0.0
+    current_fuel: float = 0.0
+    raw: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "StateSnapshot":
+        def _s(k: str, default: str = "") -> str:
+            v = raw.get(k)
+            return default if v is None else str(v)
+
+        return cls(
+            status=_s("status", "OFF"),
+            active_shift=_s("active_shift", "none"),
+            start_time=_s("last_start_time", ""),
+            start_date=_s("last_start_date", ""),
+            total_hours=_to_float(raw.get("total_hours", 0.0)),
+            last_oil=_to_float(raw.get("last_oil_change", 0.0)),
+            last_spark=_to_float(raw.get("last_spark_change", 0.0)),
+            current_fuel=_to_float(raw.get("current_fuel", 0.0)),
+            raw=dict(raw),
+        )
+
+    def value(self, key: str, default=None):
+        v = self.raw.get(str(key))
+        return default if v is None else v
+
+    def as_dict(self) -> dict:
+        """Історичний контракт get_state()."""
+        return {
+            "status": self.status,
+            "start_time": self.start_time,
+            "start_date": self.start_date,
+            "total_hours": self.total_hours,
+            "last_oil": self.last_oil,
+            "last_spark": self.last_spark,
+            "current_fuel": self.current_fuel,
+            "active_shift": self.active_shift,
+        }
+
+
+class _StateCache:
+    def __init__(self, ttl_seconds: float):
+        self._lock = threading.Lock()
+        self._ttl = float(ttl_seconds)
+        self._snapshot: StateSnapshot | None = None
+        self._loaded_at = 0.0
+        # generation росте на кожну зміну, щоб "запізніле" завантаження не перезаписало свіжі дані
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self) -> StateSnapshot:
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and (self._ttl <= 0 or (time.monotonic() - self._loaded_at) < self._ttl):
+                self.hits += 1
+                return snap
+            self.misses += 1
+            gen = self._generation
+
+        snap = StateSnapshot.from_raw(_load_all())
+
+        with self._lock:
+            if self._generation == gen:
+                self._snapshot = snap
+                self._loaded_at = time.monotonic()
+        return snap
+
+    def apply(self, key: str, value: str):
+        """Write-through: підставляє закомічене значення в поточний snapshot."""
+        with self._lock:
+            self._generation += 1
+            snap = self._snapshot
+            if snap is None:
+                return
+            raw = dict(snap.raw)
+            raw[str(key)] = str(value)
+            self._snapshot = StateSnapshot.from_raw(raw)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = (time.monotonic() - self._loaded_at) if self._snapshot is not None else None
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "age_sec": age,
+            }
+
+
+_STATE_CACHE = _StateCache(_STATE_CACHE_TTL_SECONDS)
+
+
+def _load_all() -> dict:
+    from database.api.state_v2 import load_v2_overlay
+
+    with get_connection() as conn:
+        rows = conn.execute("SELECT key, value FROM generator_state").fetchall()
+    raw = {str(k): v for k, v in rows if k is not None}
+    # STATE_V2=1: типізована строка generator_state_v2 — джерело правди для своїх ключів
+    raw.update(load_v2_overlay())
+    return raw
+
+
+def get_state_snapshot() -> StateSnapshot:
+    """Поточний стан (з кешу; при промаху — один SELECT по всій таблиці)."""
+    return _STATE_CACHE.get()
+
+
+def cache_apply(key: str, value: str):
+    _STATE_CACHE.apply(key, value)
+
+
+def invalidate_state_cache():
+    _STATE_CACHE.invalidate()
+
+
+def state_cache_stats() -> dict:
+    return _STATE_CACHE.stats()
@@ -0,0 +1,281 @@
+"""Компактний стан генератора: одна строка generator_state_v2 (опційно, STATE_V2=1).
+
+Замість key/value — типізовані колонки + лічильник version (росте на кожну зміну).
+Коли режим увімкнено:
+- ключі з _V2_COLUMNS читаються/пишуться в generator_state_v2 (решта — як і раніше в generator_state);
+- старт/стоп зміни = один CAS-UPDATE цієї строки + один INSERT у logs;
+- get_state()/StateSnapshot бачать значення з v2 (overlay поверх key/value).
+
+Перемикання режиму безпечне: на старті sync_storage_mode() переносить значення
+key/value -> v2 (або назад) і запам'ятовує режим у ключі state_v2_active.
+"""
+
+import logging
+
+import config
+from database.models import get_connection, on_commit
+
+# ключ generator_state -> колонка generator_state_v2
+_V2_COLUMNS = {
+    "status": "status",
+    "active_shift": "active_shift",
+    "last_start_time": "start_time",
+    "last_start_date": "start_date",
+    "current_fuel": "fuel",
+    "total_hours": "hours",
+}
+_V2_FLOAT_COLUMNS = ("fuel", "hours")
+_V2_DEFAULTS = {
+    "status": "OFF",
+    "active_shift": "none",
+    "last_start_time": "",
+    "last_start_date": "",
+    "current_fuel": "0.0",
+    "total_hours": "0.0",
+}
+
+_MODE_MARKER_KEY = "state_v2_active"
+
+
+def state_v2_enabled() -> bool:
+    return bool(getattr(config, "STATE_V2_ENABLED", False))
+
+
+def is_v2_key(key: str) -> bool:
+    return state_v2_enabled() and str(key) in _V2_COLUMNS
+
+
+def _as_text(column: str, v) -> str:
+    if v is None:
+        return ""
+    if column in _V2_FLOAT_COLUMNS:
+        try:
+            return str(float(v))
+        except Exception:
+            return "0.0"
+    return str(v)
+
+
+def _as_column_value(column: str, value):
+    if column in _V2_FLOAT_COLUMNS:
+        try:
+            return float(value or 0.0)
+        except Exception:
+            return 0.0
+    return "" if value is None else str(value)
+
+
+def _start_ts(start_date: str, start_time: str) -> int | None:
+    from database.api.logs import log_time_columns
+
+    if not start_date or not start_time:
+        return None
+    return log_time_columns(f"{start_date} {start_time}")[1]
+
+
+def _conn_ensure_row(conn):
+    conn.execute("INSERT INTO generator_state_v2 (id) VALUES (1) ON CONFLICT(id) DO NOTHING")
+
+
+def _conn_v2_row(conn) -> dict | None:
+    """Строка v2 у вигляді {ключ generator_state: str}."""
+    row = conn.execute(
+        """
+        SELECT status, active_shift, start_time, start_date, fuel, hours, version
+        FROM generator_state_v2
+        WHERE id = 1
+        """
+    ).fetchone()
+    if not row:
+        return None
+    status, active_shift, start_time, start_date, fuel, hours, version = row
+    return {
+        "status": _as_text("status", status) or "OFF",
+        "active_shift": _as_text("active_shift", active_shift) or "none",
+        "last_start_time": _as_text("start_time", start_time),
+        "last_start_date": _as_text("start_date", start_date),
+        "current_fuel": _as_text("fuel", fuel),
+        "total_hours": _as_text("hours", hours),
+        "state_version": str(int(version or 0)),
+    }
+
+
+def _conn_v2_get(conn, key: str, default: str = "") -> str:
+    row = _conn_v2_row(conn)
+    if row is None:
+        return default
+    v = row.get(str(key))
+    return default if v is None else v
+
+
+def _conn_v2_set(conn, key: str, value):
+    """UPDATE однієї колонки v2 (version + 1); кеш оновлюється після коміту."""
+    from database.api.state_repo import cache_apply
+
+    k = str(key)
+    column = _V2_COLUMNS[k]
+    col_value = _as_column_value(column, value)
+    # start_ts ставить лише CAS старту; ручна зміна часу/дати старту його скидає
+    extra = ", start_ts = NULL" if column in ("start_time", "start_date") else ""
+    sql = f"UPDATE generator_state_v2 SET {column} = ?{extra}, version = version + 1 WHERE id = 1"
+
+    if conn.execute(sql, (col_value,)).rowcount == 0:
+        _conn_ensure_row(conn)
+        conn.execute(sql, (col_value,))
+
+    v = _as_text(column, col_value)
+    on_commit(conn, lambda: cache_apply(k, v))
+
+
+def load_v2_overlay() -> dict:
+    """Значення з v2 для overlay у StateSnapshot (порожньо, якщо режим вимкнено)."""
+    if not state_v2_enabled():
+        return {}
+    try:
+        with get_connection() as conn:
+            return _conn_v2_row(conn) or {}
+    except Exception as e:
+        logging.warning(f"⚠️ generator_state_v2 недоступна: {e}")
+        return {}
+
+
+def _conn_try_start_v2(conn, event_type: str, start_time: str, start_date: str, start_ts: int | None) -> dict | None:
+    """CAS OFF->ON одним UPDATE. None = успіх, інакше dict з причиною відмови."""
+    from database.api.state_repo import cache_apply
+
+    sql = """
+        UPDATE generator_state_v2
+        SET status = 'ON', active_shift = ?, start_time = ?, start_date = ?, start_ts = ?, version = version + 1
+        WHERE id = 1 AND status = 'OFF'
+    """
+    params = (event_type, start_time, start_date, start_ts)
+    cur = conn.execute(sql, params)
+    if cur.rowcount == 0:
+        row = _conn_v2_row(conn)
+        if row is None:
+            # self-heal: строки ще немає (напр. ручне очищення таблиці)
+            _conn_ensure_row(conn)
+            cur = conn.execute(sql, params)
+        if cur.rowcount == 0:
+            row = row or {}
+            return {
+                "ok": False,
+                "reason": "already_on",
+                "active_shift": row.get("active_shift", "none"),
+                "start_time": row.get("last_start_time", ""),
+            }
+
+    for k, v in (
+        ("status", "ON"),
+        ("active_shift", event_type),
+        ("last_start_time", start_time),
+        ("last_start_date", start_date),
+    ):
+        on_commit(conn, lambda k=k, v=v: cache_apply(k, v))
+    return None
+
+
+def _conn_try_stop_v2(conn, expected_start: str) -> dict | None:
+    """CAS ON(expected_start)->OFF одним UPDATE. None = успіх, інакше dict з причиною."""
+    from database.api.state_repo import cache_apply
+
+    cur = conn.execute(
+        """
+        UPDATE generator_state_v2
+        SET status = 'OFF', active_shift = 'none', version = version + 1
+        WHERE id = 1 AND status = 'ON' AND active_shift = ?
+        """,
+        (expected_start,),
+    )
+    if cur.rowcount == 0:
+        row = _conn_v2_row(conn) or {}
+        if row.get("status", "OFF") != "ON":
+            return {"ok": False, "reason": "already_off"}
+        return {"ok": False, "reason": "wrong_shift", "active_shift": row.get("active_shift", "none")}
+
+    on_commit(conn, lambda: cache_apply("status", "OFF"))
+    on_commit(conn, lambda: cache_apply("active_shift", "none"))
+    return None
+
+
+def _conn_kv_values(conn) -> dict:
+    rows = conn.execute("SELECT key, value FROM generator_state").fetchall()
+    return {str(k): v for k, v in rows if k is not None}
+
+
+def _conn_kv_upsert(conn, key: str, value: str):
+    conn.execute(
+        """
+        INSERT INTO generator_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        (str(key), str(value)),
+    )
+
+
+def _conn_v2_pull_kv(conn):
+    """Переносить значення key/value -> v2 (для "сирих" UPDATE generator_state та handoff).
+
+    No-op, якщо режим v2 вимкнено.
+    """
+    if not state_v2_enabled():
+        return
+
+    kv = _conn_kv_values(conn)
+    values = {k: (kv.get(k) if kv.get(k) is not None else d) for k, d in _V2_DEFAULTS.items()}
+    conn.execute(
+        """
+        INSERT INTO generator_state_v2 (id, status, active_shift, start_time, start_date, start_ts, fuel, hours, version)
+        VALUES (1, ?, ?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT(id) DO UPDATE SET
+            status = excluded.status,
+            active_shift = excluded.active_shift,
+            start_time = excluded.start_time,
+            start_date = excluded.start_date,
+            start_ts = excluded.start_ts,
+            fuel = excluded.fuel,
+            hours = excluded.hours,
+            version = generator_state_v2.version + 1
+        """,
+        (
+            str(values["status"] or "OFF"),
+            str(values["active_shift"] or "none"),
+            str(values["last_start_time"] or ""),
+            str(values["last_start_date"] or ""),
+            _start_ts(str(values["last_start_date"] or ""), str(values["last_start_time"] or "")),
+            _as_column_value("fuel", values["current_fuel"]),
+            _as_column_value("hours", values["total_hours"]),
+        ),
+    )
+
+
+def sync_storage_mode():
+    """Handoff key/value <-> v2 при зміні STATE_V2 між запусками (idempotent)."""
+    from database.api.state_repo import invalidate_state_cache
+
+    enabled = state_v2_enabled()
+    try:
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM generator_state WHERE key = ?",
+                (_MODE_MARKER_KEY,),
+            ).fetchone()
+            active = bool(row and str(row[0] or "").strip() == "1")
+            if enabled == active:
+                return
+
+            if enabled:
+                _conn_v2_pull_kv(conn)
+                logging.info("🔁 generator_state -> generator_state_v2 (STATE_V2 увімкнено)")
+            else:
+                v2 = _conn_v2_row(conn)
+                if v2:
+                    for k in _V2_COLUMNS:
+                        _conn_kv_upsert(conn, k, v2.get(k, _V2_DEFAULTS[k]))
+                logging.info("🔁 generator_state_v2 -> generator_state (STATE_V2 вимкнено)")
+
+            _conn_kv_upsert(conn, _MODE_MARKER_KEY, "1" if enabled else "0")
+    except Exception as e:
+        logging.error(f"❌ Не вдалося синхронізувати generator_state_v2: {e}")
+    finally:
+        invalidate_state_cache()
@@ -20,6 +20,7 @@ from database.api.drivers import add_driver, get_drivers, sync_drivers_from_shee
 from database.api.state import (
     _OFFLINE_THRESHOLD_SECONDS,
     set_state,
+    set_states,
     get_state_value,
     _conn_get_state_value,
     _conn_set_state_value,
@@ -33,6 +34,13 @@ from database.api.state import (
     sheet_is_offline,
     get_state,
 )
+from database.api.state_repo import (
+    StateSnapshot,
+    get_state_snapshot,
+    invalidate_state_cache,
+    state_cache_stats,
+)
+from database.api.state_v2 import state_v2_enabled, sync_storage_mode
 from database.api.fuel import update_fuel
 from database.api.logs import (
     get_today_completed_shifts,
@@ -44,6 +52,18 @@ from database.api.logs import (
     mark_synced,
     get_logs_for_period,
     get_refills_for_date,
+    log_time_columns,
+    _conn_insert_log,
+)
+from database.api.daily_summary import get_daily_summaries, get_daily_summary, rebuild_daily_summary
+from database.api.ledger import clear_ledger_checkpoints
+from database.api.events_export import (
+    get_export_chunks,
+    get_export_high_water_mark,
+    save_export_chunks,
+    clear_export_chunks,
+    get_logs_by_id_range,
+    get_logs_max_id,
 )
 from database.api.maintenance import update_hours, set_total_hours, record_maintenance
 from database.api.schedule import toggle_schedule, set_schedule_range, get_schedule
@@ -72,6 +92,7 @@ __all__ = [
     # state
     "_OFFLINE_THRESHOLD_SECONDS",
     "set_state",
+    "set_states",
     "get_state_value",
     "_conn_get_state_value",
     "_conn_set_state_value",
@@ -84,6 +105,12 @@ __all__ = [
     "sheet_check_offline",
     "sheet_is_offline",
     "get_state",
+    "StateSnapshot",
+    "get_state_snapshot",
+    "invalidate_state_cache",
+    "state_cache_stats",
+    "state_v2_enabled",
+    "sync_storage_mode",
     # fuel
     "update_fuel",
     # logs
@@ -96,6 +123,21 @@ __all__ = [
     "mark_synced",
     "get_logs_for_period",
     "get_refills_for_date",
+    "log_time_columns",
+    "_conn_insert_log",
+    # daily summary
+    "get_daily_summaries",
+    "get_daily_summary",
+    "rebuild_daily_summary",
+    # ledger checkpoints
+    "clear_ledger_checkpoints",
+    # events tab export state
+    "get_export_chunks",
+    "get_export_high_water_mark",
+    "save_export_chunks",
+    "clear_export_chunks",
+    "get_logs_by_id_range",
+    "get_logs_max_id",
     # maintenance
     "update_hours",
     "set_total_hours",
@@ -0,0 +1,57 @@
+"""Async facade над database.db_api (для хендлерів і scheduler).
+
+    import database.db_async as adb
+
+    st = await adb.get_state()
+    res = await adb.try_start_shift(cb.data, operator, now)
+
+Кожна публічна функція db_api доступна тут як корутина з тими ж аргументами.
+Виклики виконуються на окремому пулі потоків "db" (DB_ASYNC_WORKERS, див.
+utils.executors), а не на event loop і не в пулі Sheets:
+- SQLite: кожен потік пулу тримає своє перевикористовуване з'єднання, тож
+  очікування lock (timeout 10 с) блокує лише один потік пулу, а не всіх юзерів;
+- Postgres: потоки пулу беруть з'єднання з psycopg ConnectionPool.
+
+Для кількох DB-викликів поспіль краще один `await adb.run(fn, ...)`,
+ніж кілька окремих переходів у пул.
+"""
+
+import functools
+
+import config
+import database.db_api as _db
+from utils.executors import BoundedExecutor, get_executor, shutdown_executors
+
+
+def _executor() -> BoundedExecutor:
+    return get_executor("db", max(1, int(getattr(config, "DB_ASYNC_WORKERS", 4) or 1)))
+
+
+async def run(fn, *args, **kwargs):
+    """Виконує синхронну DB-функцію (або кілька викликів в одній функції) у пулі "db"."""
+    return await _executor().run(functools.partial(fn, *args, **kwargs))
+
+
+def shutdown(wait: bool = True):
+    """Зупиняє пул "db" (викликається при завершенні процесу)."""
+    shutdown_executors(wait=wait, name="db")
+
+
+def _make_coroutine(fn):
+    @functools.wraps(fn)
+    async def _coro(*args, **kwargs):
+        return await run(fn, *args, **kwargs)
+
+    return _coro
+
+
+# Публічні функції db_api -> корутини з тими ж іменами
+__all__ = ["run", "shutdown"]
+for _name in _db.__all__:
+    _obj = getattr(_db, _name)
+    if _name.startswith("_") or isinstance(_obj, type) or not callable(_obj):
+        continue
+    globals()[_name] = _make_coroutine(_obj)
+    __all__.append(_name)
+
+del _name, _obj
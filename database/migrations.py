@@ -0,0 +1,334 @@
+"""Версійовані міграції схеми (SQLite і Postgres).
+
+- Поточна версія зберігається в таблиці schema_version (одна строка на застосований крок).
+- Кроки йдуть строго по порядку; кожен крок — функція step(c), що вміє обидва бекенди.
+- Усі незастосовані кроки виконуються ОДНІЄЮ транзакцією (Postgres: + advisory lock,
+  SQLite: BEGIN IMMEDIATE), тож паралельний старт двох процесів безпечний.
+- Якщо схема актуальна — на старті лише один SELECT MAX(version).
+
+Нова зміна схеми = новий крок в кінці MIGRATIONS (існуючі кроки не редагувати).
+Кроки мають бути ідемпотентними: БД, створені до появи schema_version, проходять
+їх "з нуля" без помилок.
+"""
+
+import logging
+import threading
+from datetime import datetime
+
+import config
+from database.models import _is_postgres, begin_transaction, get_connection
+
+# довільна константа для pg_advisory_xact_lock (серіалізує міграції між процесами)
+_PG_MIGRATION_LOCK_ID = 7_410_251
+
+_MIGRATED_LOCK = threading.Lock()
+_MIGRATED_VERSION: int | None = None
+
+
+def _column_exists(c, table: str, column: str) -> bool:
+    """Перевірка колонки через каталог (без "пробного" SELECT, що ламає транзакцію в Postgres)."""
+    if _is_postgres():
+        c.execute(
+            "SELECT 1 FROM information_schema.columns WHERE table_name = ? AND column_name = ?",
+            (table, column),
+        )
+        return c.fetchone() is not None
+
+    c.execute(f"PRAGMA table_info({table})")
+    return any(str(r[1]) == column for r in c.fetchall())
+
+
+def _table_exists(c, table: str) -> bool:
+    if _is_postgres():
+        c.execute("SELECT 1 FROM information_schema.tables WHERE table_name = ?", (table,))
+        return c.fetchone() is not None
+
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return c.fetchone() is not None
+
+
+# --- КРОКИ МІГРАЦІЙ ---
+
+
+def _m0001_baseline(c):
+    """Базові таблиці (стан схеми до появи міграцій)."""
+    if not _is_postgres():
+        c.execute('''CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY, full_name TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS drivers (id INTEGER PRIMARY KEY, name TEXT UNIQUE)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT, driver_name TEXT, is_synced INTEGER DEFAULT 0)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS generator_state (key TEXT PRIMARY KEY, value TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS schedule (date TEXT, hour INTEGER, is_off INTEGER, PRIMARY KEY(date, hour))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS maintenance (id INTEGER PRIMARY KEY, date TEXT, type TEXT, hours REAL, admin TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS user_personnel (user_id INTEGER PRIMARY KEY, personnel_name TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS personnel_names (name TEXT PRIMARY KEY)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS user_ui (user_id INTEGER PRIMARY KEY, chat_id INTEGER, message_id INTEGER)''')
+    else:
+        c.execute('''CREATE TABLE IF NOT EXISTS users (user_id BIGINT PRIMARY KEY, full_name TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS drivers (id BIGSERIAL PRIMARY KEY, name TEXT UNIQUE)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS logs (id BIGSERIAL PRIMARY KEY, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT, driver_name TEXT, is_synced INTEGER DEFAULT 0)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS generator_state (key TEXT PRIMARY KEY, value TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS schedule (date TEXT, hour INTEGER, is_off INTEGER, PRIMARY KEY(date, hour))''')
+        c.execute('''CREATE TABLE IF NOT EXISTS maintenance (id BIGSERIAL PRIMARY KEY, date TEXT, type TEXT, hours DOUBLE PRECISION, admin TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS user_personnel (user_id BIGINT PRIMARY KEY, personnel_name TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS personnel_names (name TEXT PRIMARY KEY)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS user_ui (user_id BIGINT PRIMARY KEY, chat_id BIGINT, message_id BIGINT)''')
+
+
+def _m0002_logs_receipt_number(c):
+    """logs.receipt_number (FIX #4)."""
+    if not _column_exists(c, "logs", "receipt_number"):
+        c.execute("ALTER TABLE logs ADD COLUMN receipt_number TEXT")
+        logging.info("✅ logs: колонка receipt_number додана")
+
+
+def _m0003_logs_time_columns(c):
+    """logs.event_date (YYYY-MM-DD) + logs.event_ts (epoch-секунди) та індекси під запити.
+
+    timestamp лишається як є (TEXT, локальний час KYIV) для сумісності.
+    """
+    from database.api.logs import log_time_columns
+
+    ts_type = "BIGINT" if _is_postgres() else "INTEGER"
+    for column, col_type in (("event_date", "TEXT"), ("event_ts", ts_type)):
+        if not _column_exists(c, "logs", column):
+            c.execute(f"ALTER TABLE logs ADD COLUMN {column} {col_type}")
+            logging.info(f"✅ logs: колонка {column} додана")
+
+    c.execute("SELECT id, timestamp FROM logs WHERE event_date IS NULL")
+    pending = c.fetchall()
+    if pending:
+        updates = []
+        for log_id, ts in pending:
+            event_date, event_ts = log_time_columns(ts)
+            updates.append((event_date, event_ts, log_id))
+        c.executemany("UPDATE logs SET event_date = ?, event_ts = ? WHERE id = ?", updates)
+        logging.info(f"✅ logs: заповнено event_date/event_ts для {len(updates)} записів")
+
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_event_date_type ON logs (event_date, event_type)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_event_ts ON logs (event_ts)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_logs_unsynced ON logs (id) WHERE is_synced = 0")
+
+
+_STATE_DEFAULTS = [
+    ('total_hours', '0.0'),
+    ('last_oil_change', '0.0'),
+    ('last_spark_change', '0.0'),
+    ('status', 'OFF'),
+    ('active_shift', 'none'),
+    ('last_start_time', ''),
+    ('last_start_date', ''),
+    ('current_fuel', '0.0'),
+    ('fuel_ordered_date', ''),
+    ('fuel_alert_last_sent_ts', ''),
+    ('stop_reminder_sent_date', ''),
+    ('sheet_last_ok_ts', ''),
+    ('sheet_first_fail_ts', ''),
+    ('sheet_offline', '0'),
+    ('sheet_offline_since_ts', ''),
+]
+
+
+def _m0004_state_defaults(c):
+    """Дефолтні ключі generator_state (існуючі значення не чіпаємо)."""
+    c.executemany(
+        """
+        INSERT INTO generator_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO NOTHING
+        """,
+        _STATE_DEFAULTS,
+    )
+
+
+def _m0005_generator_state_v2(c):
+    """Одна типізована строка стану генератора (використовується при STATE_V2=1)."""
+    if _is_postgres():
+        c.execute('''CREATE TABLE IF NOT EXISTS generator_state_v2 (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            status TEXT NOT NULL DEFAULT 'OFF',
+            active_shift TEXT NOT NULL DEFAULT 'none',
+            start_time TEXT NOT NULL DEFAULT '',
+            start_date TEXT NOT NULL DEFAULT '',
+            start_ts BIGINT,
+            fuel DOUBLE PRECISION NOT NULL DEFAULT 0,
+            hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+            version BIGINT NOT NULL DEFAULT 0
+        )''')
+    else:
+        c.execute('''CREATE TABLE IF NOT EXISTS generator_state_v2 (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            status TEXT NOT NULL DEFAULT 'OFF',
+            active_shift TEXT NOT NULL DEFAULT 'none',
+            start_time TEXT NOT NULL DEFAULT '',
+            start_date TEXT NOT NULL DEFAULT '',
+            start_ts INTEGER,
+            fuel REAL NOT NULL DEFAULT 0,
+            hours REAL NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL DEFAULT 0
+        )''')
+
+
+def _m0006_daily_summary(c):
+    """Денні підсумки журналу (daily_summary) + backfill з logs."""
+    from database.api.daily_summary import _conn_rebuild_daily_summary
+
+    real = "DOUBLE PRECISION" if _is_postgres() else "REAL"
+    c.execute(f'''CREATE TABLE IF NOT EXISTS daily_summary (
+        date TEXT PRIMARY KEY,
+        shifts TEXT NOT NULL DEFAULT '{{}}',
+        refill_total {real} NOT NULL DEFAULT 0,
+        refills TEXT NOT NULL DEFAULT '[]',
+        fuel_start {real} NOT NULL DEFAULT 0,
+        fuel_end {real} NOT NULL DEFAULT 0,
+        hours_end {real} NOT NULL DEFAULT 0,
+        open_shifts TEXT NOT NULL DEFAULT '{{}}',
+        events INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT
+    )''')
+    _conn_rebuild_daily_summary(c)
+
+
+def _m0007_ledger_checkpoint(c):
+    """Чекпоінти балансу палива/мотогодин (services.ledger)."""
+    if _is_postgres():
+        real, ts_type = "DOUBLE PRECISION", "BIGINT"
+    else:
+        real, ts_type = "REAL", "INTEGER"
+    c.execute(f'''CREATE TABLE IF NOT EXISTS ledger_checkpoint (
+        period_end TEXT PRIMARY KEY,
+        upto_ts {ts_type} NOT NULL,
+        fuel {real} NOT NULL DEFAULT 0,
+        hours {real} NOT NULL DEFAULT 0,
+        open_shifts TEXT NOT NULL DEFAULT '{{}}',
+        events INTEGER NOT NULL DEFAULT 0,
+        rate {real} NOT NULL DEFAULT 0,
+        created_at TEXT
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ledger_checkpoint_upto_ts ON ledger_checkpoint (upto_ts)")
+
+
+def _m0008_events_export_chunk(c):
+    """Стан інкрементального експорту вкладки журналу: контрольні суми блоків logs.id."""
+    c.execute('''CREATE TABLE IF NOT EXISTS events_export_chunk (
+        sheet_key TEXT NOT NULL,
+        chunk INTEGER NOT NULL,
+        max_id INTEGER NOT NULL DEFAULT 0,
+        rows_count INTEGER NOT NULL DEFAULT 0,
+        checksum TEXT NOT NULL,
+        exported_at TEXT,
+        PRIMARY KEY (sheet_key, chunk)
+    )''')
+
+
+MIGRATIONS = [
+    (1, "baseline", _m0001_baseline),
+    (2, "logs.receipt_number", _m0002_logs_receipt_number),
+    (3, "logs.event_date/event_ts + indexes", _m0003_logs_time_columns),
+    (4, "generator_state defaults", _m0004_state_defaults),
+    (5, "generator_state_v2", _m0005_generator_state_v2),
+    (6, "daily_summary", _m0006_daily_summary),
+    (7, "ledger_checkpoint", _m0007_ledger_checkpoint),
+    (8, "events_export_chunk", _m0008_events_export_chunk),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# --- ДВИЖОК ---
+
+
+def _ensure_version_table(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)''')
+
+
+def _current_version(c) -> int:
+    if not _table_exists(c, "schema_version"):
+        return 0
+    c.execute("SELECT MAX(version) FROM schema_version")
+    row = c.fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def current_version() -> int:
+    """Застосована версія схеми (0 — БД ще без schema_version)."""
+    conn = get_connection()
+    try:
+        return _current_version(conn.cursor())
+    finally:
+        conn.close()
+
+
+def migrate() -> int:
+    """Доводить схему до LATEST_VERSION. Повертає к-сть застосованих кроків.
+
+    Повторний виклик у тому ж процесі (restart-цикл main) — без звернень до БД.
+    """
+    global _MIGRATED_VERSION
+
+    with _MIGRATED_LOCK:
+        if _MIGRATED_VERSION == LATEST_VERSION:
+            return 0
+
+        conn = get_connection()
+        try:
+            c = conn.cursor()
+
+            # Швидкий шлях: схема актуальна — нічого не блокуємо і не пишемо
+            version = _current_version(c)
+            if version >= LATEST_VERSION:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                _MIGRATED_VERSION = LATEST_VERSION
+                logging.info(f"✅ Схема БД актуальна (v{version})")
+                return 0
+
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+
+            begin_transaction(conn)
+            c = conn.cursor()
+            if _is_postgres():
+                c.execute("SELECT pg_advisory_xact_lock(?)", (_PG_MIGRATION_LOCK_ID,))
+
+            # Перечитуємо під блокуванням: інший процес міг вже мігрувати
+            _ensure_version_table(c)
+            version = _current_version(c)
+
+            applied = 0
+            for step_version, name, step in MIGRATIONS:
+                if step_version <= version:
+                    continue
+                logging.info(f"🔧 Міграція v{step_version}: {name}")
+                step(c)
+                c.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (step_version, name, datetime.now(config.KYIV).strftime("%Y-%m-%d %H:%M:%S")),
+                )
+                applied += 1
+
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+        _MIGRATED_VERSION = LATEST_VERSION
+        logging.info(f"✅ Схема БД оновлена до v{LATEST_VERSION} (кроків: {applied})")
+        return applied
+
+
+def reset_migrated_flag():
+    """Скидає in-process позначку (напр. після заміни файлу БД)."""
+    global _MIGRATED_VERSION
+    with _MIGRATED_LOCK:
+        _MIGRATED_VERSION = None
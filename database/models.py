@@ -1,5 +1,6 @@
 import logging
 import sqlite3
+import threading
 from urllib.parse import urlparse, urlunparse
 
 import config
@@ -13,6 +14,11 @@ except Exception:  # pragma: no cover
     sql = None
     pg_errors = None
 
+try:
+    from psycopg_pool import ConnectionPool
+except Exception:  # pragma: no cover
+    ConnectionPool = None
+
 
 def _is_postgres() -> bool:
     return (getattr(config, "DB_BACKEND", "sqlite") or "sqlite").strip().lower() == "postgres"
@@ -75,6 +81,11 @@ class ConnectionProxy:
             return self._conn.execute(q)
         return self._conn.execute(q, params)
 
+    def executemany(self, query, params_seq):
+        cur = self._conn.cursor()
+        cur.executemany(_translate_qmarks(str(query)), params_seq)
+        return cur
+
     def cursor(self, *args, **kwargs):
         return CursorProxy(self._conn.cursor(*args, **kwargs))
 
@@ -121,11 +132,31 @@ def _postgres_db_missing(exc: Exception) -> bool:
     return ("does not exist" in msg) and ("database" in msg)
 
 
+_PG_DB_READY = False
+_PG_DB_READY_LOCK = threading.Lock()
+
+
 def ensure_postgres_database_exists():
-    """Ensure target Postgres database exists; create it if missing."""
+    """Ensure target Postgres database exists; create it if missing.
+
+    Перевірка робиться один раз на процес (далі — тільки через пул).
+    """
+    global _PG_DB_READY
+
     if not _is_postgres():
         return
 
+    if _PG_DB_READY:
+        return
+
+    with _PG_DB_READY_LOCK:
+        if _PG_DB_READY:
+            return
+        _ensure_postgres_database_exists_once()
+        _PG_DB_READY = True
+
+
+def _ensure_postgres_database_exists_once():
     if psycopg is None:
         raise RuntimeError("psycopg is not installed but DB_BACKEND=postgres")
 
@@ -173,19 +204,407 @@ def ensure_postgres_database_exists():
         )
 
 
+# --- CONNECTION MANAGER ---
+# SQLite: одне з'єднання на потік (перевикористовується, закривається в close_all_connections()).
+# Postgres: обмежений пул psycopg_pool; close()/вихід з `with` повертає з'єднання в пул.
+
+_SQLITE_LOCAL = threading.local()
+_SQLITE_LOCK = threading.Lock()
+_SQLITE_CONNECTIONS: list = []
+
+_PG_POOL = None
+_PG_POOL_LOCK = threading.Lock()
+
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "created": 0,
+    "acquired": 0,
+    "checked_out": 0,
+}
+
+
+def _stats_add(key: str, delta: int = 1):
+    with _STATS_LOCK:
+        _STATS[key] = _STATS.get(key, 0) + delta
+
+
+def on_commit(conn, callback):
+    """Виконати callback() після успішного коміту поточної транзакції conn.
+
+    При rollback callbacks відкидаються. Для з'єднань без підтримки хуків
+    (сторонні обгортки) callback виконується одразу.
+    """
+    hooks = getattr(conn, "_after_commit", None)
+    if hooks is None:
+        callback()
+        return
+    hooks.append(callback)
+
+
+def _run_after_commit(conn):
+    hooks = list(conn._after_commit)
+    conn._after_commit.clear()
+    for cb in hooks:
+        try:
+            cb()
+        except Exception as e:
+            logging.warning(f"⚠️ after-commit hook error: {e}")
+
+
+# Слухачі змін даних (фоновий синк з Sheets): викликаються після коміту, з потоку, що комітив.
+_CHANGE_LOCK = threading.Lock()
+_CHANGE_LISTENERS: list = []
+
+
+def add_change_listener(callback):
+    """callback(kind) після коміту транзакції, що змінила дані kind ("logs", "schedule")."""
+    with _CHANGE_LOCK:
+        if callback not in _CHANGE_LISTENERS:
+            _CHANGE_LISTENERS.append(callback)
+
+
+def remove_change_listener(callback):
+    with _CHANGE_LOCK:
+        if callback in _CHANGE_LISTENERS:
+            _CHANGE_LISTENERS.remove(callback)
+
+
+def _fire_change(kind: str):
+    with _CHANGE_LOCK:
+        listeners = list(_CHANGE_LISTENERS)
+    for cb in listeners:
+        try:
+            cb(kind)
+        except Exception as e:
+            logging.warning(f"⚠️ change listener error: {e}")
+
+
+def notify_change(conn, kind: str):
+    """Повідомити слухачів про зміну kind після коміту conn (rollback — без повідомлення)."""
+    with _CHANGE_LOCK:
+        if not _CHANGE_LISTENERS:
+            return
+    on_commit(conn, lambda: _fire_change(kind))
+
+
+class SqliteConnection:
+    """Per-thread sqlite3 connection with sqlite-compatible `with` semantics.
+
+    - `with conn:` комітить (або відкочує) тільки на зовнішньому виході, тож вкладені
+      `with get_connection()` в одному потоці не комітять чужу транзакцію;
+    - close() не закриває файл, а лише відкочує незакомічені зміни (як і раніше
+      при закритті), щоб наступний виклик отримав "чисте" з'єднання.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._depth = 0
+        self._after_commit: list = []
+        self.closed = False
+
+    def execute(self, query, params=None):
+        if params is None:
+            return self._conn.execute(query)
+        return self._conn.execute(query, params)
+
+    def executemany(self, query, params_seq):
+        return self._conn.executemany(query, params_seq)
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        res = self._conn.commit()
+        _run_after_commit(self)
+        return res
+
+    def rollback(self):
+        self._after_commit.clear()
+        return self._conn.rollback()
+
+    def close(self):
+        if self._depth == 0 and self._conn.in_transaction:
+            try:
+                self.rollback()
+            except Exception:
+                pass
+
+    def _close_physical(self):
+        self.closed = True
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        if self._depth == 0:
+            _stats_add("checked_out")
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            _stats_add("checked_out", -1)
+            if exc_type is None:
+                self.commit()
+            else:
+                try:
+                    self.rollback()
+                except Exception:
+                    pass
+        return False
+
+    def __getattr__(self, item):
+        return getattr(self._conn, item)
+
+
+class PooledConnection(ConnectionProxy):
+    """psycopg connection borrowed from the pool; close()/`with`-exit returns it back."""
+
+    def __init__(self, conn, pool):
+        super().__init__(conn)
+        self._pool = pool
+        self._depth = 0
+        self._after_commit: list = []
+        self._released = False
+
+    def commit(self):
+        res = self._conn.commit()
+        _run_after_commit(self)
+        return res
+
+    def rollback(self):
+        self._after_commit.clear()
+        return self._conn.rollback()
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        _stats_add("checked_out", -1)
+        self._after_commit.clear()
+        try:
+            if self._conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+                self._conn.rollback()
+        except Exception:
+            pass
+        try:
+            self._pool.putconn(self._conn)
+        except Exception as e:
+            logging.warning(f"⚠️ Не вдалося повернути з'єднання в пул: {e}")
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            try:
+                if exc_type is None:
+                    self.commit()
+                else:
+                    self.rollback()
+            finally:
+                self.close()
+        return False
+
+    def __del__(self):
+        # страховка від "загублених" з'єднань (conn без close/with)
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+_SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+_SQLITE_SYNC_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def sqlite_profile() -> dict:
+    """Профіль SQLite з config (значення вже провалідовані)."""
+    journal = str(getattr(config, "SQLITE_JOURNAL_MODE", "WAL") or "WAL").upper()
+    sync = str(getattr(config, "SQLITE_SYNCHRONOUS", "NORMAL") or "NORMAL").upper()
+    return {
+        "journal_mode": journal if journal in _SQLITE_JOURNAL_MODES else "WAL",
+        "synchronous": sync if sync in _SQLITE_SYNC_LEVELS else "NORMAL",
+        "mmap_size": max(0, int(getattr(config, "SQLITE_MMAP_MB", 128) or 0)) * 1024 * 1024,
+        # від'ємне значення cache_size = розмір у KiB
+        "cache_size": -max(0, int(getattr(config, "SQLITE_CACHE_MB", 16) or 0)) * 1024,
+        "busy_timeout_ms": max(0, int(getattr(config, "SQLITE_BUSY_TIMEOUT_MS", 10000) or 0)),
+    }
+
+
+def _apply_sqlite_profile(raw: sqlite3.Connection, profile: dict | None = None):
+    """PRAGMA-профіль, що застосовується один раз на нове з'єднання.
+
+    WAL: читачі не блокуються записом (дашборд/scheduler під час add_log і CAS змін);
+    synchronous=NORMAL у WAL безпечний щодо цілісності (при збої живлення можна
+    втратити лише останні коміти, але не зламати БД).
+    """
+    p = profile or sqlite_profile()
+    try:
+        raw.execute(f"PRAGMA busy_timeout = {int(p['busy_timeout_ms'])}")
+        mode = raw.execute(f"PRAGMA journal_mode = {p['journal_mode']}").fetchone()
+        if mode and str(mode[0]).upper() != p["journal_mode"]:
+            logging.warning(f"⚠️ SQLite: journal_mode={mode[0]} замість {p['journal_mode']}")
+        raw.execute(f"PRAGMA synchronous = {p['synchronous']}")
+        raw.execute(f"PRAGMA mmap_size = {int(p['mmap_size'])}")
+        raw.execute(f"PRAGMA cache_size = {int(p['cache_size'])}")
+        raw.execute("PRAGMA temp_store = MEMORY")
+    except Exception as e:
+        logging.warning(f"⚠️ SQLite: не вдалося застосувати PRAGMA-профіль: {e}")
+
+
+def _sqlite_connection() -> SqliteConnection:
+    handle = getattr(_SQLITE_LOCAL, "conn", None)
+    if handle is not None and not handle.closed:
+        return handle
+
+    db_path = (getattr(config, "SQLITE_PATH", "generator.db") or "generator.db").strip()
+    profile = sqlite_profile()
+    raw = sqlite3.connect(db_path, check_same_thread=False, timeout=profile["busy_timeout_ms"] / 1000.0)
+    _apply_sqlite_profile(raw, profile)
+    handle = SqliteConnection(raw)
+    _SQLITE_LOCAL.conn = handle
+
+    with _SQLITE_LOCK:
+        _SQLITE_CONNECTIONS.append(handle)
+    _stats_add("created")
+    return handle
+
+
+def _on_pg_connect(conn):
+    _stats_add("created")
+
+
+def _get_pg_pool():
+    global _PG_POOL
+
+    pool = _PG_POOL
+    if pool is not None:
+        return pool
+
+    with _PG_POOL_LOCK:
+        if _PG_POOL is not None:
+            return _PG_POOL
+
+        if psycopg is None:
+            raise RuntimeError("psycopg is not installed but DB_BACKEND=postgres")
+        if ConnectionPool is None:
+            raise RuntimeError("psycopg_pool is not installed but DB_BACKEND=postgres")
+
+        ensure_postgres_database_exists()
+
+        min_size = int(getattr(config, "DB_POOL_MIN_SIZE", 1) or 0)
+        max_size = max(1, int(getattr(config, "DB_POOL_MAX_SIZE", 10) or 1))
+        _PG_POOL = ConnectionPool(
+            conninfo=getattr(config, "POSTGRES_DSN"),
+            min_size=min(min_size, max_size),
+            max_size=max_size,
+            timeout=float(getattr(config, "DB_POOL_TIMEOUT_SEC", 30.0) or 30.0),
+            configure=_on_pg_connect,
+            name="generator_bot",
+            open=True,
+        )
+        logging.info(f"🗄 Postgres pool відкрито ({min_size}..{max_size})")
+        return _PG_POOL
+
+
 def get_connection():
     """Returns a DB connection.
 
-    - sqlite: sqlite3.Connection
-    - postgres: ConnectionProxy (psycopg connection wrapper)
+    - sqlite: SqliteConnection (одне перевикористовуване з'єднання на потік)
+    - postgres: PooledConnection (psycopg connection з пулу)
+
+    Підтримуються обидва патерни: `with get_connection() as conn:` та
+    `conn = get_connection(); ...; conn.close()`.
     """
+    _stats_add("acquired")
+
     if not _is_postgres():
-        db_path = (getattr(config, "SQLITE_PATH", "generator.db") or "generator.db").strip()
-        return sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        return _sqlite_connection()
+
+    pool = _get_pg_pool()
+    conn = pool.getconn()
+    _stats_add("checked_out")
+    return PooledConnection(conn, pool)
+
+
+def pool_stats() -> dict:
+    """Метрики менеджера з'єднань: created / checked_out / waits (+ деталі пулу Postgres)."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+
+    if not _is_postgres():
+        with _SQLITE_LOCK:
+            stats["open"] = sum(1 for h in _SQLITE_CONNECTIONS if not h.closed)
+        stats["backend"] = "sqlite"
+        stats["waits"] = 0
+        return stats
+
+    stats["backend"] = "postgres"
+    pool = _PG_POOL
+    pg = {}
+    if pool is not None:
+        try:
+            pg = pool.get_stats()
+        except Exception:
+            pg = {}
+    stats["waits"] = int(pg.get("requests_queued", 0) or 0)
+    stats["wait_ms"] = int(pg.get("requests_wait_ms", 0) or 0)
+    stats["pool_size"] = int(pg.get("pool_size", 0) or 0)
+    stats["pool_available"] = int(pg.get("pool_available", 0) or 0)
+    stats["pool_max"] = int(pg.get("pool_max", 0) or 0)
+    return stats
+
+
+def close_all_connections():
+    """Закриває всі з'єднання (викликати при завершенні процесу)."""
+    global _PG_POOL
+
+    with _SQLITE_LOCK:
+        handles = list(_SQLITE_CONNECTIONS)
+        _SQLITE_CONNECTIONS.clear()
+    for h in handles:
+        h._close_physical()
+
+    with _PG_POOL_LOCK:
+        pool = _PG_POOL
+        _PG_POOL = None
+    if pool is not None:
+        try:
+            pool.close()
+        except Exception:
+            pass
+
 
-    ensure_postgres_database_exists()
-    conn = psycopg.connect(getattr(config, "POSTGRES_DSN"))
-    return ConnectionProxy(conn)
+def sqlite_maintenance(optimize: bool = True, checkpoint: str | None = "PASSIVE") -> dict:
+    """PRAGMA optimize + WAL checkpoint (для scheduler). Для Postgres — no-op.
+
+    checkpoint: PASSIVE (не чекає на читачів) | TRUNCATE (обрізає -wal файл) | None.
+    """
+    if _is_postgres():
+        return {}
+
+    out = {}
+    conn = get_connection()
+    try:
+        if optimize:
+            conn.execute("PRAGMA optimize")
+            out["optimize"] = True
+        if checkpoint:
+            mode = str(checkpoint).upper()
+            if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+                mode = "PASSIVE"
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            if row:
+                # (busy, кадрів у WAL, кадрів перенесено в БД)
+                out["checkpoint"] = {"mode": mode, "busy": row[0], "log": row[1], "checkpointed": row[2]}
+    finally:
+        conn.close()
+    return out
 
 
 def begin_transaction(conn):
@@ -200,93 +619,14 @@ def begin_transaction(conn):
 
 
 def init_db():
-    """Create schema (idempotent) + seed generator_state defaults."""
-    conn = get_connection()
-    c = conn.cursor()
-
-    if not _is_postgres():
-        c.execute('''CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY, full_name TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS drivers (id INTEGER PRIMARY KEY, name TEXT UNIQUE)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT, driver_name TEXT, receipt_number TEXT, is_synced INTEGER DEFAULT 0)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS generator_state (key TEXT PRIMARY KEY, value TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS schedule (date TEXT, hour INTEGER, is_off INTEGER, PRIMARY KEY(date, hour))''')
-        c.execute('''CREATE TABLE IF NOT EXISTS maintenance (id INTEGER PRIMARY KEY, date TEXT, type TEXT, hours REAL, admin TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS user_personnel (user_id INTEGER PRIMARY KEY, personnel_name TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS personnel_names (name TEXT PRIMARY KEY)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS user_ui (user_id INTEGER PRIMARY KEY, chat_id INTEGER, message_id INTEGER)''')
-
-    else:
-        c.execute('''CREATE TABLE IF NOT EXISTS users (user_id BIGINT PRIMARY KEY, full_name TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS drivers (id BIGSERIAL PRIMARY KEY, name TEXT UNIQUE)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS logs (id BIGSERIAL PRIMARY KEY, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT, driver_name TEXT, receipt_number TEXT, is_synced INTEGER DEFAULT 0)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS generator_state (key TEXT PRIMARY KEY, value TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS schedule (date TEXT, hour INTEGER, is_off INTEGER, PRIMARY KEY(date, hour))''')
-        c.execute('''CREATE TABLE IF NOT EXISTS maintenance (id BIGSERIAL PRIMARY KEY, date TEXT, type TEXT, hours DOUBLE PRECISION, admin TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS user_personnel (user_id BIGINT PRIMARY KEY, personnel_name TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS personnel_names (name TEXT PRIMARY KEY)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS user_ui (user_id BIGINT PRIMARY KEY, chat_id BIGINT, message_id BIGINT)''')
-
-    # FIX #4: Міграція receipt_number для SQLite і Postgres
-    try:
-        c.execute("SELECT receipt_number FROM logs LIMIT 1")
-        logging.info("✅ Колонка receipt_number вже існує")
-    except Exception:
-        logging.info("🔧 Додаємо колонку receipt_number...")
-        try:
-            if _is_postgres():
-                c.execute("ALTER TABLE logs ADD COLUMN receipt_number TEXT")
-                logging.info("✅ Postgres: колонка receipt_number додана")
-            else:
-                # SQLite: робимо ALTER TABLE
-                c.execute("ALTER TABLE logs ADD COLUMN receipt_number TEXT")
-                logging.info("✅ SQLite: колонка receipt_number додана")
-        except Exception as e:
-            # Якщо колонка вже існує, ігноруємо
-            if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
-                logging.info("✅ Колонка receipt_number вже існує")
-            else:
-                logging.warning(f"⚠️ Не вдалося додати receipt_number: {e}")
-
-    defaults = [
-        ('total_hours', '0.0'),
-        ('last_oil_change', '0.0'),
-        ('last_spark_change', '0.0'),
-        ('status', 'OFF'),
-        ('active_shift', 'none'),
-        ('last_start_time', ''),
-        ('last_start_date', ''),
-        ('current_fuel', '0.0'),
-        ('fuel_ordered_date', ''),
-        ('fuel_alert_last_sent_ts', ''),
-        ('stop_reminder_sent_date', ''),
-        ('sheet_last_ok_ts', ''),
-        ('sheet_first_fail_ts', ''),
-        ('sheet_offline', '0'),
-        ('sheet_offline_since_ts', ''),
-    ]
-
-    for k, v in defaults:
-        try:
-            c.execute(
-                """
-                INSERT INTO generator_state (key, value) VALUES (?, ?)
-                ON CONFLICT(key) DO NOTHING
-                """,
-                (k, v),
-            )
-        except Exception:
-            try:
-                c.execute("INSERT OR IGNORE INTO generator_state (key, value) VALUES (?, ?)", (k, v))
-            except Exception:
-                pass
+    """Доводить схему до актуальної версії (database.migrations) — idempotent.
 
-    try:
-        conn.commit()
-    except Exception:
-        pass
-    try:
-        conn.close()
-    except Exception:
-        pass
+    Якщо схема вже актуальна, коштує один SELECT; повторні виклики в тому ж
+    процесі (restart-цикл main) не звертаються до БД взагалі.
+    """
+    from database.api.state_v2 import sync_storage_mode
+    from database.migrations import migrate
 
+    migrate()
+    sync_storage_mode()
     logging.info("✅ База даних ініціалізована.")
@@ -5,6 +5,8 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 import config
 from database.models import get_connection
+from database.api.state_repo import invalidate_state_cache
+from database.api.state_v2 import _conn_v2_pull_kv
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -49,6 +51,9 @@ async def db_cleanup_execute(cb: types.CallbackQuery):
         with get_connection() as conn:
             # Видаляємо всі дані (схема залишається)
             conn.execute("DELETE FROM logs")
+            conn.execute("DELETE FROM daily_summary")
+            conn.execute("DELETE FROM ledger_checkpoint")
+            conn.execute("DELETE FROM events_export_chunk")
             conn.execute("DELETE FROM schedule")
             conn.execute("DELETE FROM drivers")
             conn.execute("DELETE FROM personnel_names")
@@ -68,6 +73,9 @@ async def db_cleanup_execute(cb: types.CallbackQuery):
             conn.execute("UPDATE generator_state SET value = '0.0' WHERE key = 'current_fuel'")
             conn.execute("UPDATE generator_state SET value = '' WHERE key = 'fuel_ordered_date'")
             conn.execute("UPDATE generator_state SET value = '' WHERE key = 'stop_reminder_sent_date'")
+            _conn_v2_pull_kv(conn)
+
+        invalidate_state_cache()
 
         logger.info(f"✅ БД очищено адміном {cb.from_user.id}")
 
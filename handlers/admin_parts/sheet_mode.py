@@ -6,6 +6,9 @@ import config
 import database.db_api as db
 from handlers.admin_parts.utils import actor_name, fmt_state_ts
 from keyboards.builders import sheet_mode_kb
+from services.google_sync_parts.mirror import mirror_stats
+from services.google_sync_parts.session import sheets_api_stats
+from utils.executors import executors_stats
 
 router = Router()
 
@@ -38,12 +41,38 @@ async def sheet_mode_menu(cb: types.CallbackQuery, state: FSMContext):
     else:
         status_line = "🔌 <b>OFFLINE</b> (примусово)" if forced_offline else "🔌 <b>OFFLINE</b> (авто)"
 
+    try:
+        api = sheets_api_stats()
+        api_line = (
+            f"API з запуску: запитів <b>{api['requests']}</b> (читань {api['reads']}, записів {api['writes']}), "
+            f"throttled <b>{api['throttled']}</b>, повторів <b>{api['retried']}</b>, "
+            f"об'єднано однакових читань <b>{api.get('collapsed', 0)}</b>, "
+            f"невдалих після повторів <b>{api['retry_exhausted']}</b>\n"
+        )
+        mirror = mirror_stats()
+        age = mirror.get("age_sec")
+        api_line += (
+            f"Дзеркало вкладки: оновлень <b>{mirror.get('refreshes', 0)}</b>, "
+            f"з кешу <b>{mirror.get('hits', 0)}</b>, холодних читань <b>{mirror.get('cold', 0)}</b>"
+            f"{f', вік {age:.0f} с' if age is not None else ''}\n"
+        )
+        for name, pool in executors_stats().items():
+            api_line += (
+                f"Пул {name}: зайнято {pool['busy']}/{pool['workers']}, у черзі <b>{pool['queued']}</b> "
+                f"(макс {pool['queue_max']}), очікування сер. {pool['wait_avg_ms']} / макс {pool['wait_max_ms']} мс, "
+                f"відмов {pool['rejected']}, таймаутів {pool['timeouts']}\n"
+            )
+        api_line += "\n"
+    except Exception:
+        api_line = ""
+
     txt = (
         "🔧 <b>Google Sheets: режим</b>\n\n"
         f"Стан: {status_line}\n"
         f"Останній успішний доступ: <b>{last_ok}</b>\n"
         f"Перша помилка доступу: <b>{first_fail}</b>\n"
         f"OFFLINE з: <b>{offline_since}</b>\n\n"
+        f"{api_line}"
         "⚠️ Примусовий ONLINE не гарантує доступність Sheets — лише вимикає офлайн-облік як режим."
     )
 
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from aiogram import Router, F, types
@@ -9,6 +8,7 @@ import database.db_api as db
 from keyboards.builders import sync_menu, back_to_admin
 from services.sheets_export import full_export
 from services.sheets_import import full_import
+from utils.executors import PRIORITY_ADMIN, sheets_executor
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -20,6 +20,7 @@ def _logs_title() -> str:
 
 def _import_confirm_kb() -> InlineKeyboardMarkup:
     kb = [
+        [InlineKeyboardButton(text="🔎 Що зміниться (dry-run)", callback_data="sync_import_dryrun")],
         [InlineKeyboardButton(text="✅ Підтверджую імпорт", callback_data="sync_import_execute")],
         [InlineKeyboardButton(text="❌ Скасувати", callback_data="sync_menu")],
     ]
@@ -28,7 +29,9 @@ def _import_confirm_kb() -> InlineKeyboardMarkup:
 
 def _export_confirm_kb() -> InlineKeyboardMarkup:
     kb = [
-        [InlineKeyboardButton(text="✅ Підтверджую експорт", callback_data="sync_export_execute")],
+        [InlineKeyboardButton(text="✅ Експорт (дописати нові події)", callback_data="sync_export_execute:append")],
+        [InlineKeyboardButton(text="🔍 Експорт + звірка журналу", callback_data="sync_export_execute:verify")],
+        [InlineKeyboardButton(text="♻️ Експорт з повним перезаписом журналу", callback_data="sync_export_execute:rewrite")],
         [InlineKeyboardButton(text="❌ Скасувати", callback_data="sync_menu")],
     ]
     return InlineKeyboardMarkup(inline_keyboard=kb)
@@ -46,8 +49,8 @@ async def show_sync_menu(cb: types.CallbackQuery):
         "📥 <b>Імпорт</b> — читає дані з Sheets і перезаписує в БД\n"
         "📤 <b>Експорт</b> — записує дані з БД у Sheets (A-AC + вкладка журналу)\n\n"
         f"🗂 Вкладка журналу подій: <b>{logs_title}</b>\n\n"
-        "⚠️ Імпорт повністю очищає БД перед завантаженням (потрібне підтвердження).\n"
-        "⚠️ Експорт перезаписує вкладку журналу подій (потрібне підтвердження).\n"
+        "⚠️ Імпорт повністю замінює дані БД (потрібне підтвердження, є dry-run).\n"
+        "ℹ️ Експорт дописує у вкладку журналу лише нові події (повний перезапис — окремою кнопкою).\n"
     )
     await cb.message.edit_text(txt, reply_markup=sync_menu())
     await cb.answer()
@@ -72,13 +75,57 @@ async def sync_import_confirm(cb: types.CallbackQuery):
         "• Повністю очистить БД\n"
         "• Завантажить дані з Google Sheets\n\n"
         "❌ <b>Цю операцію НЕМОЖЛИВО ВІДМІНИТИ!</b>\n\n"
-        "Рекомендація: перед імпортом зробіть експорт як резервну копію."
+        "Рекомендація: перед імпортом зробіть експорт як резервну копію.\n"
+        "🔎 Dry-run покаже різницю з поточною БД, нічого не змінюючи."
     )
 
     await cb.message.edit_text(txt, reply_markup=_import_confirm_kb())
     await cb.answer()
 
 
+def _format_import_diff(diff: dict) -> str:
+    logs = diff.get("logs") or {}
+    dates = diff.get("dates_changed") or []
+    dates_txt = ", ".join(dates[:10]) + (f" … (+{len(dates) - 10})" if len(dates) > 10 else "")
+    mnt = diff.get("maintenance") or {}
+    drivers = diff.get("drivers") or {}
+    personnel = diff.get("personnel") or {}
+    cleared = diff.get("cleared") or {}
+    events = diff.get("events") or {}
+    return (
+        "🔎 <b>Dry-run імпорту</b> (БД не змінено)\n\n"
+        f"📄 Рядків у Sheets: {diff.get('rows', 0)}\n"
+        f"🧾 Події: {logs.get('current', 0)} → {logs.get('new', 0)} "
+        f"(+{logs.get('added', 0)} / -{logs.get('removed', 0)}, без змін {logs.get('unchanged', 0)})\n"
+        f"🗂 З вкладки {_logs_title()}: {events.get('rows', 0)} (дублікатів ID {events.get('duplicates', 0)}), "
+        f"доповнено з основної: {events.get('supplemented', 0)}\n"
+        f"📅 Змінені дні: {dates_txt or '—'}\n"
+        f"🔧 ТО: {mnt.get('current', 0)} → {mnt.get('new', 0)}\n"
+        f"🚚 Водії: +{len(drivers.get('added') or [])} / -{len(drivers.get('removed') or [])}\n"
+        f"👷 Персонал: +{len(personnel.get('added') or [])} / -{len(personnel.get('removed') or [])}\n"
+        f"🗑 Буде очищено: графік ({cleared.get('schedule', 0)}), "
+        f"прив'язки персоналу ({cleared.get('user_personnel', 0)})"
+    )
+
+
+@router.callback_query(F.data == "sync_import_dryrun")
+async def sync_import_dryrun(cb: types.CallbackQuery):
+    if cb.from_user.id not in config.ADMIN_IDS:
+        return await cb.answer("⛔ Тільки для адмінів", show_alert=True)
+
+    await cb.answer("🔎 Порівнюємо з БД...", show_alert=False)
+
+    try:
+        diff = await sheets_executor().run(full_import, True, priority=PRIORITY_ADMIN)
+        await cb.message.edit_text(_format_import_diff(diff), reply_markup=_import_confirm_kb())
+    except Exception as e:
+        logger.error(f"❌ Помилка dry-run імпорту: {e}", exc_info=True)
+        await cb.message.edit_text(
+            f"❌ <b>Помилка dry-run імпорту</b>\n\n{e}",
+            reply_markup=back_to_admin(),
+        )
+
+
 @router.callback_query(F.data == "sync_import_execute")
 async def sync_import_execute(cb: types.CallbackQuery):
     if cb.from_user.id not in config.ADMIN_IDS:
@@ -88,15 +135,16 @@ async def sync_import_execute(cb: types.CallbackQuery):
     await cb.message.edit_text("⏳ <b>Імпорт з Google Sheets...</b>\n\nЗачекайте, це може зайняти кілька секунд...")
 
     try:
-        await asyncio.to_thread(full_import)
+        summary = await sheets_executor().run(full_import, priority=PRIORITY_ADMIN) or {}
 
         logs_title = _logs_title()
         txt = (
             "✅ <b>Імпорт завершено!</b>\n\n"
             "📄 Дані з Sheets завантажені в БД:\n"
             "• Основна вкладка (A-AC)\n"
-            f"• Вкладка {logs_title} (опціонально)\n\n"
-            "⚠️ Старі дані БД було видалено."
+            f"• Вкладка {logs_title}: подій {summary.get('events', 0)}, "
+            f"доповнено з основної {summary.get('supplemented', 0)}\n\n"
+            "⚠️ Старі дані БД замінено (однією транзакцією)."
         )
         await cb.message.edit_text(txt, reply_markup=back_to_admin())
 
@@ -119,31 +167,41 @@ async def sync_export_confirm(cb: types.CallbackQuery):
         "⚠️ <b>Підтвердження експорту</b>\n\n"
         "Експорт зробить наступне:\n"
         "• Оновить основну вкладку (A-AC)\n"
-        f"• Перезапише вкладку журналу подій: <b>{logs_title}</b>\n\n"
-        "Це безпечно для БД, але може затерти ручні правки у вкладці журналу."
+        f"• Допише нові події у вкладку журналу: <b>{logs_title}</b>\n\n"
+        "🔍 Звірка — ще й перепише блоки журналу, які розійшлися з БД.\n"
+        "♻️ Повний перезапис — очистить вкладку журналу (ручні правки в ній буде втрачено)."
     )
 
     await cb.message.edit_text(txt, reply_markup=_export_confirm_kb())
     await cb.answer()
 
 
-@router.callback_query(F.data == "sync_export_execute")
+@router.callback_query(F.data.startswith("sync_export_execute"))
 async def sync_export_execute(cb: types.CallbackQuery):
     if cb.from_user.id not in config.ADMIN_IDS:
         return await cb.answer("⛔ Тільки для адмінів", show_alert=True)
 
+    events_mode = (cb.data.split(":", 1)[1] if ":" in cb.data else "append") or "append"
+
     await cb.answer("⚙️ Експорт запускається...", show_alert=False)
     await cb.message.edit_text("⏳ <b>Експорт в Google Sheets...</b>\n\nЗачекайте, це може зайняти кілька секунд...")
 
     try:
-        await asyncio.to_thread(full_export)
+        summary = await sheets_executor().run(full_export, events_mode, priority=PRIORITY_ADMIN) or {}
 
         logs_title = _logs_title()
+        mode_txt = {
+            "append": "нові події дописано",
+            "verify": "звірено, змінені блоки переписано",
+            "rewrite": "повністю перезаписано",
+        }.get(events_mode, events_mode)
         txt = (
             "✅ <b>Експорт завершено!</b>\n\n"
             "📄 Дані з БД записані в Sheets:\n"
-            "• Основна вкладка (A-AC)\n"
-            f"• Вкладка {logs_title} (всі логи)\n"
+            f"• Основна вкладка (A-AC): змінено {summary.get('changed', 0)} "
+            f"(старіших, лишених як у таблиці: {summary.get('kept', 0)}), "
+            f"дописано {summary.get('appended', 0)}, без змін {summary.get('unchanged', 0)}\n"
+            f"• Вкладка {logs_title} ({mode_txt})\n"
         )
         await cb.message.edit_text(txt, reply_markup=back_to_admin())
 
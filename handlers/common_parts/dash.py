@@ -6,7 +6,9 @@ from aiogram.exceptions import TelegramBadRequest
 
 import config
 import database.db_api as db
+import database.db_async as adb
 from keyboards.builders import main_dashboard
+from utils.executors import sheets_read_timeout
 from utils.time import format_hours_hhmm
 
 
@@ -99,33 +101,119 @@ def _build_dash_text(user_id: int, user_name: str, banner: str | None = None) ->
     return txt, markup
 
 
-async def show_dash(msg: types.Message, user_id: int, user_name: str, banner: str | None = None):
-    # Тягнемо еталонний залишок палива з таблиці, щоб дашборд показував актуальне
+def _render_dash(user_id: int, user_name: str, banner: str | None = None):
+    """(txt, markup, (паливо, мотогодини)) — значення, з якими намальовано дашборд."""
+    txt, markup = _build_dash_text(user_id, user_name, banner)
+    st = db.get_state()
+    return txt, markup, _canonical_values(st)
+
+
+def _canonical_values(st: dict) -> tuple[float, float]:
     try:
-        from services.google_sync import sync_canonical_state_once
-        await asyncio.to_thread(sync_canonical_state_once)
+        return round(float(st.get("current_fuel") or 0.0), 1), round(float(st.get("total_hours") or 0.0), 2)
     except Exception:
-        pass
+        return 0.0, 0.0
+
+
+# --- stale-while-revalidate: еталон з таблиці підтягується у фоні ---
+# user_id -> куди і з чим намальовано останній дашборд (читає фонова таска, коли закінчить)
+_DASH_TARGETS: dict[int, dict] = {}
+# user_id -> фонова таска оновлення (одна на користувача)
+_REVALIDATE_TASKS: dict[int, asyncio.Task] = {}
+
+
+def forget_dash_message(chat_id: int, message_id: int):
+    """Повідомлення дашборда перейшло на інший екран — фонове оновлення його вже не редагує."""
+    for uid, target in list(_DASH_TARGETS.items()):
+        if target["chat_id"] == chat_id and target["message_id"] == message_id:
+            _DASH_TARGETS.pop(uid, None)
+
+
+def _schedule_revalidate(bot, user_id: int, user_name: str, banner: str | None, chat_id: int, message_id: int, values):
+    _DASH_TARGETS[user_id] = {
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "user_name": user_name,
+        "banner": banner,
+        "values": values,
+    }
+    task = _REVALIDATE_TASKS.get(user_id)
+    if task is not None and not task.done():
+        # вже оновлюється — та таска візьме найсвіжіший target
+        return
+    _REVALIDATE_TASKS[user_id] = asyncio.create_task(_revalidate(bot, user_id), name=f"dash_revalidate:{user_id}")
+
 
-    txt, markup = _build_dash_text(user_id, user_name, banner=banner)
+async def _revalidate(bot, user_id: int):
+    try:
+        # Тягнемо еталонний залишок палива з таблиці (дзеркало вкладки / TTL canonical-sync)
+        try:
+            from services.google_sync import sync_canonical_state_async
+            await asyncio.wait_for(sync_canonical_state_async(), timeout=sheets_read_timeout())
+        except Exception:
+            pass
 
+        while True:
+            target = _DASH_TARGETS.get(user_id)
+            if not target:
+                return
+
+            txt, markup, values = await adb.run(_render_dash, user_id, target["user_name"], target["banner"])
+            # поки рендерили, користувач міг піти з екрана (forget_dash_message) або
+            # відкрити новий дашборд — старе повідомлення не чіпаємо
+            if _DASH_TARGETS.get(user_id) is target:
+                break
+
+        _DASH_TARGETS.pop(user_id, None)
+        if values == target["values"]:
+            return
+
+        try:
+            await bot.edit_message_text(
+                txt,
+                chat_id=target["chat_id"],
+                message_id=target["message_id"],
+                reply_markup=markup,
+            )
+        except TelegramBadRequest:
+            # повідомлення видалено / не змінилось — нічого страшного
+            pass
+        except Exception:
+            pass
+    finally:
+        if _REVALIDATE_TASKS.get(user_id) is asyncio.current_task():
+            _REVALIDATE_TASKS.pop(user_id, None)
+
+
+async def show_dash(msg: types.Message, user_id: int, user_name: str, banner: str | None = None):
+    """Дашборд одразу з локального стану; еталон з таблиці — у фоні (редагує, лише якщо паливо/мотогодини змінились)."""
+    # усі DB-читання дашборда — одним переходом у DB-пул, не на event loop
+    txt, markup, values = await adb.run(_render_dash, user_id, user_name, banner)
+
+    shown = await _send_dash(msg, user_id, txt, markup)
+    if shown:
+        _schedule_revalidate(msg.bot, user_id, user_name, banner, shown[0], shown[1], values)
+
+
+async def _send_dash(msg: types.Message, user_id: int, txt: str, markup) -> tuple[int, int] | None:
+    """Показує дашборд; повертає (chat_id, message_id) повідомлення з ним."""
     # 1) Якщо це bot message (callback/екран) — редагуємо його
     try:
         await msg.edit_text(txt, reply_markup=markup)
         try:
-            db.set_ui_message(user_id, msg.chat.id, msg.message_id)
+            await adb.set_ui_message(user_id, msg.chat.id, msg.message_id)
         except Exception:
             pass
-        return
+        return msg.chat.id, msg.message_id
     except TelegramBadRequest as e:
         if "message is not modified" in str(e).lower():
-            return
+            return msg.chat.id, msg.message_id
     except Exception:
         pass
 
     # 2) Якщо редагувати не можна (наприклад /start) — видаляємо попередній дашборд та надсилаємо новий
     try:
-        prev = db.get_ui_message(user_id)
+        prev = await adb.get_ui_message(user_id)
         if prev:
             prev_chat_id, prev_msg_id = prev
             try:
@@ -137,6 +225,7 @@ async def show_dash(msg: types.Message, user_id: int, user_name: str, banner: st
 
     sent = await msg.answer(txt, reply_markup=markup)
     try:
-        db.set_ui_message(user_id, sent.chat.id, sent.message_id)
+        await adb.set_ui_message(user_id, sent.chat.id, sent.message_id)
     except Exception:
         pass
+    return sent.chat.id, sent.message_id
@@ -3,14 +3,21 @@ from aiogram.fsm.context import FSMContext
 from aiogram.exceptions import TelegramBadRequest
 from datetime import datetime
 
-import database.db_api as db
+import database.db_async as adb
 from handlers.user_parts.sheets_shift import shift_pretty
 from handlers.user_parts.utils import ensure_user
 
 router = Router()
 
 
-def _fmt_log_line(event_type: str, ts: str, user_name: str | None, value: str | None, driver: str | None) -> str:
+def _fmt_log_line(
+    event_type: str,
+    ts: str,
+    user_name: str | None,
+    value: str | None,
+    driver: str | None,
+    receipt_number: str | None = None,
+) -> str:
     # ts: 'YYYY-mm-dd HH:MM:SS'
     try:
         dt = datetime.strptime((ts or "").strip(), "%Y-%m-%d %H:%M:%S")
@@ -34,6 +41,8 @@ def _fmt_log_line(event_type: str, ts: str, user_name: str | None, value: str |
             receipt = parts[1].strip() if len(parts) > 1 else ""
         except Exception:
             pass
+        if not receipt:
+            receipt = (receipt_number or "").strip()
         extra = []
         if liters:
             extra.append(f"{liters} л")
@@ -65,18 +74,18 @@ def _fmt_log_line(event_type: str, ts: str, user_name: str | None, value: str |
 async def events_last(cb: types.CallbackQuery, state: FSMContext):
     await state.clear()
 
-    user = ensure_user(cb.from_user.id, cb.from_user.first_name)
+    user = await adb.run(ensure_user, cb.from_user.id, cb.from_user.first_name)
     if not user:
         return await cb.answer("⚠️ Спочатку натисніть /start", show_alert=True)
 
-    rows = db.get_last_logs(15)
+    rows = await adb.get_last_logs(15)
 
     if not rows:
         txt = "🕘 <b>Останні події</b>\n\nПоки немає записів."
     else:
         lines = []
-        for event_type, ts, u_name, value, driver_name in rows:
-            lines.append(_fmt_log_line(event_type, ts, u_name, value, driver_name))
+        for event_type, ts, u_name, value, driver_name, receipt_number in rows:
+            lines.append(_fmt_log_line(event_type, ts, u_name, value, driver_name, receipt_number))
 
         txt = "🕘 <b>Останні події</b> (15)\n\n" + "\n".join(lines)
 
@@ -8,6 +8,7 @@ from aiogram.fsm.state import State, StatesGroup
 
 import config
 import database.db_api as db
+import database.db_async as adb
 from handlers.common import show_dash
 from handlers.user_parts.utils import ensure_user, get_operator_personnel_name
 from keyboards.builders import main_dashboard, drivers_list
@@ -21,14 +22,19 @@ class RefillForm(StatesGroup):
     receipt = State()
 
 
+def _dashboard_markup(user_id: int):
+    role = 'admin' if user_id in config.ADMIN_IDS else 'manager'
+    return main_dashboard(role, db.get_state().get('active_shift', 'none'), db.get_today_completed_shifts())
+
+
 # --- ЗАПРАВКА ---
 @router.callback_query(F.data == "refill_init")
 async def refill_start(cb: types.CallbackQuery, state: FSMContext):
-    operator_personnel = get_operator_personnel_name(cb.from_user.id)
+    operator_personnel = await adb.run(get_operator_personnel_name, cb.from_user.id)
     if not operator_personnel:
         return await cb.answer("⚠️ Нема прив'язки до персоналу. Адмінка → Персонал.", show_alert=True)
 
-    drivers = db.get_drivers()
+    drivers = await adb.get_drivers()
     if not drivers:
         return await cb.answer("⚠️ Спочатку додайте водіїв в адмін-панелі", show_alert=True)
 
@@ -46,7 +52,7 @@ async def refill_driver(cb: types.CallbackQuery, state: FSMContext):
     await state.update_data(driver=driver_name)
     await cb.message.edit_text(
         f"Водій: <b>{driver_name}</b>\n🔢 Скільки літрів прийнято? (Напишіть цифру)",
-        reply_markup=main_dashboard('admin' if cb.from_user.id in config.ADMIN_IDS else 'manager', db.get_state().get('active_shift', 'none'), db.get_today_completed_shifts())
+        reply_markup=await adb.run(_dashboard_markup, cb.from_user.id)
     )
     await state.set_state(RefillForm.liters)
     await cb.answer()
@@ -73,7 +79,7 @@ async def refill_ask_receipt(msg: types.Message, state: FSMContext):
                     chat_id=chat_id,
                     message_id=message_id,
                     text="🧻 Введіть <b>номер чека</b>:",
-                    reply_markup=main_dashboard('admin' if msg.from_user.id in config.ADMIN_IDS else 'manager', db.get_state().get('active_shift', 'none'), db.get_today_completed_shifts())
+                    reply_markup=await adb.run(_dashboard_markup, msg.from_user.id)
                 )
             except TelegramBadRequest as e:
                 if "message is not modified" not in str(e).lower():
@@ -88,7 +94,7 @@ async def refill_ask_receipt(msg: types.Message, state: FSMContext):
                     chat_id=chat_id,
                     message_id=message_id,
                     text="❌ Введіть кількість літрів числом (1..500).",
-                    reply_markup=main_dashboard('admin' if msg.from_user.id in config.ADMIN_IDS else 'manager', db.get_state().get('active_shift', 'none'), db.get_today_completed_shifts())
+                    reply_markup=await adb.run(_dashboard_markup, msg.from_user.id)
                 )
             except Exception:
                 pass
@@ -110,7 +116,7 @@ async def refill_save(msg: types.Message, state: FSMContext):
                     chat_id=chat_id,
                     message_id=message_id,
                     text=err_txt,
-                    reply_markup=main_dashboard('admin' if msg.from_user.id in config.ADMIN_IDS else 'manager', db.get_state().get('active_shift', 'none'), db.get_today_completed_shifts())
+                    reply_markup=await adb.run(_dashboard_markup, msg.from_user.id)
                 )
             except Exception:
                 pass
@@ -125,7 +131,7 @@ async def refill_save(msg: types.Message, state: FSMContext):
     liters = data.get('liters')
     driver = data.get('driver')
 
-    user = ensure_user(msg.from_user.id, msg.from_user.first_name)
+    user = await adb.run(ensure_user, msg.from_user.id, msg.from_user.first_name)
     if not user:
         await state.clear()
         try:
@@ -134,7 +140,7 @@ async def refill_save(msg: types.Message, state: FSMContext):
             pass
         return
 
-    operator_personnel = get_operator_personnel_name(msg.from_user.id)
+    operator_personnel = await adb.run(get_operator_personnel_name, msg.from_user.id)
     if not operator_personnel:
         await state.clear()
         try:
@@ -145,7 +151,7 @@ async def refill_save(msg: types.Message, state: FSMContext):
 
     # FIX #8: Записуємо тільки в лог з receipt_number
     # current_fuel обчислюється з логів при імпорті/експорті, НЕ вручну!
-    db.add_log("refill", operator_personnel, str(liters), driver, receipt=receipt_num)
+    await adb.add_log("refill", operator_personnel, str(liters), driver, receipt=receipt_num)
 
     await state.clear()
 
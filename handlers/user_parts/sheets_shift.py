@@ -1,15 +1,14 @@
 from __future__ import annotations
 
-import os
 from datetime import datetime, timedelta
 
-import gspread
-from google.oauth2.service_account import Credentials
-
-import config
 import database.db_api as db
+import database.db_async as adb
+from services.google_sync_parts.client import validate_sync_prereqs
+from services.google_sync_parts.mirror import get_mirror
+from services.google_sync_parts.session import invalidate_session
+from services.google_sync_parts.throttle import retry_limit
 from utils.time import now_kiev
-from utils.sheets_dates import find_row_by_date_in_column_a
 from utils.sheets_guard import sheets_forced_offline
 
 
@@ -43,38 +42,29 @@ def shift_prev_required(code: str) -> str | None:
     }.get(code)
 
 
-def open_ws_sync():
-    if sheets_forced_offline():
-        return None
+async def get_sheet_shift_info():
+    """Повертає (sheet_ok, open_shift_code|None, completed_set, start_time_by_shift).
 
-    if not config.SHEET_ID:
-        return None
-    if not os.path.exists("service_account.json"):
-        return None
+    З event loop: рядок дати — з дзеркала вкладки, холодне читання — async-клієнтом.
+    """
+    if await adb.run(sheets_forced_offline) or not validate_sync_prereqs():
+        return False, None, set(), {}
 
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive.readonly",
-    ]
-    creds = Credentials.from_service_account_file("service_account.json", scopes=scopes)
-    client = gspread.authorize(creds)
-    ss = client.open_by_key(config.SHEET_ID)
-    return ss.worksheet(config.SHEET_NAME)
+    # натискання кнопки: не чекаємо всі повтори backoff-у — краще відповісти без таблиці
+    with retry_limit(1):
+        try:
+            view = await get_mirror().view_async(now_kiev().date())
+        except Exception as e:
+            # вкладка могла зникнути/перейменуватись — наступне натискання відкриє заново
+            invalidate_session(e)
+            raise
+    return _shift_info(view["row"], view["row_values"])
 
 
-def get_sheet_shift_info_sync():
-    """Повертає (sheet_ok, open_shift_code|None, completed_set, start_time_by_shift)."""
-    ws = open_ws_sync()
-    if not ws:
-        return False, None, set(), {}
-
-    today = now_kiev().date()
-    row = find_row_by_date_in_column_a(ws, today, config.SHEET_NAME)
+def _shift_info(row, row_values):
     if not row:
         return False, None, set(), {}
-
-    rng = ws.get(f"A{row}:I{row}")
-    vals = (rng[0] if rng else [])
+    vals = row_values[:9]
 
     def cell(col: int) -> str:
         idx = col - 1
@@ -5,20 +5,28 @@ from aiogram import Router, F, types
 
 import config
 import database.db_api as db
+import database.db_async as adb
 from handlers.common import show_dash
 from handlers.user_parts.sheets_shift import (
-    get_sheet_shift_info_sync,
+    get_sheet_shift_info,
     shift_pretty,
     shift_prev_required,
     sync_db_from_sheet_open_shift,
 )
 from handlers.user_parts.utils import ensure_user, get_operator_personnel_name
+from services.google_sync_parts.throttle import feeds_offline
+from utils.executors import sheets_read_timeout
 from utils.time import format_hours_hhmm, now_kiev
 
 
 router = Router()
 
 
+def _mark_sheet_fail():
+    db.sheet_mark_fail()
+    db.sheet_check_offline()
+
+
 def _within_work_window(now_t, start_t, end_t) -> bool:
     """True if now_t is inside [start_t, end_t) window.
 
@@ -33,29 +41,31 @@ def _within_work_window(now_t, start_t, end_t) -> bool:
 # --- СТАРТ ---
 @router.callback_query(F.data.in_({"m_start", "d_start", "e_start", "x_start"}))
 async def gen_start(cb: types.CallbackQuery):
-    st = db.get_state()
+    st = await adb.get_state()
 
-    operator_personnel = get_operator_personnel_name(cb.from_user.id)
+    operator_personnel = await adb.run(get_operator_personnel_name, cb.from_user.id)
     if not operator_personnel:
         return await cb.answer("⚠️ Нема прив'язки до персоналу. Адмінка → Персонал.", show_alert=True)
 
-    offline = db.sheet_is_offline()
+    offline = await adb.sheet_is_offline()
     sheet_ok, open_shift, completed_sheet, start_times = (False, None, set(), {})
 
     if not offline:
         try:
-            sheet_ok, open_shift, completed_sheet, start_times = await asyncio.to_thread(get_sheet_shift_info_sync)
+            sheet_ok, open_shift, completed_sheet, start_times = await asyncio.wait_for(
+                get_sheet_shift_info(), timeout=sheets_read_timeout()
+            )
             if sheet_ok:
-                db.sheet_mark_ok()
+                await adb.sheet_mark_ok()
             else:
-                db.sheet_mark_fail()
-                db.sheet_check_offline()
-        except Exception:
-            db.sheet_mark_fail()
-            db.sheet_check_offline()
+                await adb.run(_mark_sheet_fail)
+        except Exception as e:
+            # квота/5xx Google — не ознака недоступної таблиці (див. throttle.feeds_offline)
+            if feeds_offline(e):
+                await adb.run(_mark_sheet_fail)
 
     if sheet_ok and open_shift:
-        sync_db_from_sheet_open_shift(open_shift, start_times)
+        await adb.run(sync_db_from_sheet_open_shift, open_shift, start_times)
         return await cb.answer(
             f"⛔ ВЖЕ ПРАЦЮЄ! (Активна зміна: {shift_pretty(open_shift)})",
             show_alert=True
@@ -73,7 +83,7 @@ async def gen_start(cb: types.CallbackQuery):
             show_alert=True
         )
 
-    completed_db = db.get_today_completed_shifts()
+    completed_db = await adb.get_today_completed_shifts()
     completed_total = set(completed_db)
     if sheet_ok:
         completed_total |= set(completed_sheet)
@@ -105,11 +115,11 @@ async def gen_start(cb: types.CallbackQuery):
         # якщо конфіг часу некоректний — не блокуємо, але це має бути видно в логах (в іншому місці)
         pass
 
-    user = ensure_user(cb.from_user.id, cb.from_user.first_name)
+    user = await adb.run(ensure_user, cb.from_user.id, cb.from_user.first_name)
     if not user:
         return await cb.answer("⚠️ Спочатку натисніть /start", show_alert=True)
 
-    res = db.try_start_shift(cb.data, operator_personnel, now)
+    res = await adb.try_start_shift(cb.data, operator_personnel, now)
     if not res.get("ok"):
         if res.get("reason") == "already_on":
             active = res.get('active_shift', 'none')
@@ -127,36 +137,37 @@ async def gen_start(cb: types.CallbackQuery):
 # --- СТОП ---
 @router.callback_query(F.data.in_({"m_end", "d_end", "e_end", "x_end"}))
 async def gen_stop(cb: types.CallbackQuery):
-    st = db.get_state()
+    st = await adb.get_state()
 
-    operator_personnel = get_operator_personnel_name(cb.from_user.id)
+    operator_personnel = await adb.run(get_operator_personnel_name, cb.from_user.id)
     if not operator_personnel:
         return await cb.answer("⚠️ Нема прив'язки до персоналу. Адмінка → Персонал.", show_alert=True)
 
     expected_start = cb.data.replace("_end", "_start")
     expected_code = expected_start.split("_", 1)[0]
 
-    offline = db.sheet_is_offline()
+    offline = await adb.sheet_is_offline()
     sheet_ok, open_shift, completed_sheet, start_times = (False, None, set(), {})
 
     if not offline:
         try:
-            sheet_ok, open_shift, completed_sheet, start_times = await asyncio.to_thread(get_sheet_shift_info_sync)
+            sheet_ok, open_shift, completed_sheet, start_times = await asyncio.wait_for(
+                get_sheet_shift_info(), timeout=sheets_read_timeout()
+            )
             if sheet_ok:
-                db.sheet_mark_ok()
+                await adb.sheet_mark_ok()
             else:
-                db.sheet_mark_fail()
-                db.sheet_check_offline()
-        except Exception:
-            db.sheet_mark_fail()
-            db.sheet_check_offline()
+                await adb.run(_mark_sheet_fail)
+        except Exception as e:
+            # квота/5xx Google — не ознака недоступної таблиці (див. throttle.feeds_offline)
+            if feeds_offline(e):
+                await adb.run(_mark_sheet_fail)
 
     # Якщо в таблиці вже закрито — кнопкою СТОП нічого не пишемо, тільки синхронізуємо стан
     if sheet_ok and expected_code in completed_sheet:
-        db.set_state('status', 'OFF')
-        db.set_state('active_shift', 'none')
+        await adb.set_states({'status': 'OFF', 'active_shift': 'none'})
 
-        user = ensure_user(cb.from_user.id, cb.from_user.first_name)
+        user = await adb.run(ensure_user, cb.from_user.id, cb.from_user.first_name)
         if not user:
             return await cb.answer("⚠️ Спочатку натисніть /start", show_alert=True)
 
@@ -174,10 +185,9 @@ async def gen_stop(cb: types.CallbackQuery):
 
     # Якщо в таблиці НІЧОГО не відкрите, але бот думає, що ON — це саме кейс "закрили на ПК"
     if sheet_ok and (not open_shift) and st['status'] == 'ON':
-        db.set_state('status', 'OFF')
-        db.set_state('active_shift', 'none')
+        await adb.set_states({'status': 'OFF', 'active_shift': 'none'})
 
-        user = ensure_user(cb.from_user.id, cb.from_user.first_name)
+        user = await adb.run(ensure_user, cb.from_user.id, cb.from_user.first_name)
         if not user:
             return await cb.answer("⚠️ Спочатку натисніть /start", show_alert=True)
 
@@ -219,11 +229,11 @@ async def gen_stop(cb: types.CallbackQuery):
     except Exception:
         dur = 0.0
 
-    user = ensure_user(cb.from_user.id, cb.from_user.first_name)
+    user = await adb.run(ensure_user, cb.from_user.id, cb.from_user.first_name)
     if not user:
         return await cb.answer("⚠️ Спочатку натисніть /start", show_alert=True)
 
-    res = db.try_stop_shift(cb.data, operator_personnel, now)
+    res = await adb.try_stop_shift(cb.data, operator_personnel, now)
     if not res.get("ok"):
         if res.get("reason") == "already_off":
             return await cb.answer("⛔ Вже вимкнено.", show_alert=True)
@@ -247,13 +257,13 @@ async def gen_stop(cb: types.CallbackQuery):
 
     # Оновлюємо мотогодини (це правильно, бо вони не обчислюються з логів)
     try:
-        db.update_hours(float(dur or 0.0))
+        await adb.update_hours(float(dur or 0.0))
     except Exception:
         pass
 
     # Оновлюємо стан після закриття
     try:
-        st = db.get_state()
+        st = await adb.get_state()
     except Exception:
         st = {}
 
@@ -31,16 +31,21 @@ config.validate_env()
 
 import database.models as db_models
 import database.db_api as db
+import database.db_async as db_async
 from middlewares.auth import WhitelistMiddleware
+from middlewares.dash_screen import DashScreenMiddleware
 from middlewares.error_handler import ErrorHandlerMiddleware, global_error_handler
 
 # Імпорт хендлерів
 from handlers import common, user, admin
 
-# Імпорт сервісів (sync_loop тепер не використовується фонов о)
-# from services.google_sync import sync_loop
+# Імпорт сервісів (фоновий синк — за подіями БД, без опитування кожні 60 с)
+from services.google_sync import sync_worker
+from services.google_sync_parts.async_client import close_async_client
+from services.google_sync_parts.mirror import mirror_loop
 from services.scheduler import scheduler_loop
 from services.parser import parse_dtek_message
+from utils.executors import shutdown_executors
 
 
 def _safe_redis_target(url: str) -> str:
@@ -199,6 +204,7 @@ def build_dispatcher() -> Dispatcher:
     dp.update.outer_middleware(ErrorHandlerMiddleware())  # Перехоплювач помилок
     dp.message.outer_middleware(WhitelistMiddleware())    # Білий список
     dp.callback_query.outer_middleware(WhitelistMiddleware())
+    dp.callback_query.outer_middleware(DashScreenMiddleware())  # фонове оновлення дашборда не чіпає інші екрани
 
     logger.info("📋 Реєстрація роутерів...")
     dp.include_router(common.router)
@@ -214,7 +220,7 @@ async def run_polling_once(dp: Dispatcher):
     Один цикл polling:
     - ініціалізація БД (idempotent)
     - створення Bot
-    - старт фонових тасок (тільки scheduler, sync вимкнено)
+    - старт фонових тасок (scheduler + синк з Sheets за подіями, якщо SHEETS_SYNC_ENABLED)
     - start_polling
     - коректне скасування тасок і закриття сесії
     """
@@ -232,8 +238,11 @@ async def run_polling_once(dp: Dispatcher):
         )
 
         logger.info("🚀 Запуск фонових процесів...")
-        # Фоновий sync вимкнено: тепер тільки через кнопку в адмінці
-        # tasks.append(asyncio.create_task(_run_background_forever("google_sync", sync_loop), name="google_sync"))
+        # Синк з Sheets: прокидається на коміт змін (debounce) + рідкий fallback-цикл
+        if config.SHEETS_SYNC_ENABLED:
+            tasks.append(asyncio.create_task(_run_background_forever("google_sync", sync_worker), name="google_sync"))
+        # Дзеркало основної вкладки: одна таска оновлює, читачі (дашборд/кнопки змін) не ходять у таблицю
+        tasks.append(asyncio.create_task(_run_background_forever("sheet_mirror", mirror_loop), name="sheet_mirror"))
         tasks.append(asyncio.create_task(_run_background_forever("scheduler", scheduler_loop, bot), name="scheduler"))
 
         logger.info("=" * 50)
@@ -242,7 +251,10 @@ async def run_polling_once(dp: Dispatcher):
         logger.info(f"📊 Таблиця: {config.SHEET_NAME}")
         logger.info(f"👥 Адмінів: {len(config.ADMIN_IDS)}")
         logger.info(f"🔓 Реєстрація: {'Відкрита' if config.REGISTRATION_OPEN else 'Закрита'}")
-        logger.info("ℹ️ Фоновий синх з Sheets ВИМКНЕНО (тільки через кнопку в адмінці)")
+        if config.SHEETS_SYNC_ENABLED:
+            logger.info(f"🔄 Фоновий синх з Sheets: за подіями (debounce {config.SHEETS_SYNC_DEBOUNCE_SEC} с)")
+        else:
+            logger.info("ℹ️ Фоновий синх з Sheets ВИМКНЕНО (тільки через кнопку в адмінці)")
         logger.info("=" * 50)
         logger.info("Натисніть Ctrl+C для зупинки.")
 
@@ -278,6 +290,8 @@ async def run_polling_once(dp: Dispatcher):
             except Exception:
                 pass
 
+        await close_async_client()
+
 
 async def main():
     """
@@ -350,3 +364,7 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"💥 Фатальна помилка: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        db_async.shutdown(wait=False)
+        shutdown_executors(wait=False)
+        db_models.close_all_connections()
@@ -0,0 +1,20 @@
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+from handlers.common_parts.dash import forget_dash_message
+
+
+class DashScreenMiddleware(BaseMiddleware):
+    """Натискання кнопки під дашбордом = екран змінюється.
+
+    Фонове оновлення дашборда (stale-while-revalidate у show_dash) після цього
+    не редагує повідомлення — інакше воно перетерло б новий екран.
+    """
+
+    async def __call__(self, handler, event, data):
+        if isinstance(event, CallbackQuery) and event.message is not None:
+            try:
+                forget_dash_message(event.message.chat.id, event.message.message_id)
+            except Exception:
+                pass
+        return await handler(event, data)
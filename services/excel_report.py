@@ -3,11 +3,9 @@ import os
 from datetime import datetime, timedelta
 
 import aiohttp
-import gspread
-from google.auth.transport.requests import Request as GoogleRequest
-from google.oauth2.service_account import Credentials
 
 import config
+from services.google_sync_parts.session import SERVICE_ACCOUNT_FILE, get_session
 
 logger = logging.getLogger(__name__)
 
@@ -41,25 +39,17 @@ def _period_sheet_name(period: str) -> str:
     return _UA_MONTHS.get(last_day_prev.month, (config.SHEET_NAME or "").strip())
 
 
-def _build_creds() -> Credentials:
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive.readonly",
-    ]
-    return Credentials.from_service_account_file("service_account.json", scopes=scopes)
-
-
-async def _export_spreadsheet_xlsx(file_id: str, out_path: str, creds: Credentials) -> None:
+async def _export_spreadsheet_xlsx(file_id: str, out_path: str) -> None:
     """Експортує Google Spreadsheet як .xlsx (з усіма вкладками) з оригінальним форматуванням."""
-    # Оновлюємо токен
-    creds.refresh(GoogleRequest())
+    # Токен спільної сесії (оновлюється лише коли протух)
+    token = get_session().access_token()
 
     url = f"https://www.googleapis.com/drive/v3/files/{file_id}/export"
     params = {
         "mimeType": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     }
     headers = {
-        "Authorization": f"Bearer {creds.token}",
+        "Authorization": f"Bearer {token}",
     }
 
     async with aiohttp.ClientSession() as session:
@@ -87,18 +77,14 @@ async def generate_report(period: str):
         if not config.SHEET_ID:
             return None, "❌ SHEET_ID не знайдено"
 
-        if not os.path.exists("service_account.json"):
+        if not os.path.exists(SERVICE_ACCOUNT_FILE):
             return None, "❌ Файл service_account.json не знайдено"
 
         sheet_name = _period_sheet_name(period)
 
-        creds = _build_creds()
-
         # Перевіримо, що потрібна вкладка існує (щоб дати нормальну підказку в caption)
         try:
-            client = gspread.authorize(creds)
-            ss = client.open_by_key(config.SHEET_ID)
-            ws_names = [w.title for w in ss.worksheets()]
+            ws_names = get_session().worksheet_titles()
             if sheet_name and sheet_name not in ws_names:
                 logger.warning(f"⚠️ Вкладка '{sheet_name}' не знайдена. Доступні: {ws_names}")
                 # fallback: якщо конфіг/мапінг не співпав — хоч віддамо файл, але підкажемо вкладку
@@ -109,7 +95,7 @@ async def generate_report(period: str):
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"report_{period}_{ts}.xlsx"
 
-        await _export_spreadsheet_xlsx(config.SHEET_ID, filename, creds)
+        await _export_spreadsheet_xlsx(config.SHEET_ID, filename)
 
         caption = (
             f"📊 <b>Звіт (експорт оригінальної таблиці)</b>\n"
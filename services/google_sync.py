@@ -4,69 +4,115 @@ import logging
 import gspread
 
 import database.db_api as db
+import database.db_async as adb
 import config
 
+from utils.executors import PRIORITY_BACKGROUND, sheets_executor
 from utils.sheets_guard import sheets_forced_offline
 
-from services.google_sync_parts.client import validate_sync_prereqs, make_client, open_spreadsheet, open_main_worksheet
+from services.google_sync_parts.client import validate_sync_prereqs, open_spreadsheet, open_main_worksheet
+from services.google_sync_parts.session import invalidate_session
+from services.google_sync_parts.throttle import feeds_offline
 from services.google_sync_parts.offline import should_skip_offline_probe
-from services.google_sync_parts.canonical import sync_canonical_state_once
-from services.google_sync_parts.sync_cycle import run_sync_cycle
+from services.google_sync_parts.canonical import sync_canonical_state_async, sync_canonical_state_once
+from services.google_sync_parts.sync_cycle import SyncCycle
+from services.google_sync_parts.worker import SyncWorker
 
 logging.basicConfig(level=logging.INFO)
 
 
-__all__ = ["sync_loop", "sync_canonical_state_once"]
+__all__ = ["sync_loop", "sync_worker", "sync_tick", "sync_canonical_state_once", "sync_canonical_state_async"]
 
 
-async def sync_loop():
-    """Фоновий процес синхронізації"""
+def _prepare_cycle() -> SyncCycle:
+    ss = open_spreadsheet()
+    cycle = SyncCycle(ss, open_main_worksheet(ss))
+    cycle.prepare()
+    return cycle
+
+
+async def _sync_once():
+    # читання/БД — у потоці (throttle чекає, не блокуючи event loop), запис плану —
+    # з event loop через async-клієнт, canonical після запису — знову в потоці
+    cycle = await sheets_executor().run(_prepare_cycle, priority=PRIORITY_BACKGROUND)
+    await cycle.write_async()
+    await sheets_executor().run(cycle.finish, priority=PRIORITY_BACKGROUND)
+
+
+def _mark_fail():
+    db.sheet_mark_fail()
+    db.sheet_check_offline()
+
+
+def _prereqs_ok() -> bool:
     if not config.SHEET_ID:
         logging.error("❌ SHEET_ID не знайдено! Синхронізацію вимкнено.")
-        db.sheet_mark_fail()
-        db.sheet_check_offline()
-        return
+        _mark_fail()
+        return False
 
     if not validate_sync_prereqs():
         logging.error("❌ Файл service_account.json не знайдено! Синхронізацію вимкнено.")
-        db.sheet_mark_fail()
-        db.sheet_check_offline()
-        return
+        _mark_fail()
+        return False
+    return True
 
-    print(f"🚀 Google Sync запущено. Таблиця: {config.SHEET_NAME}")
 
-    while True:
+async def sync_tick() -> bool:
+    """Один цикл синку з усіма guard'ами. True — цикл відбувся без помилок."""
+    try:
+        # Примусовий OFFLINE: взагалі не ходимо в Sheets.
         try:
-            # Примусовий OFFLINE: взагалі не ходимо в Sheets.
-            try:
-                if sheets_forced_offline():
-                    await asyncio.sleep(60)
-                    continue
-            except Exception:
-                pass
-
-            # Авто OFFLINE: робимо пробу раз на N хвилин, щоб можна було відновитись.
-            if should_skip_offline_probe():
-                await asyncio.sleep(60)
-                continue
-
-            client = make_client()
-            ss = open_spreadsheet(client)
-            sheet = open_main_worksheet(ss)
-
-            run_sync_cycle(ss, sheet)
-
-        except gspread.exceptions.APIError as e:
-            db.sheet_mark_fail()
-            db.sheet_check_offline()
+            if await adb.run(sheets_forced_offline):
+                return False
+        except Exception:
+            pass
+
+        # Авто OFFLINE: робимо пробу раз на N хвилин, щоб можна було відновитись.
+        if await adb.run(should_skip_offline_probe):
+            return False
+
+        await _sync_once()
+        return True
+
+    except gspread.exceptions.APIError as e:
+        invalidate_session(e)
+        if feeds_offline(e):
+            await adb.run(_mark_fail)
             logging.error(f"❌ Google API Error: {e}")
-        except gspread.exceptions.SpreadsheetNotFound:
-            db.sheet_mark_fail()
-            db.sheet_check_offline()
-            logging.error(f"❌ Таблиця з ID {config.SHEET_ID} не знайдена!")
-        except Exception as e:
-            db.sheet_mark_fail()
-            db.sheet_check_offline()
-            logging.error(f"❌ Sync Error: {e}")
+        else:
+            # квота / тимчасова помилка Google після всіх повторів — не привід для OFFLINE
+            logging.warning(f"⏳ Google API тимчасово недоступний, цикл пропущено: {e}")
+    except gspread.exceptions.SpreadsheetNotFound:
+        invalidate_session()
+        await adb.run(_mark_fail)
+        logging.error(f"❌ Таблиця з ID {config.SHEET_ID} не знайдена!")
+    except Exception as e:
+        invalidate_session(e)
+        if feeds_offline(e):
+            await adb.run(_mark_fail)
+        logging.error(f"❌ Sync Error: {e}")
+    return False
 
+
+async def sync_loop():
+    """Фоновий процес синхронізації (опитування кожні 60 с; див. sync_worker)"""
+    if not await adb.run(_prereqs_ok):
+        return
+
+    print(f"🚀 Google Sync запущено. Таблиця: {config.SHEET_NAME}")
+
+    while True:
+        await sync_tick()
         await asyncio.sleep(60)
+
+
+async def sync_worker():
+    """Фоновий синк за подіями БД: debounce + один батчевий цикл, рідкий fallback."""
+    if not await adb.run(_prereqs_ok):
+        return
+
+    logging.info(
+        f"🚀 Google Sync (за подіями) запущено. Таблиця: {config.SHEET_NAME}, "
+        f"debounce {config.SHEETS_SYNC_DEBOUNCE_SEC} с, fallback {config.SHEETS_SYNC_FALLBACK_SEC} с"
+    )
+    await SyncWorker(sync_tick).run()
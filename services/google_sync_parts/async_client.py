@@ -0,0 +1,210 @@
+"""Async-клієнт Google Sheets API v4 на aiohttp (без потоків і без gspread).
+
+gspread синхронний: кожен запит з хендлера — перехід у пул потоків "sheets".
+Для гарячих шляхів (дзеркало вкладки, кнопки змін, canonical для дашборда,
+запис плану циклу синку) запити йдуть напряму з event loop:
+- одна aiohttp.ClientSession на процес (keep-alive до sheets.googleapis.com);
+- токен — зі спільної сесії (session.SheetsSession), оновлення — у пулі "sheets"
+  лише коли токен протух;
+- ті самі бакети квот, повтори і лічильники, що й у gspread
+  (throttle.call_with_limits_async), single-flight для однакових GET;
+- помилки — throttle.SheetsHTTPError, тож feeds_offline / invalidate_session і
+  стан OFFLINE працюють без змін.
+
+Виклики: metadata / worksheet_ref, values_batch_get, values_update /
+values_batch_update / values_append і batch_update (форматування, службові
+запити). Цикл синку пише план (SheetWritePlan.flush_async) через цей клієнт;
+повний експорт/імпорт лишаються на gspread у пулі "sheets" (utils.executors).
+"""
+
+import logging
+import time
+from urllib.parse import quote
+
+import aiohttp
+from gspread.exceptions import WorksheetNotFound
+
+import config
+from services.google_sync_parts.session import _READS, _ttl, get_session
+from services.google_sync_parts.singleflight import request_key
+from services.google_sync_parts.throttle import SheetsHTTPError, call_with_limits_async
+from utils.executors import sheets_executor
+
+logger = logging.getLogger(__name__)
+
+API_ROOT = "https://sheets.googleapis.com/v4/spreadsheets"
+_HTTP_TIMEOUT_SEC = 60
+
+
+def a1(title: str, rng: str) -> str:
+    """'Назва вкладки'!A1:B2 (як gspread.utils.absolute_range_name)."""
+    return "'{}'!{}".format(title.replace("'", "''"), rng)
+
+
+class SheetRef:
+    """Вкладка без gspread.Worksheet: ті самі spreadsheet_id / id / title для ключів кешів."""
+
+    __slots__ = ("spreadsheet_id", "id", "title")
+
+    def __init__(self, spreadsheet_id: str, sheet_id: int, title: str):
+        self.spreadsheet_id = spreadsheet_id
+        self.id = sheet_id
+        self.title = title
+
+    def __repr__(self):
+        return f"SheetRef({self.title!r}, id={self.id})"
+
+
+class AsyncSheetsClient:
+    """Запити до Sheets API v4 з event loop (спільний на процес)."""
+
+    def __init__(self):
+        self._http = None
+        self._refs = {}  # (spreadsheet_id, title) -> (SheetRef, ts, generation)
+
+    # --- транспорт ---
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=_HTTP_TIMEOUT_SEC),
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+            )
+        return self._http
+
+    async def close(self):
+        http, self._http = self._http, None
+        if http is not None and not http.closed:
+            await http.close()
+
+    async def _token(self) -> str:
+        token = get_session().cached_token()  # без локів сесії — не чекає потоків Sheets
+        if token:
+            return token
+        # оновлення токена — блокуючий запит google-auth (раз на ~годину)
+        return await sheets_executor().run(get_session().access_token)
+
+    async def _get(self, url: str, params=None) -> dict:
+        async def send():
+            headers = {"Authorization": f"Bearer {await self._token()}"}
+            async with self._session().get(url, params=params, headers=headers) as resp:
+                if resp.status >= 400:
+                    text = await resp.text()
+                    raise SheetsHTTPError(resp.status, text[:500])
+                return await resp.json()
+
+        key = request_key("GET", url, (), {"params": params})
+        return await _READS.do_async(key, lambda: call_with_limits_async("GET", send))
+
+    async def _write(self, method: str, url: str, *, params=None, json=None) -> dict:
+        """Запис (без single-flight): бакет квоти записів і ті самі повтори, що в gspread."""
+
+        async def send():
+            headers = {"Authorization": f"Bearer {await self._token()}"}
+            async with self._session().request(method, url, params=params, json=json, headers=headers) as resp:
+                if resp.status >= 400:
+                    text = await resp.text()
+                    raise SheetsHTTPError(resp.status, text[:500])
+                return await resp.json()
+
+        return await call_with_limits_async(method, send)
+
+    def _url(self, spreadsheet_id: str | None, suffix: str = "") -> str:
+        return f"{API_ROOT}/{spreadsheet_id or config.SHEET_ID}{suffix}"
+
+    # --- spreadsheet ---
+
+    async def metadata(self, fields: str | None = None, spreadsheet_id: str | None = None) -> dict:
+        params = {"fields": fields} if fields else None
+        return await self._get(self._url(spreadsheet_id), params=params)
+
+    async def batch_update(self, requests: list, spreadsheet_id: str | None = None) -> dict:
+        """spreadsheets.batchUpdate (формати, вставка рядків тощо)."""
+        return await self._write("POST", self._url(spreadsheet_id, ":batchUpdate"), json={"requests": requests})
+
+    async def worksheet_ref(self, title: str | None = None, spreadsheet_id: str | None = None) -> SheetRef:
+        """SheetRef вкладки за назвою (метадані кешуються на SHEETS_WS_TTL_SEC, як у session)."""
+        spreadsheet_id = spreadsheet_id or config.SHEET_ID
+        title = (title or config.SHEET_NAME or "").strip()
+        generation = get_session().generation
+        cached = self._refs.get((spreadsheet_id, title))
+        if cached is not None:
+            ref, ts, gen = cached
+            ttl = _ttl()
+            if gen == generation and ttl > 0 and (time.monotonic() - ts) < ttl:
+                return ref
+
+        meta = await self.metadata("sheets.properties(sheetId,title)", spreadsheet_id)
+        now = time.monotonic()
+        self._refs = {k: v for k, v in self._refs.items() if k[0] != spreadsheet_id}
+        for sheet in meta.get("sheets") or []:
+            props = sheet.get("properties") or {}
+            ref = SheetRef(spreadsheet_id, props.get("sheetId"), props.get("title") or "")
+            self._refs[(spreadsheet_id, ref.title)] = (ref, now, generation)
+
+        cached = self._refs.get((spreadsheet_id, title))
+        if cached is None:
+            raise WorksheetNotFound(title)
+        return cached[0]
+
+    # --- values ---
+
+    async def values_batch_get(self, ranges: list, params: dict | None = None, spreadsheet_id: str | None = None) -> list:
+        """Кілька діапазонів одним запитом: список значень на кожен діапазон (як Worksheet.batch_get)."""
+        query = dict(params or {})
+        query["ranges"] = list(ranges)
+        data = await self._get(self._url(spreadsheet_id, "/values:batchGet"), params=_multi(query))
+        return [vr.get("values") or [] for vr in (data.get("valueRanges") or [])]
+
+    async def values_update(
+        self, rng: str, values: list, input_option: str = "USER_ENTERED", spreadsheet_id: str | None = None
+    ) -> dict:
+        url = self._url(spreadsheet_id, f"/values/{quote(rng, safe='')}")
+        return await self._write(
+            "PUT", url, params={"valueInputOption": input_option}, json={"range": rng, "values": values}
+        )
+
+    async def values_batch_update(
+        self, data: list, input_option: str = "USER_ENTERED", spreadsheet_id: str | None = None
+    ) -> dict:
+        """data: [{"range": ..., "values": [[...]]}, ...] — як Spreadsheet.values_batch_update."""
+        body = {"valueInputOption": input_option, "data": data}
+        return await self._write("POST", self._url(spreadsheet_id, "/values:batchUpdate"), json=body)
+
+    async def values_append(
+        self,
+        rng: str,
+        values: list,
+        input_option: str = "USER_ENTERED",
+        insert_option: str = "INSERT_ROWS",
+        spreadsheet_id: str | None = None,
+    ) -> dict:
+        url = self._url(spreadsheet_id, f"/values/{quote(rng, safe='')}:append")
+        params = {"valueInputOption": input_option, "insertDataOption": insert_option}
+        return await self._write("POST", url, params=params, json={"values": values})
+
+
+def _multi(params: dict) -> list:
+    """Параметри з повторюваними ключами (ranges=...&ranges=...) для aiohttp."""
+    out = []
+    for k, v in params.items():
+        if isinstance(v, (list, tuple)):
+            out.extend((k, str(x)) for x in v)
+        elif v is not None:
+            out.append((k, str(v)))
+    return out
+
+
+_CLIENT = AsyncSheetsClient()
+
+
+def get_async_client() -> AsyncSheetsClient:
+    return _CLIENT
+
+
+async def close_async_client():
+    """Закриває спільну aiohttp-сесію (при зупинці бота)."""
+    try:
+        await _CLIENT.close()
+    except Exception as e:
+        logger.warning(f"⚠️ Не вдалося закрити HTTP-сесію Sheets: {e}")
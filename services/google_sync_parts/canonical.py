@@ -4,11 +4,15 @@ import time
 from datetime import datetime
 
 import database.db_api as db
+import database.db_async as adb
 import config
 
-from utils.sheets_dates import find_row_by_date_in_column_a
 from services.google_sync_parts.parsers import parse_float, parse_motohours_to_hours
-from services.google_sync_parts.client import make_client, validate_sync_prereqs
+from services.google_sync_parts.client import validate_sync_prereqs
+from services.google_sync_parts.mirror import get_mirror
+from services.google_sync_parts.session import invalidate_session
+from services.google_sync_parts.snapshot import SheetSnapshot
+from services.google_sync_parts.throttle import feeds_offline
 
 # --- Canonical sync cache (avoid hitting Google Sheet on every dashboard open) ---
 _CANONICAL_SYNC_LOCK = threading.Lock()
@@ -16,48 +20,41 @@ _LAST_CANONICAL_SYNC_TS = 0.0
 _CANONICAL_SYNC_TTL_SECONDS = 30
 
 
-def read_canonical_fuel_for_row(sheet, row: int) -> float | None:
+def read_canonical_fuel(snapshot: SheetSnapshot) -> float | None:
     """Таблиця = еталон. Беремо паливо з найактуальнішої колонки: O(15) -> M(13) -> K(11)."""
-    try:
-        evening = parse_float(sheet.cell(row, 15).value)  # O
-        if evening is not None:
-            return evening
-    except Exception:
-        pass
-
-    try:
-        remaining_mid = parse_float(sheet.cell(row, 13).value)  # M
-        if remaining_mid is not None:
-            return remaining_mid
-    except Exception:
-        pass
-
-    try:
-        morning = parse_float(sheet.cell(row, 11).value)  # K
-        if morning is not None:
-            return morning
-    except Exception:
-        pass
+    for col in (15, 13, 11):  # O (вечір) -> M (залишок) -> K (ранок)
+        try:
+            val = parse_float(snapshot.cell(col))
+            if val is not None:
+                return val
+        except Exception:
+            pass
 
     return None
 
 
-def sync_canonical_state_from_sheet(sheet):
-    """Підтягуємо еталонні значення з таблиці в БД."""
+def sync_canonical_state_from_sheet(sheet, snapshot: SheetSnapshot | None = None):
+    """Підтягуємо еталонні значення з таблиці в БД.
+
+    snapshot — знімок вкладки циклу синку (після записів має бути перечитаний
+    його рядок, щоб формули залишку вже врахували заправки).
+    """
     try:
         today = datetime.now(config.KYIV).date()
         today_str = today.strftime("%Y-%m-%d")
 
-        row = find_row_by_date_in_column_a(sheet, today, config.SHEET_NAME)
-        if not row:
+        if snapshot is None:
+            snapshot = SheetSnapshot.load(sheet, today)
+
+        if not snapshot.row:
             logging.warning(f"⚠️ Canonical sync: дата {today_str} не знайдена в колонці A")
             return
 
-        fuel_val = read_canonical_fuel_for_row(sheet, row)
+        fuel_val = read_canonical_fuel(snapshot)
         if fuel_val is not None:
             db.set_state("current_fuel", fuel_val)
 
-        moto_raw = sheet.cell(row, 17).value
+        moto_raw = snapshot.cell(17)
         moto_val = parse_motohours_to_hours(moto_raw)
         if moto_val is not None:
             db.set_total_hours(moto_val)
@@ -66,6 +63,35 @@ def sync_canonical_state_from_sheet(sheet):
         logging.error(f"❌ Помилка canonical sync: {e}", exc_info=True)
 
 
+def _mark_fail():
+    db.sheet_mark_fail()
+    db.sheet_check_offline()
+
+
+def _take_canonical_slot() -> bool:
+    """False — canonical-sync вже був за останні _CANONICAL_SYNC_TTL_SECONDS."""
+    global _LAST_CANONICAL_SYNC_TS
+
+    now_ts = time.monotonic()
+    with _CANONICAL_SYNC_LOCK:
+        if (now_ts - _LAST_CANONICAL_SYNC_TS) < _CANONICAL_SYNC_TTL_SECONDS:
+            return False
+        _LAST_CANONICAL_SYNC_TS = now_ts
+        return True
+
+
+def _release_canonical_slot():
+    global _LAST_CANONICAL_SYNC_TS
+
+    with _CANONICAL_SYNC_LOCK:
+        _LAST_CANONICAL_SYNC_TS = 0.0
+
+
+def _apply_snapshot(snapshot: SheetSnapshot):
+    db.sheet_mark_ok()
+    sync_canonical_state_from_sheet(snapshot.sheet, snapshot)
+
+
 def sync_canonical_state_once():
     """Разове оновлення еталонного стану (Sheet -> БД). Викликається з /start для актуального дашборду."""
     try:
@@ -75,28 +101,46 @@ def sync_canonical_state_once():
         return
 
     if not validate_sync_prereqs():
-        db.sheet_mark_fail()
-        db.sheet_check_offline()
+        _mark_fail()
         return
 
-    global _LAST_CANONICAL_SYNC_TS
+    if not _take_canonical_slot():
+        return
+
+    try:
+        # дзеркало вкладки: у таблицю йдемо лише якщо воно старше SHEETS_MIRROR_TTL_SEC
+        _apply_snapshot(SheetSnapshot.cached())
+
+    except Exception as e:
+        _release_canonical_slot()
+        invalidate_session(e)
+        if feeds_offline(e):
+            _mark_fail()
+        logging.error(f"❌ sync_canonical_state_once error: {e}")
 
-    now_ts = time.monotonic()
-    with _CANONICAL_SYNC_LOCK:
-        if (now_ts - _LAST_CANONICAL_SYNC_TS) < _CANONICAL_SYNC_TTL_SECONDS:
-            return
-        _LAST_CANONICAL_SYNC_TS = now_ts
 
+async def sync_canonical_state_async():
+    """Те саме з event loop: холодне читання дзеркала — async-клієнтом, БД — через пул "db"."""
     try:
-        client = make_client()
-        sheet = client.open_by_key(config.SHEET_ID).worksheet(config.SHEET_NAME)
+        if await adb.sheet_is_offline():
+            return
+    except Exception:
+        return
+
+    if not validate_sync_prereqs():
+        await adb.run(_mark_fail)
+        return
+
+    if not _take_canonical_slot():
+        return
 
-        db.sheet_mark_ok()
-        sync_canonical_state_from_sheet(sheet)
+    try:
+        view = await get_mirror().view_async()
+        await adb.run(_apply_snapshot, SheetSnapshot._from_view(view))
 
     except Exception as e:
-        with _CANONICAL_SYNC_LOCK:
-            _LAST_CANONICAL_SYNC_TS = 0.0
-        db.sheet_mark_fail()
-        db.sheet_check_offline()
-        logging.error(f"❌ sync_canonical_state_once error: {e}")
+        _release_canonical_slot()
+        invalidate_session(e)
+        if feeds_offline(e):
+            await adb.run(_mark_fail)
+        logging.error(f"❌ sync_canonical_state_async error: {e}")
@@ -1,11 +1,8 @@
 import os
 
-import gspread
-from google.oauth2.service_account import Credentials
-
 import config
 
-SERVICE_ACCOUNT_FILE = "service_account.json"
+from services.google_sync_parts.session import SERVICE_ACCOUNT_FILE, get_session
 
 
 def validate_sync_prereqs() -> bool:
@@ -17,17 +14,15 @@ def validate_sync_prereqs() -> bool:
 
 
 def make_client():
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-    return gspread.authorize(creds)
+    """Спільний авторизований клієнт (див. session.SheetsSession)."""
+    return get_session().client()
 
 
-def open_spreadsheet(client):
-    return client.open_by_key(config.SHEET_ID)
+def open_spreadsheet(client=None):
+    """Закешований spreadsheet config.SHEET_ID (client лишився для сумісності викликів)."""
+    return get_session().spreadsheet()
 
 
-def open_main_worksheet(ss):
-    return ss.worksheet(config.SHEET_NAME)
+def open_main_worksheet(ss=None):
+    """Закешована основна вкладка config.SHEET_NAME."""
+    return get_session().worksheet(config.SHEET_NAME)
@@ -5,16 +5,16 @@ import database.db_api as db
 import database.models as db_models
 import config
 
-from utils.sheets_dates import find_row_by_date_in_column_a
 from services.google_sync_parts.parsers import parse_float, parse_motohours_to_hours
+from services.google_sync_parts.snapshot import SheetSnapshot
 
 
 def db_has_logs_for_date(date_str: str) -> bool:
     try:
         with db_models.get_connection() as conn:
             row = conn.execute(
-                "SELECT 1 FROM logs WHERE timestamp LIKE ? LIMIT 1",
-                (f"{date_str}%",),
+                "SELECT 1 FROM logs WHERE event_date = ? LIMIT 1",
+                (date_str,),
             ).fetchone()
             return row is not None
     except Exception as e:
@@ -22,21 +22,26 @@ def db_has_logs_for_date(date_str: str) -> bool:
         return False
 
 
-def import_initial_state_from_sheet(sheet):
-    """Одноразовий імпорт (fallback) стартових значень на сьогодні."""
+def import_initial_state_from_sheet(sheet, snapshot: SheetSnapshot | None = None):
+    """Одноразовий імпорт (fallback) стартових значень на сьогодні.
+
+    snapshot — знімок вкладки циклу синку (без нього читається власний).
+    """
     try:
         today = datetime.now(config.KYIV).date()
         today_str = today.strftime("%Y-%m-%d")
 
-        row = find_row_by_date_in_column_a(sheet, today, config.SHEET_NAME)
-        if not row:
+        if snapshot is None:
+            snapshot = SheetSnapshot.load(sheet, today)
+
+        if not snapshot.row:
             logging.warning(
                 f"⚠️ Не можу імпортувати стартові значення: дата {today_str} не знайдена в колонці A"
             )
             return
 
-        fuel_raw = sheet.cell(row, 11).value
-        moto_raw = sheet.cell(row, 17).value
+        fuel_raw = snapshot.cell(11)
+        moto_raw = snapshot.cell(17)
 
         fuel_val = parse_float(fuel_raw)
         moto_val = parse_motohours_to_hours(moto_raw)
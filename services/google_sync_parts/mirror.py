@@ -0,0 +1,314 @@
+"""Дзеркало основної вкладки в пам'яті (SheetMirror).
+
+Тримаємо колонку A, AB:AC (водії/персонал) і рядки A:AC сьогоднішньої та
+вчорашньої дати. Оновлення — один batch_get (+1 запит, якщо рядок дати ще
+невідомий індексу дат):
+- фонова таска mirror_loop() оновлює дзеркало кожні SHEETS_MIRROR_TTL_SEC/2,
+  поки ним користуються (було читання за останні SHEETS_MIRROR_IDLE_SEC);
+- читачі (дашборд/canonical, кнопки змін) беруть дані з дзеркала; у таблицю
+  йде лише "холодне" читання — дзеркало порожнє або старше TTL (після простою);
+- цикл синку оновлює дзеркало своїм читанням (SheetSnapshot.load);
+- власні записи (SheetWritePlan.flush) оновлюють дзеркало одразу (оптимістично),
+  результати формул підтягне наступне оновлення.
+
+refresh()/view() — з потоку через gspread; refresh_async()/view_async() — з event
+loop через async_client (фонова таска, кнопки змін, дашборд) без потоків.
+
+SHEETS_MIRROR_TTL_SEC=0 — дзеркало вимкнено: кожне читання йде в таблицю.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import config
+import database.db_api as db
+import database.db_async as adb
+from services.google_sync_parts.async_client import a1, get_async_client
+from services.google_sync_parts.client import open_main_worksheet, validate_sync_prereqs
+from services.google_sync_parts.session import invalidate_session
+from services.google_sync_parts.throttle import feeds_offline
+from utils.sheets_dates import peek_row_by_date, seed_date_index
+from utils.sheets_guard import sheets_forced_offline
+
+logger = logging.getLogger(__name__)
+
+ROW_LAST_COL = "AC"
+ROW_WIDTH = 29  # A..AC
+DRIVERS_COL = 28  # AB
+PERSONNEL_COL = 29  # AC
+
+_LISTS_RANGE = "AB:AC"
+
+
+def _row_range(row: int) -> str:
+    return f"A{row}:{ROW_LAST_COL}{row}"
+
+
+def _first_row(value_range) -> list:
+    rows = list(value_range or [])
+    return list(rows[0]) if rows else []
+
+
+def _ws_key(ws):
+    return (getattr(ws, "spreadsheet_id", None), getattr(ws, "id", None), getattr(ws, "title", None))
+
+
+def _shown(value) -> str:
+    """Значення, записане USER_ENTERED, як його покаже таблиця (без апострофа-екрану)."""
+    s = "" if value is None else str(value)
+    return s[1:] if s.startswith("'") else s
+
+
+def _set(values: list, idx: int, value):
+    if idx >= len(values):
+        values.extend([""] * (idx + 1 - len(values)))
+    values[idx] = value
+
+
+def _ttl() -> float:
+    try:
+        return max(0.0, float(getattr(config, "SHEETS_MIRROR_TTL_SEC", 30)))
+    except Exception:
+        return 30.0
+
+
+def _idle() -> float:
+    try:
+        return max(0.0, float(getattr(config, "SHEETS_MIRROR_IDLE_SEC", 600)))
+    except Exception:
+        return 600.0
+
+
+class SheetMirror:
+    """Коротко-TTL копія основної вкладки на процес (потокобезпечна)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._async_refresh_lock = None  # asyncio.Lock (створюється в event loop)
+        self._key = None
+        self.sheet = None
+        self.col_a = []
+        self.lists = []
+        self.rows = {}  # номер рядка -> значення A:AC
+        self.days = {}  # дата -> номер рядка (None — дати в колонці A немає)
+        self.ts = 0.0
+        self.last_access = 0.0
+        self._stats = Counter()
+
+    def age(self) -> float:
+        with self._lock:
+            return (time.monotonic() - self.ts) if self._key is not None else float("inf")
+
+    def in_demand(self) -> bool:
+        return (time.monotonic() - self.last_access) < _idle()
+
+    def stats(self) -> dict:
+        """refreshes / reads (запити) / cold (читання на шляху користувача) / hits / optimistic."""
+        with self._lock:
+            out = dict(self._stats)
+            out["age_sec"] = round(self.age(), 1) if self._key is not None else None
+            return out
+
+    def invalidate(self):
+        with self._lock:
+            self._key = None
+            self.ts = 0.0
+
+    # --- читання з таблиці ---
+
+    def refresh(self, sheet=None) -> "SheetMirror":
+        """Перечитує дзеркало (один batch_get). Паралельні виклики чекають і беруть вже свіжий результат."""
+        requested = time.monotonic()
+        sheet = sheet or open_main_worksheet()
+        with self._refresh_lock:
+            with self._lock:
+                if self._key == _ws_key(sheet) and self.ts >= requested:
+                    return self
+            self._load(sheet)
+        return self
+
+    async def refresh_async(self, ref=None) -> "SheetMirror":
+        """Як refresh(), але з event loop через async-клієнт (без потоку)."""
+        requested = time.monotonic()
+        ref = ref or await get_async_client().worksheet_ref(config.SHEET_NAME)
+        if self._async_refresh_lock is None:
+            self._async_refresh_lock = asyncio.Lock()
+        async with self._async_refresh_lock:
+            with self._lock:
+                if self._key == _ws_key(ref) and self.ts >= requested:
+                    return self
+            await self._load_async(ref)
+        return self
+
+    @staticmethod
+    def _plan(sheet) -> tuple:
+        """Дати (сьогодні, вчора), вже відомі рядки і діапазони першого batch_get."""
+        today = datetime.now(config.KYIV).date()
+        days = (today, today - timedelta(days=1))
+        known = {d: peek_row_by_date(sheet, d, config.SHEET_NAME) for d in days}
+        known_rows = sorted({r for r in known.values() if r})
+        return days, known_rows, ["A:A", _LISTS_RANGE] + [_row_range(r) for r in known_rows]
+
+    @staticmethod
+    def _digest(sheet, days, known_rows, res) -> tuple:
+        col_a = [(r[0] if r else "") for r in (res[0] or [])]
+        lists = [list(r) for r in (res[1] or [])]
+        index = seed_date_index(sheet, col_a)
+
+        # колонка могла змінитись (рядки вставили вручну) — рядки беремо зі свіжої колонки A
+        fresh = {d: index.row_for(d, config.SHEET_NAME) for d in days}
+        rows = {r: _first_row(vr) for r, vr in zip(known_rows, res[2:]) if r in fresh.values()}
+        missing = sorted({r for r in fresh.values() if r and r not in rows})
+        return col_a, lists, fresh, rows, missing
+
+    def _load(self, sheet):
+        days, known_rows, ranges = self._plan(sheet)
+        res = sheet.batch_get(ranges)
+        col_a, lists, fresh, rows, missing = self._digest(sheet, days, known_rows, res)
+        reads = 1
+
+        if missing:
+            extra = sheet.batch_get([_row_range(r) for r in missing])
+            reads += 1
+            rows.update({r: _first_row(vr) for r, vr in zip(missing, extra)})
+
+        return self._store(sheet, col_a, lists, fresh, rows, reads)
+
+    async def _load_async(self, ref):
+        client = get_async_client()
+        days, known_rows, ranges = self._plan(ref)
+        res = await client.values_batch_get([a1(ref.title, r) for r in ranges])
+        col_a, lists, fresh, rows, missing = self._digest(ref, days, known_rows, res)
+        reads = 1
+
+        if missing:
+            extra = await client.values_batch_get([a1(ref.title, _row_range(r)) for r in missing])
+            reads += 1
+            rows.update({r: _first_row(vr) for r, vr in zip(missing, extra)})
+
+        return self._store(ref, col_a, lists, fresh, rows, reads)
+
+    def _store(self, sheet, col_a, lists, fresh, rows, reads) -> int:
+        with self._lock:
+            self._key = _ws_key(sheet)
+            self.sheet = sheet
+            self.col_a = col_a
+            self.lists = lists
+            self.rows = rows
+            self.days = fresh
+            self.ts = time.monotonic()
+            self._stats["refreshes"] += 1
+            self._stats["reads"] += reads
+        return reads
+
+    def _hit(self, sheet, day: date, ttl: float) -> bool:
+        with self._lock:
+            hit = self._key == _ws_key(sheet) and day in self.days and self.age() <= ttl and ttl > 0
+            self._stats["hits" if hit else "cold"] += 1
+            return hit
+
+    def view(self, day: date | None = None, *, sheet=None, max_age: float | None = None) -> dict:
+        """Дані для SheetSnapshot: з дзеркала, якщо воно не старше max_age (дефолт TTL), інакше перечитує."""
+        self.last_access = time.monotonic()
+        day = day or datetime.now(config.KYIV).date()
+        sheet = sheet or open_main_worksheet()
+        if not self._hit(sheet, day, _ttl() if max_age is None else max_age):
+            self.refresh(sheet)
+        return self._view(sheet, day)
+
+    async def view_async(self, day: date | None = None, *, max_age: float | None = None) -> dict:
+        """Як view(), але холодне читання — через async-клієнт ("sheet" у результаті — SheetRef)."""
+        self.last_access = time.monotonic()
+        day = day or datetime.now(config.KYIV).date()
+        ref = await get_async_client().worksheet_ref(config.SHEET_NAME)
+        if not self._hit(ref, day, _ttl() if max_age is None else max_age):
+            await self.refresh_async(ref)
+        return self._view(ref, day)
+
+    def _view(self, sheet, day: date) -> dict:
+        with self._lock:
+            row = self.days.get(day)
+            return {
+                "sheet": sheet,
+                "day": day,
+                "row": row,
+                "row_values": list(self.rows.get(row) or []),
+                "col_a": list(self.col_a),
+                "lists": [list(r) for r in self.lists],
+            }
+
+    # --- власні записи ---
+
+    def apply_cells(self, ws, cells: dict):
+        """Оптимістично застосовує записані клітинки {(row, col): value} (1-based)."""
+        with self._lock:
+            if self._key is None or _ws_key(ws) != self._key:
+                return
+            for (row, col), value in cells.items():
+                v = _shown(value)
+                if col == 1:
+                    _set(self.col_a, row - 1, v)
+                if row in self.rows:
+                    _set(self.rows[row], col - 1, v)
+                if col in (DRIVERS_COL, PERSONNEL_COL):
+                    while len(self.lists) < row:
+                        self.lists.append([])
+                    _set(self.lists[row - 1], col - DRIVERS_COL, v)
+            self._stats["optimistic"] += 1
+
+    def update_row(self, ws, row: int, values: list):
+        """Свіжо прочитаний рядок (SheetSnapshot.refresh_row)."""
+        with self._lock:
+            if self._key is not None and _ws_key(ws) == self._key and row in self.rows:
+                self.rows[row] = list(values)
+
+
+_MIRROR = SheetMirror()
+
+
+def get_mirror() -> SheetMirror:
+    return _MIRROR
+
+
+def mirror_stats() -> dict:
+    return _MIRROR.stats()
+
+
+def _mark_fail():
+    db.sheet_mark_fail()
+    db.sheet_check_offline()
+
+
+async def mirror_loop():
+    """Єдина фонова таска оновлення дзеркала (поки ним користуються)."""
+    mirror = get_mirror()
+    while True:
+        ttl = _ttl()
+        if ttl <= 0:
+            await asyncio.sleep(60)
+            continue
+
+        await asyncio.sleep(max(1.0, ttl / 2))
+
+        # ніхто не читав — не ходимо в таблицю; цикл синку щойно оновив — теж
+        if not mirror.in_demand() or mirror.age() < ttl / 2:
+            continue
+
+        try:
+            if not validate_sync_prereqs() or await adb.run(sheets_forced_offline) or await adb.sheet_is_offline():
+                continue
+        except Exception:
+            continue
+
+        try:
+            await mirror.refresh_async()
+        except Exception as e:
+            invalidate_session(e)
+            if feeds_offline(e):
+                await adb.run(_mark_fail)
+            logger.warning(f"⚠️ Дзеркало вкладки не оновлено: {e}")
@@ -0,0 +1,224 @@
+"""Спільна (на процес) сесія Google Sheets.
+
+Раніше кожен цикл синку, canonical-sync, імпорт/експорт і кожне натискання
+СТАРТ/СТОП заново читали service_account.json, робили gspread.authorize,
+open_by_key і .worksheet() — кілька HTTP-запитів ще до першого читання даних.
+
+Тут тримаємо:
+- одні Credentials + авторизований gspread-клієнт (токен оновлюється
+  автоматично AuthorizedSession, а для "сирих" запитів — через access_token());
+- закешований Spreadsheet і мапу {назва вкладки: Worksheet} з TTL
+  (config.SHEETS_WS_TTL_SEC);
+- invalidate() — скидання кешу після помилок API (вкладку перейменували/видалили,
+  таблицю переналаштували, відкликали доступ тощо).
+
+Потокобезпечно: усі звернення до Sheets йдуть з executor-потоків. Лок сесії
+тримається лише на перевірку/запис кешу, а не на мережевий запит: повільне
+(throttling, backoff) відкриття таблиці не блокує інші потоки з уже
+закешованими вкладками, а однакові паралельні відкриття об'єднує _FETCHES.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+import gspread
+from google.auth.transport.requests import Request as GoogleRequest
+from google.oauth2.service_account import Credentials
+from gspread.http_client import HTTPClient
+
+import config
+from services.google_sync_parts.singleflight import SingleFlight, request_key
+from services.google_sync_parts.throttle import call_with_limits, feeds_offline, http_status, throttle_stats
+from utils.sheets_dates import invalidate_date_index
+
+logger = logging.getLogger(__name__)
+
+SERVICE_ACCOUNT_FILE = "service_account.json"
+
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+
+
+_CALLS = threading.local()
+_READS = SingleFlight()
+_FETCHES = SingleFlight()  # open_by_key / worksheet / worksheets — по ключу таблиці і вкладки
+
+
+def api_calls() -> Counter:
+    """Лічильник запитів до Google API з поточного потоку {HTTP-метод: к-сть} (копія)."""
+    return Counter(getattr(_CALLS, "counts", None) or {})
+
+
+class SheetsHTTPClient(HTTPClient):
+    """HTTPClient gspread: ліміти квот і повтори (throttle.call_with_limits),
+    single-flight для однакових паралельних GET (singleflight.SingleFlight) +
+    лічильник запитів по потоку (для статистики циклу синку)."""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        def send():
+            counts = getattr(_CALLS, "counts", None)
+            if counts is None:
+                counts = _CALLS.counts = Counter()
+            counts[str(method).upper()] += 1
+            return super(SheetsHTTPClient, self).request(method, endpoint, *args, **kwargs)
+
+        key = request_key(method, endpoint, args, kwargs)
+        if key is None:
+            return call_with_limits(method, send)
+        return _READS.do(key, lambda: call_with_limits(method, send))
+
+
+def _ttl() -> float:
+    try:
+        return float(getattr(config, "SHEETS_WS_TTL_SEC", 600) or 0)
+    except Exception:
+        return 600.0
+
+
+class SheetsSession:
+    """Один авторизований клієнт + кеш spreadsheet/worksheet на процес."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._token_lock = threading.Lock()  # лише оновлення токена, не кеш
+        self._creds = None
+        self._client = None
+        self._ss = None
+        self._ss_key = None
+        self._ss_ts = 0.0
+        self._worksheets = {}
+        # росте на кожен invalidate(): async-клієнт звіряє з ним свій кеш вкладок
+        self.generation = 0
+
+    # --- клієнт / токен ---
+
+    def credentials(self) -> Credentials:
+        with self._lock:
+            if self._creds is None:
+                self._creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
+            return self._creds
+
+    def client(self) -> gspread.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = gspread.authorize(self.credentials(), http_client=SheetsHTTPClient)
+                logger.info("🔑 Google Sheets: клієнт авторизовано")
+            return self._client
+
+    def cached_token(self) -> str | None:
+        """Токен без мережевого запиту і без локів (можна з event loop); None — треба access_token()."""
+        creds = self._creds
+        if creds is None or not creds.valid:
+            return None
+        return creds.token
+
+    def access_token(self) -> str:
+        """Дійсний OAuth-токен (для прямих запитів до Drive/Sheets API поза gspread)."""
+        creds = self.credentials()
+        with self._token_lock:
+            if not creds.valid:
+                creds.refresh(GoogleRequest())
+            return creds.token
+
+    # --- spreadsheet / worksheet ---
+
+    def _fresh(self, ts: float) -> bool:
+        ttl = _ttl()
+        return ttl > 0 and (time.monotonic() - ts) < ttl
+
+    def spreadsheet(self, key: str | None = None) -> gspread.Spreadsheet:
+        key = key or config.SHEET_ID
+        with self._lock:
+            if self._ss is not None and self._ss_key == key and self._fresh(self._ss_ts):
+                return self._ss
+            client, generation = self.client(), self.generation
+
+        ss = _FETCHES.do(("ss", key), lambda: client.open_by_key(key))
+        with self._lock:
+            # invalidate() під час запиту — результат віддаємо, але не кешуємо
+            if self.generation == generation:
+                if self._ss_key != key:
+                    self._worksheets.clear()
+                self._ss, self._ss_key, self._ss_ts = ss, key, time.monotonic()
+        return ss
+
+    def worksheet(self, title: str | None = None, key: str | None = None) -> gspread.Worksheet:
+        """Worksheet за назвою (дефолт: config.SHEET_NAME). WorksheetNotFound прокидається далі."""
+        title = (title or config.SHEET_NAME or "").strip()
+        ss = self.spreadsheet(key)
+        with self._lock:
+            cached = self._worksheets.get(title)
+            if cached is not None and self._fresh(cached[1]) and cached[0].spreadsheet_id == ss.id:
+                return cached[0]
+            generation = self.generation
+
+        ws = _FETCHES.do(("ws", ss.id, title), lambda: ss.worksheet(title))
+        with self._lock:
+            if self.generation == generation and self._ss_key == ss.id:
+                self._worksheets[title] = (ws, time.monotonic())
+        return ws
+
+    def remember_worksheet(self, ws: gspread.Worksheet):
+        """Кладе у кеш щойно створену вкладку (після add_worksheet)."""
+        if ws is None:
+            return
+        with self._lock:
+            self._worksheets[ws.title] = (ws, time.monotonic())
+
+    def worksheet_titles(self, key: str | None = None) -> list[str]:
+        """Назви всіх вкладок (завжди свіжий запит метаданих; оновлює кеш вкладок)."""
+        ss = self.spreadsheet(key)
+        with self._lock:
+            generation = self.generation
+
+        wss = _FETCHES.do(("titles", ss.id), ss.worksheets)
+        now = time.monotonic()
+        with self._lock:
+            if self.generation == generation and self._ss_key == ss.id:
+                self._worksheets = {ws.title: (ws, now) for ws in wss}
+        return [ws.title for ws in wss]
+
+    def invalidate(self, *, worksheets_only: bool = False, client: bool = False):
+        """Скидає кеш. client=True — також перечитати ключ і авторизуватись заново."""
+        with self._lock:
+            self.generation += 1
+            self._worksheets.clear()
+            invalidate_date_index()
+            if worksheets_only:
+                return
+            self._ss = None
+            self._ss_key = None
+            self._ss_ts = 0.0
+            if client:
+                self._client = None
+                self._creds = None
+
+
+_SESSION = SheetsSession()
+
+
+def get_session() -> SheetsSession:
+    return _SESSION
+
+
+def invalidate_session(exc: Exception | None = None):
+    """Скидання кешу після помилки Sheets. 401/403 — ще й повторна авторизація.
+
+    Квота/5xx (див. throttle.feeds_offline) кеш не скидають — інакше повторне
+    відкриття таблиці лише додасть запитів під час throttling.
+    """
+    if exc is not None and not feeds_offline(exc):
+        return
+    status = http_status(exc) if exc is not None else None
+    _SESSION.invalidate(client=status in (401, 403))
+
+
+def sheets_api_stats() -> dict:
+    """Лічильники запитів до Sheets API (throttle.throttle_stats) + single-flight (flights, collapsed)."""
+    stats = throttle_stats()
+    stats.update(_READS.stats())
+    return stats
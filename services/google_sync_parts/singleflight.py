@@ -0,0 +1,107 @@
+"""Single-flight для однакових паралельних читань Sheets API.
+
+Якщо кілька потоків одночасно запитують той самий GET (та сама таблиця,
+діапазон і параметри — оператори разом відкрили дашборд/натиснули кнопки змін),
+у Google йде один запит, а решта чекає і отримує його результат (або ту саму
+помилку). Кешу немає: щойно запит завершився, наступний виклик іде заново.
+
+do() — для потоків (gspread), do_async() — для корутин async-клієнта.
+Лічильники: flights — реальних запитів через шар, collapsed — скільки викликів
+приєдналось до вже активного запиту.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._async_flights = {}
+        self._stats = Counter()
+
+    def do(self, key, fn):
+        """fn() один раз на key серед паралельних викликів."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["flights"] += 1
+            else:
+                self._stats["collapsed"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            # requests.Response: тіло дочитане до того, як його побачать інші потоки
+            getattr(flight.result, "content", None)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def do_async(self, key, fn):
+        """await fn() один раз на key серед паралельних корутин (один event loop).
+
+        Запит іде окремою задачею, а всі (і той, хто його почав) чекають її через
+        shield: таймаут/скасування одного виклику не скасовує запит для інших.
+        """
+        with self._lock:
+            task = self._async_flights.get(key)
+            if task is None or task.done():
+                task = self._async_flights[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda t: self._async_done(key, t))
+                self._stats["flights"] += 1
+            else:
+                self._stats["collapsed"] += 1
+        return await asyncio.shield(task)
+
+    def _async_done(self, key, task):
+        with self._lock:
+            if self._async_flights.get(key) is task:
+                del self._async_flights[key]
+        # результат міг нікого не дочекатись — без "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"flights": self._stats["flights"], "collapsed": self._stats["collapsed"]}
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def request_key(method: str, endpoint: str, args: tuple, kwargs: dict):
+    """Ключ для GET без тіла запиту; None — запит не об'єднується (записи, тіло, нестандартні аргументи)."""
+    if str(method).upper() != "GET" or args:
+        return None
+    if any(kwargs.get(k) is not None for k in ("data", "json", "files")):
+        return None
+    return (str(endpoint), _freeze(kwargs.get("params") or {}))
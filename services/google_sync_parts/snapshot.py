@@ -0,0 +1,92 @@
+"""Знімок основної вкладки для одного циклу синку / одного читача.
+
+Замість окремих col_values()/cell() у кожному під-кроці циклу (стартові значення,
+водії, персонал, canonical-sync) всі потрібні діапазони читаються одним batch_get
+через дзеркало вкладки (services.google_sync_parts.mirror):
+- колонка A (дати) — заодно оновлює кеш індексу дат (utils.sheets_dates);
+- AB:AC — водії і персонал;
+- A:AC рядків сьогоднішньої і вчорашньої дати.
+
+SheetSnapshot.load() — свіже читання (цикл синку, заодно оновлює дзеркало);
+SheetSnapshot.cached() — з дзеркала без запиту, якщо воно не старше TTL
+(дашборд, кнопки змін).
+"""
+
+import logging
+from datetime import date
+
+from services.google_sync_parts.mirror import DRIVERS_COL, _first_row, _row_range, get_mirror
+
+
+class SheetSnapshot:
+    """Значення основної вкладки, прочитані одним batch_get (або взяті з дзеркала)."""
+
+    def __init__(self, sheet, day: date | None = None):
+        self.sheet = sheet
+        self.day = day
+        self.row = None
+        self.row_values = []
+        self.col_a = []
+        self._lists = []
+        self.reads = 0
+
+    @classmethod
+    def _from_view(cls, view: dict, reads: int = 0) -> "SheetSnapshot":
+        snap = cls(view["sheet"], view["day"])
+        snap.row = view["row"]
+        snap.row_values = view["row_values"]
+        snap.col_a = view["col_a"]
+        snap._lists = view["lists"]
+        snap.reads = reads
+        return snap
+
+    @classmethod
+    def load(cls, sheet, day: date | None = None) -> "SheetSnapshot":
+        """Свіже читання вкладки (оновлює дзеркало)."""
+        mirror = get_mirror()
+        before = mirror.stats().get("reads", 0)
+        mirror.refresh(sheet)
+        reads = mirror.stats().get("reads", 0) - before
+        return cls._from_view(mirror.view(day, sheet=sheet, max_age=float("inf")), reads)
+
+    @classmethod
+    def cached(cls, day: date | None = None, sheet=None) -> "SheetSnapshot":
+        """З дзеркала (не старше SHEETS_MIRROR_TTL_SEC); у таблицю — лише якщо дзеркало застаріло."""
+        mirror = get_mirror()
+        before = mirror.stats().get("reads", 0)
+        view = mirror.view(day, sheet=sheet)
+        return cls._from_view(view, mirror.stats().get("reads", 0) - before)
+
+    def refresh_row(self):
+        """Перечитує лише рядок дати (наприклад, після записів, щоб підхопити формули)."""
+        if not self.row:
+            return
+        self.row_values = _first_row(self.sheet.get(_row_range(self.row)))
+        self.reads += 1
+        get_mirror().update_row(self.sheet, self.row, self.row_values)
+
+    def cell(self, col: int) -> str:
+        """Значення клітинки рядка дати (1-based колонка), '' якщо порожньо/нема рядка."""
+        idx = col - 1
+        if idx < 0 or idx >= len(self.row_values):
+            return ""
+        v = self.row_values[idx]
+        return "" if v is None else str(v)
+
+    def column(self, col: int) -> list[str]:
+        """Значення колонки AB або AC (з 1-го рядка), як col_values()."""
+        idx = col - DRIVERS_COL
+        if idx not in (0, 1):
+            raise ValueError(f"Колонка {col} не входить у знімок")
+        values = [(str(r[idx]) if len(r) > idx and r[idx] is not None else "") for r in self._lists]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+def load_snapshot(sheet, day: date | None = None) -> SheetSnapshot | None:
+    try:
+        return SheetSnapshot.load(sheet, day)
+    except Exception as e:
+        logging.error(f"⚠️ Не вдалося прочитати знімок вкладки: {e}")
+        return None
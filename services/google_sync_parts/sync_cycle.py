@@ -1,22 +1,31 @@
 import logging
+from collections import Counter
 from datetime import datetime
 
-from gspread.utils import rowcol_to_a1
-
 import database.db_api as db
+import database.db_async as adb
 import config
 
 from utils.sheets_dates import find_row_by_date_in_column_a
 from services.google_sync_parts.canonical import sync_canonical_state_from_sheet
 from services.google_sync_parts.initial_import import import_initial_state_from_sheet
-from services.sheets_sync.logs_tab import ensure_logs_worksheet, ensure_logs_header, upsert_log_row
-from services.sheets_sync.refill import update_refill_aggregates_for_date
-
-
-def sync_drivers_from_sheet(sheet):
+from services.google_sync_parts.session import api_calls
+from services.google_sync_parts.snapshot import load_snapshot, SheetSnapshot
+from services.sheets_sync.batch import SheetWritePlan
+from services.sheets_sync.logs_tab import (
+    ensure_logs_header,
+    ensure_logs_rows,
+    ensure_logs_worksheet,
+    log_row_values,
+    logs_row_for_id,
+)
+from services.sheets_sync.refill import plan_refill_aggregates_for_date
+
+
+def sync_drivers_from_sheet(sheet, snapshot: SheetSnapshot | None = None):
     # --- ВОДІЇ з таблиці (AB=28) ---
     try:
-        drivers_raw = sheet.col_values(28)[2:]
+        drivers_raw = (snapshot.column(28) if snapshot else sheet.col_values(28))[2:]
         drivers_clean = [d.strip() for d in drivers_raw if d.strip()]
         if drivers_clean:
             db.sync_drivers_from_sheet(drivers_clean)
@@ -24,10 +33,10 @@ def sync_drivers_from_sheet(sheet):
         logging.error(f"⚠️ Не вдалося прочитати список водіїв: {e}")
 
 
-def sync_personnel_from_sheet(sheet):
+def sync_personnel_from_sheet(sheet, snapshot: SheetSnapshot | None = None):
     # --- ПЕРСОНАЛ з таблиці (AC=29) ---
     try:
-        personnel_raw = sheet.col_values(29)[2:]
+        personnel_raw = (snapshot.column(29) if snapshot else sheet.col_values(29))[2:]
         personnel_clean = [p.strip() for p in personnel_raw if p.strip()]
         if personnel_clean:
             db.sync_personnel_from_sheet(personnel_clean)
@@ -35,20 +44,64 @@ def sync_personnel_from_sheet(sheet):
         logging.error(f"⚠️ Не вдалося прочитати список персоналу: {e}")
 
 
-def process_unsynced_logs(sheet, ss):
+# Основна вкладка: подія зміни -> (колонка часу, колонка користувача)
+_SHIFT_EVENT_COLS = {
+    "m_start": (2, 19),
+    "m_end": (3, 20),
+    "d_start": (4, 21),
+    "d_end": (5, 22),
+    "e_start": (6, 23),
+    "e_end": (7, 24),
+    "x_start": (8, 25),
+    "x_end": (9, 26),
+}
+
+
+class LogsSyncPlan:
+    """Записи несинхронізованих подій: план на вкладку журналу і основну вкладку."""
+
+    def __init__(self, logs: list, logs_plan: SheetWritePlan | None, main_plan: SheetWritePlan, ids_to_mark: list):
+        self.logs = logs
+        self.logs_plan = logs_plan
+        self.main_plan = main_plan
+        self.ids_to_mark = ids_to_mark
+        self.logs_cells = len(logs_plan) if logs_plan is not None else 0
+        self.main_cells = len(main_plan)
+
+    def done(self) -> int:
+        """Після успішного запису: позначає події (БД) і повертає к-сть клітинок основної вкладки."""
+        if self.ids_to_mark:
+            db.mark_synced(self.ids_to_mark)
+
+        logging.info(
+            f"📤 Sync: подій {len(self.logs)}, позначено {len(self.ids_to_mark)}; "
+            f"клітинок: журнал {self.logs_cells}, основна {self.main_cells}"
+        )
+        return self.main_cells
+
+
+def plan_unsynced_logs(sheet, ss) -> LogsSyncPlan | None:
+    """Будує план записів несинхронізованих подій (читання/БД — у потоці).
+
+    None — подій немає або план не вдалось побудувати (наступний цикл повторить).
+    """
     logs_ws = ensure_logs_worksheet(ss)
     ensure_logs_header(logs_ws)
 
     logs = db.get_unsynced()
     if not logs:
         # canonical sync все одно робимо після циклу
-        return
+        return None
 
     ids_to_mark = []
     date_row_cache = {}
+    refill_rows = {}
+
+    logs_plan = SheetWritePlan(logs_ws) if logs_ws else None
+    main_plan = SheetWritePlan(sheet)
 
     for l in logs:
-        lid, ltype, ltime, luser, lval, ldriver, _ = l
+        lid, ltype, ltime, luser, lval, ldriver, lreceipt = l
 
         try:
             log_date_str = (ltime or "").split(" ")[0]
@@ -57,23 +110,15 @@ def process_unsynced_logs(sheet, ss):
             log_date_str = ""
             log_time_hhmm = ""
 
-        # 1) Запис у ОКРЕМУ вкладку журналу — idempotent
-        if logs_ws:
-            try:
-                upsert_log_row(
-                    logs_ws,
-                    lid,
-                    ltime or "",
-                    ltype or "",
-                    luser or "",
-                    lval or "",
-                    ldriver or "",
-                )
-            except Exception as e:
-                logging.error(f"❌ Logs-tab upsert error lid={lid}: {e}")
-                continue
+        # 1) Рядок в ОКРЕМІЙ вкладці журналу — idempotent (один log_id = один рядок)
+        if logs_plan is not None:
+            logs_plan.set_row(
+                logs_row_for_id(lid),
+                1,
+                log_row_values(lid, ltime or "", ltype or "", luser or "", lval or "", ldriver or "", lreceipt or ""),
+            )
 
-        # 2) Оновлення ОСНОВНОЇ вкладки (як було), але refill робимо idempotent
+        # 2) Основна вкладка: клітинки рядка дати
         if log_date_str:
             try:
                 log_date_obj = datetime.strptime(log_date_str, "%Y-%m-%d").date()
@@ -90,81 +135,117 @@ def process_unsynced_logs(sheet, ss):
 
                 r = date_row_cache.get(log_date_str)
 
-                # REFILL: агрегуємо (може бути декілька заправок)
+                # REFILL: агрегати за день перераховуються один раз на дату (нижче)
                 if ltype == "refill":
-                    try:
-                        if r:
-                            update_refill_aggregates_for_date(sheet, r, log_date_str)
-                        ids_to_mark.append(lid)
-                    except Exception as e:
-                        logging.error(f"❌ Refill sync error lid={lid}: {e}")
+                    if r:
+                        refill_rows[log_date_str] = r
+                    ids_to_mark.append(lid)
                     continue
 
-                col = None
-                user_col = None
-
-                if ltype == "m_start":
-                    col = 2
-                    user_col = 19
-                elif ltype == "m_end":
-                    col = 3
-                    user_col = 20
-                elif ltype == "d_start":
-                    col = 4
-                    user_col = 21
-                elif ltype == "d_end":
-                    col = 5
-                    user_col = 22
-                elif ltype == "e_start":
-                    col = 6
-                    user_col = 23
-                elif ltype == "e_end":
-                    col = 7
-                    user_col = 24
-                elif ltype == "x_start":
-                    col = 8
-                    user_col = 25
-                elif ltype == "x_end":
-                    col = 9
-                    user_col = 26
-
+                col, user_col = _SHIFT_EVENT_COLS.get(ltype, (None, None))
                 if col and r:
-                    try:
-                        sheet.update(
-                            range_name=rowcol_to_a1(r, col),
-                            values=[[log_time_hhmm]],
-                            value_input_option="USER_ENTERED",
-                        )
-
-                        if user_col and luser:
-                            sheet.update(
-                                range_name=rowcol_to_a1(r, user_col),
-                                values=[[luser]],
-                                value_input_option="RAW",
-                            )
-
-                    except Exception as e:
-                        logging.error(f"❌ Event sync error lid={lid}: {e}")
+                    main_plan.set(r, col, log_time_hhmm)
+                    if user_col and luser:
+                        main_plan.set(r, user_col, luser, raw=True)
 
                 ids_to_mark.append(lid)
 
         else:
             ids_to_mark.append(lid)
 
-    if ids_to_mark:
-        db.mark_synced(ids_to_mark)
+    for date_str, r in refill_rows.items():
+        try:
+            plan_refill_aggregates_for_date(main_plan, r, date_str)
+        except Exception as e:
+            logging.error(f"❌ Refill sync error date={date_str}: {e}")
+            return None
+
+    plan = LogsSyncPlan(logs, logs_plan, main_plan, ids_to_mark)
+
+    # рядки вкладки журналу додаються до запису (запит gspread — теж у потоці)
+    if logs_plan is not None and plan.logs_cells:
+        try:
+            ensure_logs_rows(logs_ws, logs_plan.max_row())
+        except Exception as e:
+            logging.error(f"❌ Logs-tab batch write error ({plan.logs_cells} клітинок): {e}")
+            return None
+    return plan
+
 
+async def flush_unsynced_logs_async(plan: LogsSyncPlan) -> int:
+    """Flush з event loop (async-клієнт): один запит на вкладку.
 
-def run_sync_cycle(ss, sheet):
-    """Один цикл синхронізації (без offline-guard і без sleep)."""
-    db.sheet_mark_ok()
+    Повертає к-сть запитів; -1 — помилка запису (події не позначаються, наступний
+    цикл повторить план — усі записи idempotent).
+    """
+    requests = 0
+    if plan.logs_plan is not None and plan.logs_cells:
+        try:
+            requests += await plan.logs_plan.flush_async()
+        except Exception as e:
+            logging.error(f"❌ Logs-tab batch write error ({plan.logs_cells} клітинок): {e}")
+            return -1
 
-    import_initial_state_from_sheet(sheet)
-    sync_drivers_from_sheet(sheet)
-    sync_personnel_from_sheet(sheet)
+    try:
+        requests += await plan.main_plan.flush_async()
+    except Exception as e:
+        logging.error(f"❌ Main-tab batch write error ({plan.main_cells} клітинок): {e}")
+        return -1
+    return requests
+
+
+class SyncCycle:
+    """Цикл синку по кроках: prepare (потік) -> запис плану (event loop) -> finish (потік).
+
+    api_calls() рахує запити по потоку, тож кроки з різних потоків складаються в calls.
+    """
+
+    def __init__(self, ss, sheet):
+        self.ss = ss
+        self.sheet = sheet
+        self.snapshot = None
+        self.plan = None
+        self.written = 0
+        self.calls = Counter()
+
+    def prepare(self):
+        calls_before = api_calls()
+        db.sheet_mark_ok()
+
+        # Усі читання циклу — один batch_get (колонка A, водії/персонал, рядок сьогодні)
+        self.snapshot = load_snapshot(self.sheet)
+        if self.snapshot is not None:
+            import_initial_state_from_sheet(self.sheet, self.snapshot)
+            sync_drivers_from_sheet(self.sheet, self.snapshot)
+            sync_personnel_from_sheet(self.sheet, self.snapshot)
+
+        self.plan = plan_unsynced_logs(self.sheet, self.ss)
+        self.calls += api_calls() - calls_before
+
+    async def write_async(self):
+        if self.plan is None:
+            return
+        requests = await flush_unsynced_logs_async(self.plan)
+        if requests >= 0:
+            self.calls["POST"] += requests
+            self.written = await adb.run(self.plan.done)
+
+    def finish(self):
+        calls_before = api_calls()
+        snapshot = self.snapshot
+
+        # canonical sync робимо ПІСЛЯ записів у Sheet,
+        # щоб залишок у БД одразу підтягнувся після заправки/формул.
+        if snapshot is not None and self.written:
+            try:
+                snapshot.refresh_row()
+            except Exception as e:
+                logging.error(f"⚠️ Не вдалося перечитати рядок дати: {e}")
+                snapshot = None
+        sync_canonical_state_from_sheet(self.sheet, snapshot)
 
-    process_unsynced_logs(sheet, ss)
+        calls = self.calls + (api_calls() - calls_before)
+        if calls:
+            details = ", ".join(f"{method} {n}" for method, n in sorted(calls.items()))
+            logging.info(f"📊 Sync-цикл: API-запитів {sum(calls.values())} ({details})")
 
-    # canonical sync робимо ПІСЛЯ записів у Sheet,
-    # щоб залишок у БД одразу підтягнувся після заправки/формул.
-    sync_canonical_state_from_sheet(sheet)
@@ -0,0 +1,259 @@
+"""Обмеження частоти і повтори запитів до Google Sheets API.
+
+- token bucket окремо для читань (GET) і записів (решта методів) під квоти Google
+  "на хвилину на користувача" (config.SHEETS_READ_PER_MIN / SHEETS_WRITE_PER_MIN);
+  запит чекає токен, а не отримує 429. Запас токенів (SHEETS_BURST, дефолт —
+  rate/6, тобто ~10 с квоти) малий: повний запас на всю хвилину плюс поповнення
+  дали б ~2× квоти за першу хвилину;
+- 429 / 5xx (і обрив з'єднання) — повтор з експоненційним backoff + jitter
+  (config.SHEETS_RETRY_MAX, SHEETS_RETRY_BASE_SEC);
+- feeds_offline(exc): лише "справжні" помилки (403, 404, 400, ...) ведуть
+  до sheet_mark_fail і авто-OFFLINE; квота/5xx, що не пройшли після повторів, — ні.
+
+call_with_limits — для gspread (потоки пулу "sheets"), call_with_limits_async —
+для async-клієнта (async_client); бакети і лічильники спільні.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+from gspread.exceptions import APIError
+
+import config
+from utils.executors import ExecutorError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+_MAX_BACKOFF_SEC = 64.0
+
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "requests": 0,
+    "reads": 0,
+    "writes": 0,
+    "throttled": 0,
+    "throttle_wait_ms": 0,
+    "retried": 0,
+    "retry_exhausted": 0,
+    "errors": 0,
+}
+
+
+def _cfg_float(name: str, default: float) -> float:
+    try:
+        return float(getattr(config, name, default))
+    except Exception:
+        return float(default)
+
+
+def _inc(**deltas):
+    with _STATS_LOCK:
+        for k, v in deltas.items():
+            _STATS[k] = _STATS.get(k, 0) + v
+
+
+def throttle_stats() -> dict:
+    """Лічильники: requests/reads/writes, throttled (+ throttle_wait_ms), retried, retry_exhausted, errors."""
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+class TokenBucket:
+    """Потокобезпечний token bucket: rate_per_min токенів на хвилину, не більше burst в запасі
+    (дефолт: rate_per_min / 6 — за будь-яку хвилину не більше ~7/6 квоти)."""
+
+    def __init__(self, rate_per_min: float, burst: float | None = None):
+        self.rate = max(0.0, float(rate_per_min)) / 60.0
+        self.burst = burst
+        self.capacity = max(1.0, float(burst) if burst else float(rate_per_min) / 6.0)
+        self._tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def _take(self) -> float:
+        """0 — токен взято, інакше скільки секунд чекати до наступного."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Бере токен (чекає, якщо треба). Повертає час очікування, с. rate=0 — без ліміту."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            need = self._take()
+            if need <= 0:
+                return waited
+            time.sleep(need)
+            waited += need
+
+    async def acquire_async(self) -> float:
+        """Як acquire(), але чекає через asyncio.sleep (не блокує event loop)."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            need = self._take()
+            if need <= 0:
+                return waited
+            await asyncio.sleep(need)
+            waited += need
+
+
+# contextvar, а не threading.local: діє і в потоці пулу, і в межах asyncio-таски
+_MAX_RETRIES = contextvars.ContextVar("sheets_max_retries", default=None)
+
+
+@contextlib.contextmanager
+def retry_limit(max_retries: int):
+    """Менше повторів у межах блоку (потік / таска) — для інтерактивних запитів з хендлерів."""
+    token = _MAX_RETRIES.set(max(0, int(max_retries)))
+    try:
+        yield
+    finally:
+        _MAX_RETRIES.reset(token)
+
+
+class SheetsHTTPError(Exception):
+    """HTTP-помилка Sheets API з async-клієнта (аналог gspread APIError)."""
+
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(f"{status}: {message}" if message else str(status))
+        self.status = status
+
+
+_BUCKETS_LOCK = threading.Lock()
+_BUCKETS = {}
+
+
+def _bucket(kind: str) -> TokenBucket:
+    rate = _cfg_float("SHEETS_READ_PER_MIN" if kind == "read" else "SHEETS_WRITE_PER_MIN", 60)
+    burst = _cfg_float("SHEETS_BURST", 0)
+    with _BUCKETS_LOCK:
+        b = _BUCKETS.get(kind)
+        if b is None or abs(b.rate * 60.0 - rate) > 1e-9 or b.burst != burst:
+            b = _BUCKETS[kind] = TokenBucket(rate, burst)
+        return b
+
+
+def http_status(exc: Exception) -> int | None:
+    """HTTP-статус помилки Sheets (gspread APIError або SheetsHTTPError), None — не HTTP."""
+    if isinstance(exc, SheetsHTTPError):
+        return exc.status
+    try:
+        return int(getattr(getattr(exc, "response", None), "status_code", None))
+    except Exception:
+        return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (APIError, SheetsHTTPError)):
+        return http_status(exc) in RETRYABLE_STATUSES
+    return isinstance(
+        exc,
+        (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            aiohttp.ClientConnectionError,
+            asyncio.TimeoutError,
+        ),
+    )
+
+
+def feeds_offline(exc: Exception) -> bool:
+    """Чи має помилка рахуватись як "таблиця недоступна" (sheet_mark_fail / авто-OFFLINE)."""
+    if isinstance(exc, (APIError, SheetsHTTPError)):
+        return http_status(exc) not in RETRYABLE_STATUSES
+    # черга/таймаут пулу "sheets" чи дедлайн хендлера — перевантаження бота, а не недоступність таблиці
+    if isinstance(exc, (ExecutorError, asyncio.TimeoutError)):
+        return False
+    return True
+
+
+def _backoff(attempt: int) -> float:
+    base = max(0.0, _cfg_float("SHEETS_RETRY_BASE_SEC", 1.0))
+    cap = min(_MAX_BACKOFF_SEC, base * (2 ** attempt))
+    # "full jitter": рівномірно в [0, cap] — паралельні потоки не повторюють синхронно
+    return random.uniform(0.0, cap)
+
+
+def _max_retries() -> int:
+    try:
+        max_retries = max(0, int(getattr(config, "SHEETS_RETRY_MAX", 5)))
+    except Exception:
+        max_retries = 5
+    local_limit = _MAX_RETRIES.get()
+    if local_limit is not None:
+        max_retries = min(max_retries, local_limit)
+    return max_retries
+
+
+def _count_request(kind: str, waited: float):
+    _inc(requests=1, **{f"{kind}s": 1})
+    if waited > 0:
+        _inc(throttled=1, throttle_wait_ms=int(waited * 1000))
+
+
+def _retry_delay(method: str, e: Exception, attempt: int, max_retries: int) -> float:
+    """Затримка перед повтором; якщо повторювати не можна — прокидає помилку далі."""
+    if not is_retryable(e):
+        _inc(errors=1)
+        raise e
+    if attempt >= max_retries:
+        _inc(errors=1, retry_exhausted=1)
+        raise e
+
+    delay = _backoff(attempt)
+    _inc(retried=1)
+    logger.warning(
+        f"⏳ Sheets {method} {http_status(e) or type(e).__name__}: повтор {attempt + 1}/{max_retries} через {delay:.1f} с"
+    )
+    return delay
+
+
+def call_with_limits(method: str, send):
+    """Виконує send() під лімітом читань/записів, з повторами для 429/5xx."""
+    kind = "read" if str(method).upper() == "GET" else "write"
+    max_retries = _max_retries()
+
+    attempt = 0
+    while True:
+        _count_request(kind, _bucket(kind).acquire())
+        try:
+            return send()
+        except Exception as e:
+            delay = _retry_delay(method, e, attempt, max_retries)
+            attempt += 1
+            time.sleep(delay)
+
+
+async def call_with_limits_async(method: str, send):
+    """Як call_with_limits, але send — корутинна функція, а очікування не блокує event loop."""
+    kind = "read" if str(method).upper() == "GET" else "write"
+    max_retries = _max_retries()
+
+    attempt = 0
+    while True:
+        _count_request(kind, await _bucket(kind).acquire_async())
+        try:
+            return await send()
+        except Exception as e:
+            delay = _retry_delay(method, e, attempt, max_retries)
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,120 @@
+"""Фоновий синк з Sheets за подіями (замість опитування кожні 60 с).
+
+- БД після коміту змін (add_log / try_start_shift / try_stop_shift, графік,
+  імпорт) викликає слухачів database.models.notify_change — воркер прокидається;
+- пачка змін "дозріває" SHEETS_SYNC_DEBOUNCE_SEC (кожна нова зміна відсуває старт,
+  але не далі ніж SHEETS_SYNC_MAX_DELAY_SEC від першої) і йде одним циклом синку;
+- без змін — лише рідкий fallback-цикл раз на SHEETS_SYNC_FALLBACK_SEC
+  (ручні правки в таблиці, вихід з OFFLINE);
+- цикл не вдався / пропущений (OFFLINE) — зміни лишаються в черзі, повтор через
+  _RETRY_SEC.
+
+Нотифікації приходять з executor-потоків, тому в event loop вони передаються
+через call_soon_threadsafe.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+
+import config
+from database.models import add_change_listener, remove_change_listener
+
+logger = logging.getLogger(__name__)
+
+_RETRY_SEC = 60.0
+
+
+def _cfg_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(getattr(config, name, default)))
+    except Exception:
+        return float(default)
+
+
+class SyncWorker:
+    """Збирає сигнали про зміни і запускає run_tick() (async, повертає True якщо цикл відбувся)."""
+
+    def __init__(self, run_tick):
+        self._run_tick = run_tick
+        self._loop = None
+        self._event = None
+        self._pending = Counter()
+        self.cycles = 0
+        self.coalesced = 0
+
+    # --- з будь-якого потоку ---
+
+    def notify(self, kind: str = "logs"):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._mark, kind)
+        except RuntimeError:
+            # loop вже зупинено (shutdown) — сигнал не потрібен
+            pass
+
+    # --- у event loop ---
+
+    def _mark(self, kind: str):
+        self._pending[kind] += 1
+        if self._event is not None:
+            self._event.set()
+
+    async def _debounce(self):
+        """Чекає тиші debounce с (але не довше max_delay від першої зміни)."""
+        loop = asyncio.get_running_loop()
+        debounce = _cfg_float("SHEETS_SYNC_DEBOUNCE_SEC", 3)
+        deadline = loop.time() + max(debounce, _cfg_float("SHEETS_SYNC_MAX_DELAY_SEC", 15))
+        while True:
+            self._event.clear()
+            remaining = deadline - loop.time()
+            if remaining <= 0 or debounce <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=min(debounce, remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        add_change_listener(self.notify)
+
+        # стартовий цикл: підхопити те, що накопичилось, поки бот не працював
+        self._pending["startup"] += 1
+        self._event.set()
+        timeout = 0.0
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._event.wait(), timeout=timeout or None)
+                except asyncio.TimeoutError:
+                    pass
+
+                if self._pending:
+                    await self._debounce()
+                self._event.clear()
+
+                pending, self._pending = self._pending, Counter()
+                reason = ", ".join(f"{k}×{n}" for k, n in sorted(pending.items())) or "poll"
+
+                ok = False
+                try:
+                    ok = bool(await self._run_tick())
+                finally:
+                    if ok:
+                        self.cycles += 1
+                        self.coalesced += sum(pending.values())
+                        logger.info(f"🔄 Sync-цикл ({reason})")
+                    else:
+                        # зміни не доїхали до таблиці — повернути в чергу
+                        self._pending.update(pending)
+
+                fallback = _cfg_float("SHEETS_SYNC_FALLBACK_SEC", 900)
+                timeout = fallback if ok or not self._pending else min(_RETRY_SEC, fallback or _RETRY_SEC)
+        finally:
+            remove_change_listener(self.notify)
+            self._loop = None
@@ -0,0 +1,20 @@
+"""Баланс палива/мотогодин з журналу подій (logs).
+
+- engine: правила програвання подій (Balance, apply_event) і потоковий backend;
+- vectorized: pandas backend (той самий результат, без циклу по строках);
+- balance: "баланс на момент T" через чекпоінти ledger_checkpoint.
+"""
+
+from .balance import balance_as_of, cutoff_ts, period_bounds
+from .engine import Balance, apply_event, fuel_rate, replay, replay_periods
+
+__all__ = [
+    "Balance",
+    "apply_event",
+    "replay",
+    "replay_periods",
+    "fuel_rate",
+    "balance_as_of",
+    "cutoff_ts",
+    "period_bounds",
+]
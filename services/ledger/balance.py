@@ -0,0 +1,139 @@
+"""Запит "баланс на момент T": найближчий чекпоінт (ledger_checkpoint) + хвіст logs.
+
+Чекпоінти для завершених періодів (до сьогодні) створюються попутно під час
+програвання хвоста, тож повне програвання журналу буває лише один раз
+(і після back-dated записів — лише від інвалідованого періоду).
+"""
+
+import calendar
+import functools
+import logging
+from datetime import date, datetime, timedelta
+
+import config
+from database.api.ledger import _conn_get_checkpoint, _conn_logs_max_id, save_checkpoints
+from database.api.logs import log_time_columns
+from database.models import get_connection
+from services.ledger.engine import Balance, fuel_rate, replay_periods
+
+logger = logging.getLogger(__name__)
+
+
+def _day_start_ts(d: date) -> int:
+    return int(config.KYIV.localize(datetime(d.year, d.month, d.day)).timestamp())
+
+
+@functools.lru_cache(maxsize=65536)
+def _period_bounds(key: str, mode: str) -> tuple[str, int]:
+    if mode == "day":
+        end = datetime.strptime(key, "%Y-%m-%d").date()
+    else:
+        first = datetime.strptime(key, "%Y-%m").date()
+        end = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    return end.strftime("%Y-%m-%d"), _day_start_ts(end + timedelta(days=1))
+
+
+def period_bounds(event_date: str) -> tuple[str, int]:
+    """(period_end 'YYYY-MM-DD', upto_ts початку наступного періоду) для дати події."""
+    s = str(event_date)
+    if getattr(config, "LEDGER_CHECKPOINT_PERIOD", "month") == "day":
+        return _period_bounds(s, "day")
+    return _period_bounds(s[:7], "month")
+
+
+def _period_or_none(event_date):
+    try:
+        return period_bounds(event_date)
+    except Exception:
+        return None
+
+
+def cutoff_ts(as_of) -> int | None:
+    """Межа as_of як epoch-секунди (події з event_ts < межі входять у баланс).
+
+    None — без межі; 'YYYY-MM-DD' — початок дня (баланс "на ранок");
+    'YYYY-MM-DD HH:MM[:SS]' або datetime (naive = час config.KYIV) — точний момент.
+    """
+    if as_of is None:
+        return None
+    if isinstance(as_of, datetime):
+        dt = as_of if as_of.tzinfo else config.KYIV.localize(as_of)
+        return int(dt.timestamp())
+    if isinstance(as_of, date):
+        return _day_start_ts(as_of)
+
+    s = str(as_of).strip()
+    if len(s) == 10:
+        return _day_start_ts(datetime.strptime(s, "%Y-%m-%d").date())
+    _, ts = log_time_columns(s)
+    if ts is None:
+        raise ValueError(f"Некоректний момент часу: {as_of!r}")
+    return ts
+
+
+def _conn_read_tail(conn, cutoff: int | None, rate: float):
+    """(logs_max_id, чекпоінт або None, події після чекпоінта до cutoff)."""
+    query = "SELECT event_type, value, event_ts, event_date FROM logs WHERE event_ts IS NOT NULL"
+    params = []
+
+    logs_max_id = _conn_logs_max_id(conn)
+    cp = _conn_get_checkpoint(conn, cutoff, rate)
+    if cp:
+        query += " AND event_ts >= ?"
+        params.append(cp["upto_ts"])
+    if cutoff is not None:
+        query += " AND event_ts < ?"
+        params.append(cutoff)
+    query += " ORDER BY event_ts ASC, id ASC"
+    return logs_max_id, cp, conn.execute(query, tuple(params)).fetchall()
+
+
+def balance_as_of(as_of=None, *, save: bool = True, conn=None) -> Balance:
+    """Баланс палива/мотогодин і відкриті зміни після всіх подій до as_of (див. cutoff_ts).
+
+    save=True — зберігає нові чекпоінти для завершених періодів, пройдених у хвості.
+    conn — з'єднання викликача у відкритій транзакції (імпорт): баланс з його ще
+    незакомічених даних; чекпоінти тоді не зберігаються (окреме з'єднання чекало б
+    на lock цієї ж транзакції).
+    """
+    cutoff = cutoff_ts(as_of)
+    rate = fuel_rate()
+
+    if conn is not None:
+        logs_max_id, cp, rows = _conn_read_tail(conn, cutoff, rate)
+        save = False
+    else:
+        with get_connection() as own:
+            logs_max_id, cp, rows = _conn_read_tail(own, cutoff, rate)
+
+    start = Balance(cp["fuel"], cp["hours"], dict(cp["open_shifts"]), cp["events"]) if cp else None
+    bal, closes = replay_periods(rows, start, rate, _period_or_none)
+
+    # чекпоінти лише для періодів, що закінчились до сьогодні (і до межі запиту)
+    limit = _day_start_ts(datetime.now(config.KYIV).date())
+    if cutoff is not None:
+        limit = min(limit, cutoff)
+
+    new_checkpoints = [
+        {
+            "period_end": period[0],
+            "upto_ts": period[1],
+            "fuel": b.fuel,
+            "hours": b.hours,
+            "open_shifts": dict(b.open_shifts),
+            "events": b.events,
+            "rate": rate,
+        }
+        for period, b in closes
+        if period[1] <= limit
+    ]
+
+    if save and new_checkpoints:
+        try:
+            saved = save_checkpoints(new_checkpoints, logs_max_id)
+            if saved:
+                logger.info(f"📒 Збережено чекпоінтів балансу: {saved} (до {new_checkpoints[-1]['period_end']})")
+        except Exception as e:
+            logger.warning(f"⚠️ Не вдалося зберегти чекпоінти балансу: {e}")
+
+    return bal
@@ -0,0 +1,124 @@
+"""Програвання журналу подій у баланс палива/мотогодин.
+
+Правила (єдині для експорту, імпорту і денних підсумків):
+- refill: паливо += value;
+- fuel_set / corr_fuel_set: паливо = value;
+- total_hours_set / corr_total_hours_set: мотогодини = value;
+- X_start відкриває зміну X, X_end закриває відкриту X_start:
+  мотогодини += тривалість, паливо -= тривалість * витрата (л/год).
+Тривалість рахується з logs.event_ts, тож зміна через північ теж враховується.
+
+Два backend-и з однаковим результатом: потоковий (цей модуль, для денних
+підсумків і коротких хвостів) і векторизований pandas (services.ledger.vectorized).
+"""
+
+from dataclasses import dataclass, field
+
+import config
+
+FUEL_RESET_EVENTS = ("fuel_set", "corr_fuel_set")
+HOURS_RESET_EVENTS = ("total_hours_set", "corr_total_hours_set")
+
+
+def fuel_rate() -> float:
+    """Єдине джерело правди для витрати палива (л/год)"""
+    try:
+        return float(getattr(config, "FUEL_CONSUMPTION", 0.0) or 0.0)
+    except Exception:
+        return 0.0
+
+
+def _to_float(v) -> float:
+    try:
+        return float(v or 0.0)
+    except Exception:
+        return 0.0
+
+
+@dataclass
+class Balance:
+    """Баланс після певної події: паливо, мотогодини, відкриті зміни {code: event_ts старту}."""
+
+    fuel: float = 0.0
+    hours: float = 0.0
+    open_shifts: dict = field(default_factory=dict)
+    events: int = 0
+
+    def copy(self) -> "Balance":
+        return Balance(self.fuel, self.hours, dict(self.open_shifts), self.events)
+
+
+def apply_event(bal: Balance, event_type: str, value, event_ts: int | None, rate: float) -> float:
+    """Застосовує одну подію до bal (in-place). Повертає тривалість закритої зміни, год (або 0)."""
+    event = str(event_type or "")
+    bal.events += 1
+
+    if event == "refill":
+        bal.fuel += _to_float(value)
+    elif event in FUEL_RESET_EVENTS:
+        bal.fuel = _to_float(value)
+    elif event in HOURS_RESET_EVENTS:
+        bal.hours = _to_float(value)
+    elif event.endswith("_start"):
+        bal.open_shifts[event.split("_")[0]] = event_ts
+    elif event.endswith("_end"):
+        start_ts = bal.open_shifts.pop(event.split("_")[0], None)
+        if start_ts is not None and event_ts is not None:
+            delta = (int(event_ts) - int(start_ts)) / 3600.0
+            bal.hours += delta
+            bal.fuel -= delta * rate
+            return delta
+    return 0.0
+
+
+def _backend_for(rows: list, backend: str | None) -> str:
+    """Backend програвання: python або pandas (auto — pandas для довгих хвостів)."""
+    backend = (backend or getattr(config, "LEDGER_BACKEND", "auto") or "auto").lower()
+    if backend in ("python", "pandas"):
+        return backend
+    try:
+        min_rows = int(getattr(config, "LEDGER_VECTOR_MIN_ROWS", 200000) or 0)
+    except Exception:
+        min_rows = 200000
+    return "pandas" if min_rows > 0 and len(rows) >= min_rows else "python"
+
+
+def _replay_periods_python(rows, start: Balance | None, rate: float, period_fn):
+    bal = start.copy() if start is not None else Balance()
+    closes = []
+    period = None
+    periods = {}
+    for event_type, value, event_ts, event_date in rows:
+        if period_fn is not None:
+            p = periods.get(event_date)
+            if p is None and event_date not in periods:
+                p = periods[event_date] = period_fn(event_date)
+            if period is not None and p != period:
+                closes.append((period, bal.copy()))
+            period = p
+        apply_event(bal, event_type, value, event_ts, rate)
+    if period is not None:
+        closes.append((period, bal.copy()))
+    return bal, closes
+
+
+def replay_periods(rows, start: Balance | None = None, rate: float | None = None, period_fn=None, backend=None):
+    """Програє події (event_type, value, event_ts, event_date), впорядковані за event_ts, id.
+
+    period_fn(event_date) -> ключ періоду (або None). Повертає (баланс в кінці,
+    [(період, баланс після його останньої події), ...]).
+    backend: "python" | "pandas" | None (config.LEDGER_BACKEND, дефолт auto).
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    rate = fuel_rate() if rate is None else float(rate)
+    if _backend_for(rows, backend) == "pandas":
+        from services.ledger.vectorized import replay_periods as _replay_periods_pandas
+
+        return _replay_periods_pandas(rows, start, rate, period_fn)
+    return _replay_periods_python(rows, start, rate, period_fn)
+
+
+def replay(rows, start: Balance | None = None, rate: float | None = None, backend=None) -> Balance:
+    """Програє події (event_type, value, event_ts), впорядковані за event_ts, id."""
+    rows = [(r[0], r[1], r[2], None) for r in rows]
+    return replay_periods(rows, start, rate, None, backend)[0]
@@ -0,0 +1,140 @@
+"""Векторизований (pandas/numpy) backend програвання журналу.
+
+Ті самі правила, що й engine.apply_event, але без циклу по строках:
+- типи подій кодуються один раз (pd.factorize), далі — лише масиви;
+- _end парується з попередньою подією зміни того ж коду, якщо це _start
+  (повторний _start замінює відкритий, _end без відкритого ігнорується);
+- тривалості — різниця event_ts масивами;
+- паливо/мотогодини — cumsum дельт із "скиданням" на fuel_set / total_hours_set.
+
+Потребує event_ts у кожній строці (запити ledger фільтрують event_ts IS NOT NULL).
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.ledger.engine import FUEL_RESET_EVENTS, HOURS_RESET_EVENTS, Balance, fuel_rate
+
+_START, _END = 1, 2
+
+
+def _running(delta: np.ndarray, reset: np.ndarray, reset_val: np.ndarray, init: float) -> np.ndarray:
+    """init + cumsum(delta), що починається заново від reset_val на кожній строці reset."""
+    delta = np.where(reset, 0.0, delta)
+    cs = np.cumsum(delta)
+    seg = np.cumsum(reset)
+    base = np.concatenate(([init], reset_val[reset]))
+    offset = np.concatenate(([0.0], cs[reset]))
+    return base[seg] + cs - offset[seg]
+
+
+def running_frame(rows, start: Balance | None = None, rate: float | None = None) -> pd.DataFrame:
+    """Баланс після кожної події: колонки fuel, hours, events і open_<code> (event_ts або NaN).
+
+    rows: (event_type, value, event_ts, ...) впорядковані за event_ts, id.
+    """
+    rate = fuel_rate() if rate is None else float(rate)
+    start = start or Balance()
+    n = len(rows)
+    if not n:
+        return pd.DataFrame(columns=["fuel", "hours", "events"])
+
+    ev_ids, uniq = pd.factorize(pd.Series([r[0] or "" for r in rows], dtype=object))
+    ts = pd.to_numeric(pd.Series([r[2] for r in rows]), errors="coerce").to_numpy("float64")
+
+    # властивості кожного типу події (їх одиниці) -> масиви по строках
+    uniq = [str(u) for u in uniq]
+    kind_u = np.array([_START if u.endswith("_start") else _END if u.endswith("_end") else 0 for u in uniq])
+    shift_u = [u.split("_", 1)[0] if k else None for u, k in zip(uniq, kind_u)]
+    opened = {str(k): v for k, v in (start.open_shifts or {}).items()}
+    codes = sorted({c for c in shift_u if c} | set(opened))
+    code_u = np.array([codes.index(c) if c else -1 for c in shift_u])
+
+    kind = kind_u[ev_ids]
+    code = code_u[ev_ids]
+    is_refill = np.array([u == "refill" for u in uniq])[ev_ids]
+    fuel_reset = np.array([u in FUEL_RESET_EVENTS for u in uniq])[ev_ids]
+    hours_reset = np.array([u in HOURS_RESET_EVENTS for u in uniq])[ev_ids]
+
+    # value парситься лише там, де воно щось означає (заправки і корекції)
+    val = np.zeros(n)
+    val_idx = np.flatnonzero(is_refill | fuel_reset | hours_reset)
+    if len(val_idx):
+        raw_val = pd.Series([rows[i][1] for i in val_idx], dtype=object)
+        val[val_idx] = pd.to_numeric(raw_val, errors="coerce").fillna(0.0).to_numpy("float64")
+
+    dur = np.zeros(n)
+    open_cols = {}
+    for ci, c in enumerate(codes):
+        idx = np.flatnonzero(code == ci)
+        init_ts = opened.get(c)
+        init_kind = _START if c in opened else 0
+        init_ts_f = np.nan if init_ts is None else float(init_ts)
+
+        # парування: попередня подія зміни цього коду (або відкрита зміна з start)
+        k = kind[idx]
+        t = ts[idx]
+        prev_kind = np.concatenate(([init_kind], k[:-1]))
+        prev_ts = np.concatenate(([init_ts_f], t[:-1]))
+        paired = (k == _END) & (prev_kind == _START)
+        dur[idx] = np.nan_to_num(np.where(paired, (t - prev_ts) / 3600.0, 0.0), nan=0.0)
+
+        # відкрита зміна після кожної події: ts останнього _start (-inf = закрита)
+        state = np.full(n, np.nan)
+        state[idx] = np.where(k == _START, t, -np.inf)
+        state = pd.Series(state).ffill().fillna(-np.inf if init_ts is None else float(init_ts)).to_numpy()
+        open_cols[f"open_{c}"] = np.where(state == -np.inf, np.nan, state)
+
+    fuel_delta = np.where(is_refill, val, 0.0) - dur * rate
+
+    return pd.DataFrame(
+        {
+            "fuel": _running(fuel_delta, fuel_reset, val, float(start.fuel)),
+            "hours": _running(dur, hours_reset, val, float(start.hours)),
+            "events": np.arange(1, n + 1, dtype="int64") + int(start.events),
+            **open_cols,
+        }
+    )
+
+
+def _balance_reader(frame: pd.DataFrame):
+    """Функція pos -> Balance зі строки pos (позиційний індекс) результату running_frame."""
+    fuel = frame["fuel"].to_numpy()
+    hours = frame["hours"].to_numpy()
+    events = frame["events"].to_numpy()
+    opens = [(col[len("open_"):], frame[col].to_numpy()) for col in frame.columns if col.startswith("open_")]
+
+    def read(pos: int) -> Balance:
+        opened = {code: int(arr[pos]) for code, arr in opens if not np.isnan(arr[pos])}
+        return Balance(float(fuel[pos]), float(hours[pos]), opened, int(events[pos]))
+
+    return read
+
+
+def replay_periods(rows, start: Balance | None = None, rate: float | None = None, period_fn=None):
+    """Як engine.replay_periods, але векторизовано. rows: (event_type, value, event_ts, event_date)."""
+    rows = list(rows)
+    start = start or Balance()
+    if not rows:
+        return start.copy(), []
+
+    balance_at = _balance_reader(running_frame(rows, start, rate))
+    closes = []
+    if period_fn is not None:
+        periods = []
+        ids_by_period = {}
+        period_id = {}
+        for d in dict.fromkeys(r[3] for r in rows):
+            p = period_fn(d)
+            if p not in ids_by_period:
+                ids_by_period[p] = len(periods)
+                periods.append(p)
+            period_id[d] = ids_by_period[p]
+        ids = np.fromiter((period_id[r[3]] for r in rows), dtype="int64", count=len(rows))
+        last = np.append(ids[1:] != ids[:-1], True)
+        for pos in np.flatnonzero(last):
+            p = periods[ids[pos]]
+            if p is not None:
+                closes.append((p, balance_at(int(pos))))
+
+    return balance_at(len(rows) - 1), closes
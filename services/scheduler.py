@@ -3,9 +3,10 @@ import logging
 from datetime import datetime, time
 
 import config
-import database.db_api as db
+import database.db_async as adb
 
 from services.scheduler_parts.auto_close import maybe_auto_close_shift
+from services.scheduler_parts.db_maintenance import maybe_run_db_maintenance
 from services.scheduler_parts.fuel_alert import maybe_send_fuel_alert
 from services.scheduler_parts.morning_brief import maybe_send_morning_brief
 from services.scheduler_parts.stop_reminder import maybe_send_stop_reminder
@@ -21,6 +22,7 @@ async def scheduler_loop(bot):
     - Авто-закриття зміни о WORK_END_TIME
     - Алерти по паливу (адмінам) + кнопка "Паливо замовлено"
     - Нагадування "натисніть СТОП" за N хв до WORK_END_TIME
+    - Обслуговування SQLite (PRAGMA optimize, WAL checkpoint)
     """
     logger.info("⏰ Scheduler запущено")
 
@@ -71,11 +73,14 @@ async def scheduler_loop(bot):
                 continue
 
             # 3) Нагадування STOP + 4) Алерти по паливу (працюють з одним state, як і раніше)
-            state = db.get_state()
+            state = await adb.get_state()
 
             await maybe_send_stop_reminder(bot, now, current_date, close_time, today_str, state)
             await maybe_send_fuel_alert(bot, now, today_str, state)
 
+            # 5) Обслуговування SQLite
+            await maybe_run_db_maintenance()
+
         except Exception as e:
             logger.error(f"❌ Scheduler Error: {e}", exc_info=True)
 
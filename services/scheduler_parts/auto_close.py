@@ -2,7 +2,7 @@ import logging
 from datetime import datetime, timedelta, time as dt_time
 
 import config
-import database.db_api as db
+import database.db_async as adb
 from utils.time import format_hours_hhmm
 
 logger = logging.getLogger(__name__)
@@ -21,7 +21,7 @@ async def maybe_auto_close_shift(
     if now.time() < close_time or auto_close_done_today:
         return auto_close_done_today, False
 
-    state = db.get_state()
+    state = await adb.get_state()
 
     # Перевіряємо чи зміна активна
     if state.get("status") == "ON":
@@ -64,7 +64,7 @@ async def maybe_auto_close_shift(
 
         if end_event:
             try:
-                res = db.try_stop_shift(end_event, "System", now)
+                res = await adb.try_stop_shift(end_event, "System", now)
                 close_ok = bool(res.get("ok"))
                 close_reason = str(res.get("reason", "") or "")
             except Exception as e:
@@ -106,8 +106,7 @@ async def maybe_auto_close_shift(
 
             # fallback: щоб не лишати генератор у ON при поламаному state
             forced_close = True
-            db.set_state("status", "OFF")
-            db.set_state("active_shift", "none")
+            await adb.set_states({"status": "OFF", "active_shift": "none"})
             logger.warning(
                 f"⚠️ Auto-close fallback: forced OFF (reason={close_reason}, active_shift={active_shift})"
             )
@@ -115,9 +114,9 @@ async def maybe_auto_close_shift(
         # OFFLINE: локально обліковуємо паливо/години тільки якщо ми реально закрили
         remaining_fuel = None
         try:
-            if db.sheet_is_offline() and (close_ok or forced_close):
-                db.update_hours(dur)
-                remaining_fuel = db.update_fuel(-fuel_consumed)
+            if await adb.sheet_is_offline() and (close_ok or forced_close):
+                await adb.update_hours(dur)
+                remaining_fuel = await adb.update_fuel(-fuel_consumed)
         except Exception:
             pass
 
@@ -125,7 +124,7 @@ async def maybe_auto_close_shift(
         ts = now.strftime("%Y-%m-%d %H:%M:%S")
         try:
             if close_ok or forced_close:
-                db.add_log("auto_close", "System", ts=ts)
+                await adb.add_log("auto_close", "System", ts=ts)
         except Exception:
             pass
 
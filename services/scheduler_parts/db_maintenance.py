@@ -0,0 +1,61 @@
+import logging
+import time
+
+import config
+import database.db_async as adb
+from database.models import sqlite_maintenance
+
+logger = logging.getLogger(__name__)
+
+# monotonic-час останніх запусків (в межах процесу)
+_last_optimize = None
+_last_checkpoint = None
+
+
+def _due(last: float | None, interval_s: float, now_m: float) -> bool:
+    if interval_s <= 0:
+        return False
+    return last is None or (now_m - last) >= interval_s
+
+
+async def maybe_run_db_maintenance():
+    """Періодичне обслуговування SQLite: PRAGMA optimize і WAL checkpoint.
+
+    Для Postgres — нічого не робить. Помилки лише логуються.
+    """
+    global _last_optimize, _last_checkpoint
+
+    if getattr(config, "DB_BACKEND", "sqlite") == "postgres":
+        return
+
+    now_m = time.monotonic()
+    optimize_s = float(getattr(config, "SQLITE_OPTIMIZE_INTERVAL_H", 6.0) or 0.0) * 3600.0
+    checkpoint_s = float(getattr(config, "SQLITE_CHECKPOINT_INTERVAL_MIN", 15.0) or 0.0) * 60.0
+
+    # перший optimize — не одразу після старту, а через інтервал
+    if _last_optimize is None:
+        _last_optimize = now_m
+
+    do_optimize = _due(_last_optimize, optimize_s, now_m)
+    do_checkpoint = _due(_last_checkpoint, checkpoint_s, now_m)
+    if not (do_optimize or do_checkpoint):
+        return
+
+    try:
+        res = await adb.run(
+            sqlite_maintenance,
+            optimize=do_optimize,
+            checkpoint="PASSIVE" if do_checkpoint else None,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Обслуговування SQLite не вдалося: {e}")
+        return
+
+    if do_optimize:
+        _last_optimize = now_m
+        logger.info("🧹 SQLite: PRAGMA optimize виконано")
+    if do_checkpoint:
+        _last_checkpoint = now_m
+        cp = res.get("checkpoint") or {}
+        if cp.get("busy"):
+            logger.info(f"🧹 SQLite: WAL checkpoint частковий (зайнято читачами), кадрів: {cp.get('log')}")
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 import config
-import database.db_api as db
+import database.db_async as adb
 from utils.time import format_hours_hhmm
 
 from services.scheduler_parts.utils import parse_state_dt
@@ -22,14 +22,14 @@ async def maybe_send_fuel_alert(bot, now: datetime, today_str: str, state: dict)
     threshold = float(getattr(config, "FUEL_ALERT_THRESHOLD_L", 40.0) or 40.0)
     cooldown_min = int(getattr(config, "FUEL_ALERT_COOLDOWN_MIN", 60) or 60)
 
-    ordered_date = (db.get_state_value("fuel_ordered_date", "") or "").strip()
+    ordered_date = (await adb.get_state_value("fuel_ordered_date", "") or "").strip()
 
     # Якщо паливо відновилось — знімаємо прапорець "замовлено"
     if fuel_level >= threshold and ordered_date:
-        db.set_state("fuel_ordered_date", "")
+        await adb.set_state("fuel_ordered_date", "")
 
     if fuel_level < threshold and ordered_date != today_str:
-        last_sent_raw = (db.get_state_value("fuel_alert_last_sent_ts", "") or "").strip()
+        last_sent_raw = (await adb.get_state_value("fuel_alert_last_sent_ts", "") or "").strip()
         last_sent_dt = parse_state_dt(last_sent_raw)
         can_send = (last_sent_dt is None) or ((now - last_sent_dt) >= timedelta(minutes=cooldown_min))
 
@@ -57,4 +57,4 @@ async def maybe_send_fuel_alert(bot, now: datetime, today_str: str, state: dict)
                 except Exception as e:
                     logger.warning(f"⚠️ Fuel alert: не вдалося надіслати адміну {admin_id}: {e}")
 
-            db.set_state("fuel_alert_last_sent_ts", now.strftime("%Y-%m-%d %H:%M:%S"))
+            await adb.set_state("fuel_alert_last_sent_ts", now.strftime("%Y-%m-%d %H:%M:%S"))
@@ -3,7 +3,7 @@ import logging
 from datetime import datetime, time as dt_time
 
 import config
-import database.db_api as db
+import database.db_async as adb
 from utils.time import format_hours_hhmm
 
 from services.scheduler_parts.utils import (
@@ -43,11 +43,11 @@ async def maybe_send_morning_brief(
     if (0 <= diff_s < brief_window_seconds) and (not brief_sent_today):
         logger.info(f"📢 Час ранкового брифінгу: {brief_time.strftime('%H:%M')}")
 
-        schedule = db.get_schedule(today_str)
+        schedule = await adb.get_schedule(today_str)
         ranges = schedule_to_ranges(schedule)
         total_off = sum((e - s) for s, e in ranges)
 
-        st = db.get_state()
+        st = await adb.get_state()
         try:
             current_fuel = float(st.get("current_fuel", 0.0) or 0.0)
         except Exception:
@@ -87,7 +87,7 @@ async def maybe_send_morning_brief(
         )
 
         txt += "📌 <b>Вчорашні зміни</b>\n"
-        txt += yesterday_shifts_summary(now)
+        txt += await adb.run(yesterday_shifts_summary, now)
         txt += "\n\n"
 
         reminders = []
@@ -101,7 +101,7 @@ async def maybe_send_morning_brief(
         if reminders:
             txt += "🔔 <b>Нагадування</b>\n" + "\n".join(reminders)
 
-        users = db.get_all_users()
+        users = await adb.get_all_users()
 
         if not users:
             logger.warning("⚠️ Немає користувачів для розсилки")
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, date as dt_date, time as dt_time
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 import config
-import database.db_api as db
+import database.db_async as adb
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +31,7 @@ async def maybe_send_stop_reminder(
         reminder_dt = None
 
     if reminder_dt and close_dt and state.get("status") == "ON":
-        sent_date = db.get_state_value("stop_reminder_sent_date", "") or ""
+        sent_date = await adb.get_state_value("stop_reminder_sent_date", "") or ""
         if (reminder_dt <= now < close_dt) and (sent_date != today_str):
             active = state.get("active_shift", "none")
             st_time = state.get("start_time", "")
@@ -56,4 +56,4 @@ async def maybe_send_stop_reminder(
                 except Exception as e:
                     logger.warning(f"⚠️ STOP reminder: не вдалося надіслати адміну {admin_id}: {e}")
 
-            db.set_state("stop_reminder_sent_date", today_str)
+            await adb.set_state("stop_reminder_sent_date", today_str)
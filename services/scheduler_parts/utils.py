@@ -34,19 +34,19 @@ def yesterday_shifts_summary(now: datetime) -> str:
     y = (now - timedelta(days=1)).date()
     y_str = y.strftime("%Y-%m-%d")
 
-    logs = db.get_logs_for_period(y_str, y_str)
+    summary = db.get_daily_summary(y_str) or {}
 
     shifts = {"m": {}, "d": {}, "e": {}, "x": {}}
 
-    for event_type, ts, user_name, value, driver_name in logs:
-        if event_type in ("m_start", "m_end", "d_start", "d_end", "e_start", "e_end", "x_start", "x_end"):
-            code = event_type.split("_")[0]
-            act = event_type.split("_")[1]
+    for code, info in (summary.get("shifts") or {}).items():
+        if code not in shifts:
+            continue
+        for act in ("start", "end"):
             try:
-                hhmm = ts.split(" ")[1][:5]
+                hhmm = str(info.get(act) or "").split(" ")[1][:5]
             except Exception:
                 hhmm = ""
-            if code in shifts and hhmm:
+            if hhmm:
                 shifts[code][act] = hhmm
 
     names = {"m": "🌅 Ранок", "d": "☀️ День", "e": "🌙 Вечір", "x": "⚡ Екстра"}
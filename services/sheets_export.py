@@ -20,22 +20,31 @@
 - AB = водії (список через кому)
 - AC = персонал (список через кому)
 
-Експорт інкрементальний:
-- Знаходимо останню дату в Sheets
-- Експортуємо тільки дні >= цієї дати (оновлюємо поточний + дописуємо нові)
+Експорт інкрементальний (diff):
+- Читаємо A1:AC один раз, рядки зіставляємо з днями БД за датою в колонці A
+- Пишемо одним batch-запитом лише змінені рядки від останньої дати таблиці і нові дні
+- Старіші рядки не переписуємо: таблиця — еталон (ручні правки палива, формули),
+  розбіжності в них лише показуємо в підсумку
 
 Важливо:
 - Витрата палива береться з ENV через config.FUEL_CONSUMPTION.
 - Назва вкладки логів береться з ENV через config.LOGS_SHEET_NAME.
+- Вкладка логів має ту саму розкладку, що й у циклі синку (рядок = logs.id + 1).
 """
 
+import hashlib
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
+import re
+from datetime import datetime
 
 import config
-import database.db_api as db
-from services.google_sync_parts.client import make_client, open_spreadsheet, open_main_worksheet
+from database.api.daily_summary import get_daily_summaries
+from database.models import get_connection
+from services.google_sync_parts.client import open_spreadsheet, open_main_worksheet
+from services.sheets_sync.events_export import export_events_tab
+from services.sheets_sync.logs_tab import ensure_logs_worksheet
+from services.sheets_sync.batch import SheetWritePlan
+from utils.sheets_dates import invalidate_date_index, seed_date_index, sheet_name_to_month, try_parse_date_from_cell
 
 logger = logging.getLogger(__name__)
 
@@ -79,101 +88,8 @@ def _hours_to_hhmm(hours: float) -> str:
     return f"{h:02d}:{m:02d}"
 
 
-def _find_last_date_in_sheet(sheet) -> str | None:
-    """Знаходить останню дату в колонці A (формат DD.MM.YYYY).
-
-    Повертає дату у форматі YYYY-MM-DD або None якщо таблиця порожня.
-    """
-    try:
-        col_a = sheet.col_values(1)
-
-        if len(col_a) < 3:
-            logger.info("📋 Sheets порожня, експортуємо всі дані")
-            return None
-
-        data_rows = col_a[2:]
-
-        last_date_str = None
-        for cell in reversed(data_rows):
-            if cell and cell.strip():
-                last_date_str = cell.strip()
-                break
-
-        if not last_date_str:
-            logger.info("📋 Немає даних в Sheets, експортуємо всі дані")
-            return None
-
-        try:
-            dt = datetime.strptime(last_date_str, "%d.%m.%Y")
-            result = dt.strftime("%Y-%m-%d")
-            logger.info(f"📅 Остання дата в Sheets: {last_date_str} ({result})")
-            return result
-        except Exception as e:
-            logger.warning(f"⚠️ Не вдалося розпарсити останню дату '{last_date_str}': {e}")
-            return None
-
-    except Exception as e:
-        logger.error(f"❌ Помилка пошуку останньої дати: {e}")
-        return None
-
-
-def _get_fuel_before_date(from_date: str) -> float:
-    """Знаходить fuel_end з дня ПЕРЕД from_date.
-
-    Це потрібно для правильного розрахунку fuel_start при інкрементальному експорті.
-    Враховує витрати палива!
-    """
-    conn = db.get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT event_type, timestamp, value
-        FROM logs
-        WHERE timestamp < ?
-        ORDER BY timestamp ASC
-    """,
-        (f"{from_date} 00:00:00",),
-    )
-
-    rows = cur.fetchall()
-    conn.close()
-
-    rate = _fuel_rate()
-
-    running_fuel = 0.0
-    running_hours = 0.0
-    active_shifts = {}  # {shift: start_time}
-
-    for event, ts_str, value in rows:
-        if event == "refill":
-            running_fuel += float(value or 0)
-        elif event == "fuel_set":
-            running_fuel = float(value or 0)
-        elif event.endswith("_start"):
-            shift = event.split("_")[0]
-            active_shifts[shift] = ts_str
-        elif event.endswith("_end"):
-            shift = event.split("_")[0]
-            if shift in active_shifts:
-                try:
-                    start_ts = datetime.strptime(active_shifts[shift], "%Y-%m-%d %H:%M:%S")
-                    end_ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                    delta = (end_ts - start_ts).total_seconds() / 3600.0
-                    running_hours += delta
-                    running_fuel -= delta * rate
-                except Exception:
-                    pass
-                del active_shifts[shift]
-        elif event == "total_hours_set":
-            running_hours = float(value or 0)
-
-    logger.info(f"🛢 Залишок палива перед {from_date}: {running_fuel:.1f}л")
-    return running_fuel
-
-
 def _aggregate_logs_by_date(from_date: str | None = None):
-    """Зчитує всі логи з БД і групує по датах.
+    """Збирає дані по датах з daily_summary (денні підсумки, що ведуться разом із logs).
 
     Якщо from_date вказано, бере тільки дні >= from_date.
 
@@ -186,104 +102,59 @@ def _aggregate_logs_by_date(from_date: str | None = None):
         'fuel_end': float,
     }
     """
-    conn = db.get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT event_type, timestamp, user_name, value, driver_name, receipt_number
-        FROM logs
-        ORDER BY timestamp ASC
-    """
-    )
-    rows = cur.fetchall()
+    summaries = get_daily_summaries(from_date=from_date)
 
-    cur.execute(
+    conn = get_connection()
+    cur = conn.cursor()
+    if from_date:
+        cur.execute(
+            """
+            SELECT date, type, hours
+            FROM maintenance
+            WHERE date >= ?
+            ORDER BY date ASC
+        """,
+            (from_date,),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT date, type, hours
+            FROM maintenance
+            ORDER BY date ASC
         """
-        SELECT date, type, hours
-        FROM maintenance
-        ORDER BY date ASC
-    """
-    )
+        )
     mnt_rows = cur.fetchall()
-
     conn.close()
 
-    days = defaultdict(
-        lambda: {
-            "shifts": {"m": {}, "d": {}, "e": {}, "x": {}},
-            "refills": [],
+    days = {}
+    for summ in summaries:
+        shifts = {"m": {}, "d": {}, "e": {}, "x": {}}
+        for shift, info in (summ["shifts"] or {}).items():
+            s = dict(info)
+            for key in ("start", "end"):
+                if key in s:
+                    dt = _parse_ts(s[key])
+                    if dt:
+                        s[key] = dt
+                    else:
+                        del s[key]
+            shifts[shift] = s
+
+        days[summ["date"]] = {
+            "shifts": shifts,
+            "refills": [tuple(r) for r in summ["refills"]],
             "maintenance": [],
-            "total_hours_end": 0.0,
-            "fuel_start": 0.0,
-            "fuel_end": 0.0,
+            "total_hours_end": summ["hours_end"],
+            "fuel_start": summ["fuel_start"],
+            "fuel_end": summ["fuel_end"],
         }
-    )
-
-    rate = _fuel_rate()
-
-    running_hours = 0.0
-    running_fuel = 0.0
-
-    for row in rows:
-        event, ts_str, user, value, driver, receipt = row
-        dt = _parse_ts(ts_str)
-        if not dt:
-            continue
-
-        date_str = dt.strftime("%Y-%m-%d")
-        day = days[date_str]
-
-        if event.endswith("_start"):
-            shift = event.split("_")[0]
-            day["shifts"][shift]["start"] = dt
-            day["shifts"][shift]["start_user"] = user or ""
-
-        elif event.endswith("_end"):
-            shift = event.split("_")[0]
-            day["shifts"][shift]["end"] = dt
-            day["shifts"][shift]["end_user"] = user or ""
-
-            start = day["shifts"][shift].get("start")
-            end = day["shifts"][shift].get("end")
-            if start and end:
-                delta = (end - start).total_seconds() / 3600.0
-                running_hours += delta
-                running_fuel -= delta * rate
-
-        elif event == "refill":
-            amount = float(value or 0)
-            running_fuel += amount
-            day["refills"].append((amount, driver or "", receipt or ""))
-
-        elif event == "fuel_set":
-            running_fuel = float(value or 0)
-
-        elif event == "total_hours_set":
-            running_hours = float(value or 0)
-
-        day["total_hours_end"] = running_hours
-        day["fuel_end"] = running_fuel
 
     for row in mnt_rows:
         date_str, mnt_type, hours = row
         if date_str in days:
             days[date_str]["maintenance"].append((mnt_type, hours))
 
-    sorted_dates = sorted(days.keys())
-
-    if from_date:
-        prev_fuel = _get_fuel_before_date(from_date)
-    else:
-        prev_fuel = 0.0
-
-    for d in sorted_dates:
-        days[d]["fuel_start"] = prev_fuel
-        prev_fuel = days[d]["fuel_end"]
-
-    if from_date:
-        days = {d: data for d, data in days.items() if d >= from_date}
-
     return days
 
 
@@ -354,7 +225,8 @@ def _build_export_rows(days_data):
             driver = day["refills"][0][1]
         row.append(driver or "")
 
-        drivers = list(set(r[1] for r in day["refills"] if r[1]))
+        # відсортовано: рядок має бути детермінованим (diff-експорт порівнює хеші рядків)
+        drivers = sorted(set(r[1] for r in day["refills"] if r[1]))
         row.append(", ".join(drivers) if drivers else "")
 
         users = set()
@@ -371,98 +243,145 @@ def _build_export_rows(days_data):
     return rows
 
 
-def full_export():
-    """Повний експорт з БД в Google Sheets (інкрементальний).
+_DATA_START_ROW = 3
+_MAIN_WIDTH = 29  # A..AC
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})(?::\d{2})?$")
+_NUM_RE = re.compile(r"^-?\d+(?:[.,]\d+)?$")
 
-    Логіка:
-    1. Знаходимо останню дату в Sheets
-    2. Експортуємо тільки дні >= цієї дати (оновлюємо поточний + дописуємо нові)
-    3. Записуємо в основну вкладку (A-AC)
-    4. ПОВНІСТЮ ПЕРЕЗАПИСУЄМО вкладку LOGS_SHEET_NAME (щоб уникнути дублювання)
-    """
-    logger.info("📤 Починаємо експорт з БД в Sheets (інкрементальний)...")
 
-    client = make_client()
-    ss = open_spreadsheet(client)
-    main_sheet = open_main_worksheet(ss)
+def _norm_cell(value) -> str:
+    """Нормалізує клітинку для порівняння: відображення Sheets ("8:00", "12,5") == наш запис ("08:00", "12.5")."""
+    s = "" if value is None else str(value).strip()
+    if not s:
+        return ""
+    m = _TIME_RE.match(s)
+    if m:
+        return f"{int(m.group(1)):02d}:{m.group(2)}"
+    if _NUM_RE.match(s):
+        try:
+            return f"{float(s.replace(',', '.')):.2f}"
+        except Exception:
+            return s
+    return s
+
+
+def _row_hash(values) -> str:
+    vals = list(values or [])[:_MAIN_WIDTH]
+    vals += [""] * (_MAIN_WIDTH - len(vals))
+    payload = "\x1f".join(_norm_cell(v) for v in vals)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def diff_main_tab(main_sheet, dry_run: bool = False) -> dict:
+    """Diff-експорт основної вкладки (A-AC): одне читання, один batch-запис лише змінених рядків.
+
+    Рядки таблиці зіставляються з днями БД за датою в колонці A:
+    - є в таблиці і хеш однаковий — unchanged;
+    - є в таблиці, хеш інший — changed; переписується на місці лише рядок останньої
+      дати таблиці (як і раніше — день, що ще триває), старіші лишаються як є
+      і потрапляють у kept / kept_rows;
+    - дня ще немає і він пізніший за останню дату таблиці — appended (дописується в кінець);
+    - дня немає, але він раніший (пропуск у таблиці) — missing (вставку рядків не робимо).
+    dry_run=True — лише підсумок, без запису.
+    """
+    values = main_sheet.get("A1:AC") or []
+    col_a = [(r[0] if r else "") for r in values]
+    seed_date_index(main_sheet, col_a)
+
+    sheet_month = sheet_name_to_month(getattr(main_sheet, "title", "") or config.SHEET_NAME)
+    year = datetime.now(config.KYIV).year
+    row_by_date = {}
+    last_row = _DATA_START_ROW - 1
+    for i, cell in enumerate(col_a[_DATA_START_ROW - 1:], start=_DATA_START_ROW):
+        if str(cell or "").strip():
+            last_row = i
+        d = try_parse_date_from_cell(cell, sheet_month=sheet_month, sheet_year=year)
+        if d is not None:
+            row_by_date.setdefault(d.strftime("%Y-%m-%d"), i)
+
+    first_date = min(row_by_date) if row_by_date else None
+    last_date = max(row_by_date) if row_by_date else None
+
+    days_data = _aggregate_logs_by_date(from_date=first_date)
+    export_rows = _build_export_rows(days_data) if days_data else []
+
+    plan = SheetWritePlan(main_sheet)
+    summary = {
+        "unchanged": 0,
+        "changed": 0,
+        "appended": 0,
+        "missing": 0,
+        "kept": 0,
+        "changed_rows": [],
+        "kept_rows": [],
+        "dry_run": dry_run,
+    }
+    next_row = last_row + 1
+
+    for date_str, row in zip(sorted(days_data), export_rows):
+        sheet_row = row_by_date.get(date_str)
+        if sheet_row is not None:
+            if _row_hash(values[sheet_row - 1] if sheet_row - 1 < len(values) else []) == _row_hash(row):
+                summary["unchanged"] += 1
+                continue
+            summary["changed"] += 1
+            if date_str < last_date:
+                # минулі дні в таблиці — еталон (ручні правки, формули): не перезаписуємо
+                summary["kept"] += 1
+                summary["kept_rows"].append(sheet_row)
+                continue
+        elif last_date is None or date_str > last_date:
+            sheet_row = next_row
+            next_row += 1
+            summary["appended"] += 1
+        else:
+            summary["missing"] += 1
+            continue
 
-    last_date = _find_last_date_in_sheet(main_sheet)
+        summary["changed_rows"].append(sheet_row)
+        plan.set_row(sheet_row, 1, row)
 
-    days_data = _aggregate_logs_by_date(from_date=last_date)
+    if not dry_run and len(plan):
+        plan.flush()
+        invalidate_date_index(main_sheet)
 
-    if not days_data:
-        logger.info("ℹ️ Немає нових даних для експорту")
-        return
+    logger.info(
+        f"{'🔎 Dry-run' if dry_run else '✅ Основна вкладка'}: без змін {summary['unchanged']}, "
+        f"змінено {summary['changed']} (з них не переписано старіших {summary['kept']}), "
+        f"дописано {summary['appended']}, пропусків {summary['missing']}"
+    )
+    return summary
 
-    main_rows = _build_export_rows(days_data)
 
-    logger.info(f"📄 Підготовлено {len(main_rows)} рядків для основної вкладки (від {last_date or 'початку'})")
+def full_export(events_mode: str = "append", dry_run: bool = False) -> dict:
+    """Повний експорт з БД в Google Sheets (інкрементальний).
 
-    if main_rows:
-        if last_date:
-            all_values = main_sheet.get_all_values()
-            start_row = 3
+    Логіка:
+    1. Основна вкладка (A-AC) — diff_main_tab: одне читання A1:AC, у batch-запис
+       потрапляють лише змінені рядки і нові дні
+    2. Вкладка LOGS_SHEET_NAME — блоками logs.id (services.sheets_sync.events_export):
+       events_mode="append" дописує нові події, "verify" переписує лише змінені блоки,
+       "rewrite" — повний перезапис вкладки.
+
+    dry_run=True — лише підсумок по основній вкладці, нічого не записується.
+    Повертає підсумок diff_main_tab (+ "events" — статистика вкладки журналу).
+    """
+    logger.info("📤 Починаємо експорт з БД в Sheets (інкрементальний)...")
 
-            last_date_fmt = datetime.strptime(last_date, "%Y-%m-%d").strftime("%d.%m.%Y")
-            for i, row in enumerate(all_values[2:], start=3):
-                if row and row[0].strip() == last_date_fmt:
-                    start_row = i
-                    logger.info(f"📍 Знайдено останню дату в рядку {start_row}, перезаписуємо від нього")
-                    break
-            else:
-                start_row = len(all_values) + 1
-                logger.info(f"📍 Останню дату не знайдено в таблиці, дописуємо в кінець (рядок {start_row})")
-        else:
-            start_row = 3
+    ss = open_spreadsheet()
+    main_sheet = open_main_worksheet(ss)
 
-        end_row = start_row + len(main_rows) - 1
-        main_sheet.update(f"A{start_row}:AC{end_row}", main_rows, value_input_option="USER_ENTERED")
-        logger.info(f"✅ Основна вкладка оновлена (рядки {start_row}-{end_row})")
+    summary = diff_main_tab(main_sheet, dry_run=dry_run)
+    if dry_run:
+        return summary
 
     logs_title = _logs_sheet_name()
-    logger.info(f"📄 Експортуємо вкладку {logs_title} (повна перезапис)...")
-
-    try:
-        events_sheet = ss.worksheet(logs_title)
-    except Exception:
-        events_sheet = ss.add_worksheet(logs_title, rows=10000, cols=7)
-
-    events_sheet.clear()
-    events_sheet.update("A1:G1", [["Дата", "Час", "Подія", "Користувач", "Значення", "Водій", "Чек"]])
-
-    conn = db.get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT event_type, timestamp, user_name, value, driver_name, receipt_number
-        FROM logs
-        ORDER BY timestamp ASC
-    """
-    )
-    rows = cur.fetchall()
-    conn.close()
-
-    events = []
-    for row in rows:
-        event, ts_str, user, value, driver, receipt = row
-        dt = _parse_ts(ts_str)
-        if not dt:
-            continue
-
-        events.append(
-            [
-                dt.strftime("%d.%m.%Y"),
-                dt.strftime("%H:%M:%S"),
-                event,
-                user or "",
-                value or "",
-                driver or "",
-                receipt or "",
-            ]
-        )
+    logger.info(f"📄 Експортуємо вкладку {logs_title} (режим: {events_mode})...")
 
-    if events:
-        events_sheet.update(f"A2:G{len(events) + 1}", events, value_input_option="USER_ENTERED")
-        logger.info(f"✅ Вкладка {logs_title} оновлена ({len(events)} подій)")
+    events_sheet = ensure_logs_worksheet(ss)
+    if events_sheet is None:
+        raise RuntimeError(f"Не вдалося відкрити або створити вкладку {logs_title}")
+    summary["events"] = export_events_tab(events_sheet, events_mode)
 
     logger.info("✅ Експорт завершено!")
+    return summary
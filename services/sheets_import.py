@@ -1,7 +1,13 @@
 """Модуль імпорту з Google Sheets в БД.
 
 Читає дані з основної вкладки (A-AC) і вкладки LOGS_SHEET_NAME.
-Відновлює logs, maintenance, drivers, personnel в БД.
+Відновлює logs, maintenance, drivers, personnel в БД. Журнал подій береться
+з вкладки LOGS_SHEET_NAME (колонка ID = logs.id), основна вкладка доповнює
+дні/події, яких у журналі немає.
+
+Імпорт транзакційний: рядки розбираються в типізовані записи, пишуться
+executemany у тимчасові staging-таблиці і замінюють дані БД однією
+транзакцією. full_import(dry_run=True) лише показує, що зміниться.
 
 Важливо:
 - Витрата палива береться з ENV через config.FUEL_CONSUMPTION.
@@ -9,23 +15,25 @@
 """
 
 import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 
 import config
-from database.models import get_connection
-from services.google_sync_parts.client import make_client, open_spreadsheet, open_main_worksheet
+from database.models import _is_postgres, begin_transaction, get_connection, notify_change
+from database.api.daily_summary import _conn_rebuild_daily_summary
+from database.api.logs import log_time_columns
+from database.api.state_repo import invalidate_state_cache
+from database.api.state_v2 import _conn_v2_pull_kv
+from services.ledger import balance_as_of
+from services.google_sync_parts.client import open_spreadsheet, open_main_worksheet
+from services.google_sync_parts.session import get_session
 
 logger = logging.getLogger(__name__)
 
 
-def _fuel_rate() -> float:
-    """Єдине джерело правди для витрати палива (л/год)"""
-    try:
-        return float(getattr(config, "FUEL_CONSUMPTION", 0.0) or 0.0)
-    except Exception:
-        return 0.0
-
-
 def _logs_sheet_name() -> str:
     return (getattr(config, "LOGS_SHEET_NAME", None) or "ПОДІЇ").strip() or "ПОДІЇ"
 
@@ -54,80 +62,113 @@ def _parse_time(time_str: str) -> str | None:
         return None
 
 
-def _clear_db():
-    """Очищає БД перед імпортом"""
-    logger.info("🧹 Очищаємо БД перед імпортом...")
-    with get_connection() as conn:
-        conn.execute("DELETE FROM logs")
-        conn.execute("DELETE FROM schedule")
-        conn.execute("DELETE FROM maintenance")
-        conn.execute("DELETE FROM drivers")
-        conn.execute("DELETE FROM personnel_names")
-        conn.execute("DELETE FROM user_personnel")
-        conn.commit()
-    logger.info("✅ БД очищено")
+# Таблиці, які імпорт повністю замінює (schedule/user_personnel — лише очищаються, як і раніше)
+_REPLACED_TABLES = (
+    "logs",
+    "daily_summary",
+    "ledger_checkpoint",
+    "events_export_chunk",
+    "schedule",
+    "maintenance",
+    "drivers",
+    "personnel_names",
+    "user_personnel",
+)
+
+_STAGE_LOGS = "import_stage_logs"
+_STAGE_MAINTENANCE = "import_stage_maintenance"
+_STAGE_BATCH = 500
+_EVENTS_READ_ROWS = 5000
+_EVENTS_WIDTH = 8  # A..H
+
+_EVENT_CODE_RE = re.compile(r"\(([a-z_]+)\)\s*$")
+_SHIFT_EVENT_RE = re.compile(r"^[mdex]_(?:start|end)$")  # як у _parse_main_sheet
+_NUM_RE = re.compile(r"^-?\d+(?:[.,]\d+)?$")
+_EVENT_TS_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M")
+
+_LOG_COLUMNS = "event_type, timestamp, user_name, value, driver_name, receipt_number, event_date, event_ts"
+
+
+@dataclass(frozen=True)
+class ImportedLog:
+    """Подія, відновлена з рядка основної вкладки."""
+
+    event_type: str
+    timestamp: str
+    user_name: str
+    value: str | None = None
+    driver_name: str | None = None
+    receipt_number: str | None = None
+    log_id: int | None = None  # з вкладки журналу (колонка ID = logs.id)
+
+    def key(self) -> tuple:
+        """Ключ для порівняння з logs у dry-run (значення нормалізовані)."""
+        return (
+            self.timestamp,
+            self.event_type,
+            _norm_text(self.user_name),
+            _norm_value(self.value),
+            _norm_text(self.driver_name),
+            _norm_text(self.receipt_number),
+        )
+
+
+@dataclass(frozen=True)
+class ImportedMaintenance:
+    date: str
+    type: str
+    hours: float
+    admin: str = "import"
+
+
+@dataclass
+class ImportBatch:
+    """Розібрана основна вкладка: усе, що імпорт запише в БД."""
+
+    rows: int = 0
+    logs: list = field(default_factory=list)
+    maintenance: list = field(default_factory=list)
+    drivers: set = field(default_factory=set)
+    personnel: set = field(default_factory=set)
+    events: int = 0  # подій з вкладки журналу (після дедуплікації за ID)
+    events_duplicates: int = 0
+    supplemented: int = 0  # подій з основної вкладки, яких немає в журналі
+
+
+def _norm_text(v) -> str:
+    return ("" if v is None else str(v)).strip()
+
+
+def _norm_value(v) -> str:
+    s = _norm_text(v)
+    try:
+        return f"{float(s.replace(',', '.')):.3f}" if s else ""
+    except Exception:
+        return s
 
 
-def _restore_generator_state():
-    """Відновлює generator_state з логів.
+def _conn_restore_generator_state(conn) -> tuple:
+    """Відновлює generator_state з логів (services.ledger.balance_as_of) у транзакції conn.
 
     Обчислює:
     - current_fuel (поточний залишок палива з врахуванням витрат)
     - total_hours (загальні мотогодини)
     - last_oil_change, last_spark_change (останнє ТО)
-    """
-    logger.info("🔧 Відновлюємо стан генератора з логів...")
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT event_type, timestamp, value
-        FROM logs
-        ORDER BY timestamp ASC
+    Повертає (паливо, мотогодини, остання заміна оливи, свічок).
     """
-    )
-    rows = cur.fetchall()
+    balance = balance_as_of(conn=conn)
+    running_fuel = balance.fuel
+    running_hours = balance.hours
 
-    cur.execute(
+    mnt_rows = conn.execute(
         """
         SELECT date, type, hours
         FROM maintenance
         ORDER BY date DESC
         LIMIT 10
     """
-    )
-    mnt_rows = cur.fetchall()
-
-    rate = _fuel_rate()
-
-    running_fuel = 0.0
-    running_hours = 0.0
-    active_shifts = {}  # {shift: start_time}
-
-    for event, ts_str, value in rows:
-        if event == "refill":
-            running_fuel += float(value or 0)
-        elif event == "fuel_set":
-            running_fuel = float(value or 0)
-        elif event.endswith("_start"):
-            shift = event.split("_")[0]
-            active_shifts[shift] = ts_str
-        elif event.endswith("_end"):
-            shift = event.split("_")[0]
-            if shift in active_shifts:
-                try:
-                    start_ts = datetime.strptime(active_shifts[shift], "%Y-%m-%d %H:%M:%S")
-                    end_ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                    delta = (end_ts - start_ts).total_seconds() / 3600.0
-                    running_hours += delta
-                    running_fuel -= delta * rate
-                except Exception:
-                    pass
-                del active_shifts[shift]
-        elif event == "total_hours_set":
-            running_hours = float(value or 0)
+    ).fetchall()
 
     last_oil = ""
     last_spark = ""
@@ -151,37 +192,15 @@ def _restore_generator_state():
 
     conn.execute("UPDATE generator_state SET value = 'OFF' WHERE key = 'status'")
     conn.execute("UPDATE generator_state SET value = 'none' WHERE key = 'active_shift'")
+    _conn_v2_pull_kv(conn)
+    return running_fuel, running_hours, last_oil, last_spark
 
-    conn.commit()
-    conn.close()
-
-    logger.info(f"✅ Стан відновлено: паливо={running_fuel:.1f}л, мотогодини={running_hours:.1f}")
-    if last_oil:
-        logger.info(f"✅ Останнє ТО (олива): {last_oil}")
-    if last_spark:
-        logger.info(f"✅ Останнє ТО (свічки): {last_spark}")
-
-
-def _import_main_sheet(sheet):
-    """Імпорт з основної вкладки (A-AC)"""
-    logger.info("📥 Читаємо основну вкладку...")
-
-    all_values = sheet.get_all_values()
 
-    if len(all_values) < 3:
-        logger.warning("⚠️ Таблиця порожня або немає даних")
-        return
-
-    data_rows = all_values[2:]
-
-    conn = get_connection()
-
-    all_drivers = set()
-    all_personnel = set()
-
-    for row_idx, row in enumerate(data_rows, start=3):
+def _iter_main_records(data_rows, start_row: int = 3):
+    """Розбирає рядки основної вкладки (A-AC) на ImportedLog / ImportedMaintenance (генератор)."""
+    for row_idx, row in enumerate(data_rows, start=start_row):
         if len(row) < 29:
-            row.extend([""] * (29 - len(row)))
+            row = list(row) + [""] * (29 - len(row))
 
         date_str = _parse_date(row[0])
         if not date_str:
@@ -208,135 +227,389 @@ def _import_main_sheet(sheet):
             end_parsed = _parse_time(end_time)
 
             if start_parsed:
-                ts = f"{date_str} {start_parsed}"
-                conn.execute(
-                    "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-                    (
-                        f"{shift_code}_start",
-                        ts,
-                        start_user.strip() if start_user else "",
-                        None,
-                        None,
-                        None,
-                    ),
-                )
-                if start_user and start_user.strip():
-                    all_personnel.add(start_user.strip())
+                yield ImportedLog(f"{shift_code}_start", f"{date_str} {start_parsed}", _norm_text(start_user))
 
             if end_parsed:
-                ts = f"{date_str} {end_parsed}"
-                conn.execute(
-                    "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-                    (f"{shift_code}_end", ts, end_user.strip() if end_user else "", None, None, None),
-                )
-                if end_user and end_user.strip():
-                    all_personnel.add(end_user.strip())
-
-        refill_str = row[13].strip() if len(row) > 13 and row[13] else ""
+                yield ImportedLog(f"{shift_code}_end", f"{date_str} {end_parsed}", _norm_text(end_user))
+
+        refill_str = _norm_text(row[13])
         if refill_str:
             try:
                 refill_amount = float(refill_str)
                 if refill_amount > 0:
-                    driver = row[26].strip() if len(row) > 26 and row[26] else ""
-                    receipt = row[15].strip() if len(row) > 15 and row[15] else ""
-
                     refill_time = "23:59:00"
                     for shift_code, start_time, end_time in reversed(shifts):
                         if _parse_time(end_time):
                             refill_time = _parse_time(end_time)
                             break
 
-                    ts = f"{date_str} {refill_time}"
-                    conn.execute(
-                        "INSERT INTO logs (event_type, timestamp, user_name, value, driver_name, receipt_number) VALUES (?,?,?,?,?,?)",
-                        ("refill", ts, "", str(refill_amount), driver, receipt),
+                    yield ImportedLog(
+                        "refill",
+                        f"{date_str} {refill_time}",
+                        "",
+                        str(refill_amount),
+                        _norm_text(row[26]),
+                        _norm_text(row[15]),
                     )
-
-                    if driver:
-                        all_drivers.add(driver)
             except Exception as e:
                 logger.warning(f"⚠️ Не вдалося розпарсити refill в рядку {row_idx}: {e}")
 
-        mnt_date = row[17].strip() if len(row) > 17 and row[17] else ""
+        mnt_date = _norm_text(row[17])
         if mnt_date:
-            hours_str = row[16].strip() if len(row) > 16 and row[16] else "0"
+            hours_str = _norm_text(row[16]) or "0"
             try:
-                hours = float(hours_str)
-                conn.execute(
-                    "INSERT INTO maintenance (date, type, hours, admin) VALUES (?,?,?,?)",
-                    (date_str, "oil", hours, "import"),
-                )
+                yield ImportedMaintenance(date_str, "oil", float(hours_str))
             except Exception as e:
                 logger.warning(f"⚠️ Не вдалося розпарсити maintenance в рядку {row_idx}: {e}")
 
-    conn.commit()
 
-    for driver in all_drivers:
-        try:
-            conn.execute("INSERT INTO drivers (name) VALUES (?) ON CONFLICT(name) DO NOTHING", (driver,))
-        except Exception:
-            try:
-                conn.execute("INSERT OR IGNORE INTO drivers (name) VALUES (?)", (driver,))
-            except Exception:
-                pass
+def _parse_main_sheet(sheet) -> ImportBatch:
+    """Одне читання основної вкладки -> ImportBatch."""
+    logger.info("📥 Читаємо основну вкладку...")
+
+    all_values = sheet.get_all_values()
+    batch = ImportBatch()
+
+    if len(all_values) < 3:
+        logger.warning("⚠️ Таблиця порожня або немає даних")
+        return batch
+
+    batch.rows = len(all_values) - 2
+    for rec in _iter_main_records(all_values[2:]):
+        if isinstance(rec, ImportedMaintenance):
+            batch.maintenance.append(rec)
+            continue
+        batch.logs.append(rec)
+        if rec.event_type == "refill":
+            if rec.driver_name:
+                batch.drivers.add(rec.driver_name)
+        elif rec.user_name:
+            batch.personnel.add(rec.user_name)
+
+    logger.info(
+        f"✅ Розібрано {batch.rows} рядків: подій {len(batch.logs)}, ТО {len(batch.maintenance)}, "
+        f"водіїв {len(batch.drivers)}, персоналу {len(batch.personnel)}"
+    )
+    return batch
 
-    for person in all_personnel:
+
+def _parse_event_ts(value) -> str | None:
+    """Дата/час з вкладки журналу -> "YYYY-MM-DD HH:MM:SS" (Sheets може переформатувати USER_ENTERED)."""
+    s = _norm_text(value)
+    for fmt in _EVENT_TS_FORMATS:
         try:
-            conn.execute("INSERT INTO personnel_names (name) VALUES (?) ON CONFLICT(name) DO NOTHING", (person,))
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d %H:%M:%S")
         except Exception:
-            try:
-                conn.execute("INSERT OR IGNORE INTO personnel_names (name) VALUES (?)", (person,))
-            except Exception:
-                pass
+            continue
+    return None
+
+
+def _event_code(value) -> str:
+    """"Ранкова зміна — старт (m_start)" -> "m_start"; невідомі типи записані як є."""
+    s = _norm_text(value)
+    m = _EVENT_CODE_RE.search(s)
+    return m.group(1) if m else s
+
 
-    conn.commit()
-    conn.close()
+def _parse_event_row(row) -> ImportedLog | None:
+    """Рядок вкладки журналу (розкладка logs_tab.log_row_values) -> ImportedLog з log_id."""
+    row = list(row) + [""] * (_EVENTS_WIDTH - len(row))
+    try:
+        lid = int(_norm_text(row[0]))
+    except Exception:
+        return None
+    ts = _parse_event_ts(row[1])
+    event = _event_code(row[2])
+    if lid <= 0 or not ts or not event:
+        return None
+
+    value = _norm_text(row[7])
+    if _NUM_RE.match(value):
+        value = value.replace(",", ".")
+    if event == "refill" and not value:
+        value = _norm_text(row[4]).replace(",", ".")
+
+    return ImportedLog(
+        event,
+        ts,
+        _norm_text(row[3]),
+        value or None,
+        _norm_text(row[6]) or None,
+        _norm_text(row[5]) or None,
+        log_id=lid,
+    )
 
-    logger.info(f"✅ Імпортовано {len(data_rows)} рядків")
-    logger.info(f"✅ Водіїв: {len(all_drivers)}, Персоналу: {len(all_personnel)}")
 
+def _iter_events_values(ws):
+    """Рядки вкладки журналу (з 2-го) вікнами по _EVENTS_READ_ROWS, без get_all_values()."""
+    total = int(getattr(ws, "row_count", 0) or 0)
+    start = 2
+    while start <= total:
+        end = min(total, start + _EVENTS_READ_ROWS - 1)
+        yield from ws.get(f"A{start}:H{end}") or []
+        start = end + 1
 
-def _import_events_sheet(ss):
-    """Імпорт з вкладки LOGS_SHEET_NAME (опціонально)"""
+
+def _parse_events_sheet(ss) -> tuple[dict, int]:
+    """Події вкладки LOGS_SHEET_NAME: ({log_id: ImportedLog}, к-сть дублікатів ID).
+
+    Дублікати ID (рядок скопіювали вручну) — перемагає нижчий рядок.
+    Вкладки немає — ({}, 0), імпорт іде лише з основної вкладки.
+    """
     title = _logs_sheet_name()
     try:
-        events_sheet = ss.worksheet(title)
+        events_sheet = get_session().worksheet(title, key=ss.id)
     except Exception:
         logger.info(f"ℹ️ Вкладка {title} не знайдена, пропускаємо")
-        return
+        return {}, 0
 
     logger.info(f"📥 Читаємо вкладку {title}...")
 
-    all_values = events_sheet.get_all_values()
-    if len(all_values) < 2:
-        logger.info(f"ℹ️ Вкладка {title} порожня")
+    events = {}
+    duplicates = 0
+    skipped = 0
+    for row in _iter_events_values(events_sheet):
+        if not any(_norm_text(v) for v in row):
+            continue
+        rec = _parse_event_row(row)
+        if rec is None:
+            skipped += 1
+            continue
+        if rec.log_id in events:
+            duplicates += 1
+        events[rec.log_id] = rec
+
+    logger.info(f"✅ Вкладка {title}: подій {len(events)}, дублікатів ID {duplicates}, пропущено рядків {skipped}")
+    return events, duplicates
+
+
+def _merge_events(batch: ImportBatch, events: dict, duplicates: int = 0):
+    """Вкладка журналу — джерело правди для logs (точні час, ID, auto_close, корекції).
+
+    Події, відновлені з основної вкладки, лишаються лише для (дата, тип), яких
+    у журналі немає (наприклад, рядок дописали в основну вкладку вручну).
+    """
+    if not events:
         return
 
-    events_rows = all_values[1:]
-    logger.info(f"ℹ️ Вкладка {title} містить {len(events_rows)} подій (не імпортуємо, щоб уникнути дублювання)")
+    ordered = [events[lid] for lid in sorted(events)]
+    covered = {(r.timestamp[:10], r.event_type) for r in ordered}
+    extra = [r for r in batch.logs if (r.timestamp[:10], r.event_type) not in covered]
+
+    batch.logs = ordered + extra
+    batch.events = len(ordered)
+    batch.events_duplicates = duplicates
+    batch.supplemented = len(extra)
+    batch.drivers.update(r.driver_name for r in ordered if r.event_type == "refill" and r.driver_name)
+    # персонал — як у _parse_main_sheet: хто стартував/зупиняв зміни (не System/адмін-дії)
+    batch.personnel.update(r.user_name for r in ordered if _SHIFT_EVENT_RE.match(r.event_type or "") and r.user_name)
+
+    if extra:
+        logger.info(f"ℹ️ Доповнено з основної вкладки: {len(extra)} подій")
+
+
+def _stage_rows(conn, table: str, columns: str, rows):
+    """executemany у staging-таблицю порціями по _STAGE_BATCH рядків."""
+    placeholders = ",".join("?" for _ in columns.split(","))
+    query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+    it = iter(rows)
+    total = 0
+    while True:
+        chunk = list(islice(it, _STAGE_BATCH))
+        if not chunk:
+            return total
+        conn.executemany(query, chunk)
+        total += len(chunk)
+
+
+def _create_stage_tables(conn):
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {_STAGE_LOGS} (
+            seq INTEGER, log_id BIGINT, event_type TEXT, timestamp TEXT, user_name TEXT, value TEXT,
+            driver_name TEXT, receipt_number TEXT, event_date TEXT, event_ts BIGINT, is_synced INTEGER
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {_STAGE_MAINTENANCE} (
+            seq INTEGER, date TEXT, type TEXT, hours DOUBLE PRECISION, admin TEXT
+        )
+        """
+    )
+    # з'єднання перевикористовуються (пул / per-thread sqlite): хвіст попереднього імпорту
+    conn.execute(f"DELETE FROM {_STAGE_LOGS}")
+    conn.execute(f"DELETE FROM {_STAGE_MAINTENANCE}")
 
 
-def full_import():
-    """Повний імпорт з Google Sheets в БД.
+def _drop_stage_tables(conn):
+    conn.execute(f"DROP TABLE IF EXISTS {_STAGE_LOGS}")
+    conn.execute(f"DROP TABLE IF EXISTS {_STAGE_MAINTENANCE}")
+
 
-    Читає:
-    - Основну вкладку (A-AC)
-    - Вкладку LOGS_SHEET_NAME (опціонально)
+def _apply_batch(batch: ImportBatch):
+    """Заміна даних БД на batch однією транзакцією: staging -> DELETE -> INSERT ... SELECT
+    -> generator_state з щойно вставлених logs (_conn_restore_generator_state).
 
-    Відновлює logs, maintenance, drivers, personnel в БД.
-    Після імпорту відновлює generator_state (паливо з врахуванням витрат, мотогодини, ТО).
+    Будь-яка помилка відкочує все — БД лишається такою, як до імпорту.
     """
-    logger.info("📥 Починаємо імпорт з Sheets в БД...")
+    logger.info("🧹 Замінюємо дані БД (одна транзакція)...")
+    with get_connection() as conn:
+        begin_transaction(conn)
+        _create_stage_tables(conn)
+
+        _stage_rows(
+            conn,
+            _STAGE_LOGS,
+            f"seq, log_id, {_LOG_COLUMNS}, is_synced",
+            (
+                (seq, r.log_id, r.event_type, r.timestamp, r.user_name, r.value, r.driver_name, r.receipt_number)
+                + tuple(log_time_columns(r.timestamp))
+                # події з журналу вже є у вкладці; доповнені — синк допише їх туди
+                + (1 if r.log_id is not None else 0,)
+                for seq, r in enumerate(batch.logs)
+            ),
+        )
+        _stage_rows(
+            conn,
+            _STAGE_MAINTENANCE,
+            "seq, date, type, hours, admin",
+            ((seq, m.date, m.type, m.hours, m.admin) for seq, m in enumerate(batch.maintenance)),
+        )
+
+        for table in _REPLACED_TABLES:
+            conn.execute(f"DELETE FROM {table}")
+
+        # ID з журналу зберігаються (рядок вкладки = logs.id + 1), решта отримує нові після max(id)
+        conn.execute(
+            f"INSERT INTO logs (id, {_LOG_COLUMNS}, is_synced) "
+            f"SELECT log_id, {_LOG_COLUMNS}, is_synced FROM {_STAGE_LOGS} WHERE log_id IS NOT NULL ORDER BY log_id"
+        )
+        if _is_postgres():
+            conn.execute(
+                "SELECT setval(pg_get_serial_sequence('logs', 'id'), COALESCE((SELECT MAX(id) FROM logs), 0) + 1, false)"
+            )
+        conn.execute(
+            f"INSERT INTO logs ({_LOG_COLUMNS}, is_synced) "
+            f"SELECT {_LOG_COLUMNS}, is_synced FROM {_STAGE_LOGS} WHERE log_id IS NULL ORDER BY seq"
+        )
+        conn.execute(
+            f"INSERT INTO maintenance (date, type, hours, admin) "
+            f"SELECT date, type, hours, admin FROM {_STAGE_MAINTENANCE} ORDER BY seq"
+        )
+        conn.executemany(
+            "INSERT INTO drivers (name) VALUES (?) ON CONFLICT(name) DO NOTHING",
+            [(d,) for d in sorted(batch.drivers)],
+        )
+        conn.executemany(
+            "INSERT INTO personnel_names (name) VALUES (?) ON CONFLICT(name) DO NOTHING",
+            [(p,) for p in sorted(batch.personnel)],
+        )
+
+        days = _conn_rebuild_daily_summary(conn)
+
+        logger.info("🔧 Відновлюємо стан генератора з логів...")
+        fuel, hours, last_oil, last_spark = _conn_restore_generator_state(conn)
+
+        _drop_stage_tables(conn)
+        notify_change(conn, "logs")
+    invalidate_state_cache()
+
+    logger.info(
+        f"✅ Імпортовано {batch.rows} рядків: подій {len(batch.logs)}, ТО {len(batch.maintenance)}, днів {days}"
+    )
+    logger.info(f"✅ Водіїв: {len(batch.drivers)}, Персоналу: {len(batch.personnel)}")
+    logger.info(f"✅ Стан відновлено: паливо={fuel:.1f}л, мотогодини={hours:.1f}")
+    if last_oil:
+        logger.info(f"✅ Останнє ТО (олива): {last_oil}")
+    if last_spark:
+        logger.info(f"✅ Останнє ТО (свічки): {last_spark}")
+
+
+def _diff_batch(batch: ImportBatch) -> dict:
+    """Що змінить імпорт batch у поточній БД (нічого не пише)."""
+    with get_connection() as conn:
+        log_rows = conn.execute(
+            "SELECT timestamp, event_type, user_name, value, driver_name, receipt_number FROM logs"
+        ).fetchall()
+        mnt_count = conn.execute("SELECT COUNT(*) FROM maintenance").fetchone()[0]
+        drivers = {_norm_text(r[0]) for r in conn.execute("SELECT name FROM drivers").fetchall()}
+        personnel = {_norm_text(r[0]) for r in conn.execute("SELECT name FROM personnel_names").fetchall()}
+        cleared = {
+            t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("schedule", "user_personnel")
+        }
+
+    current = Counter(
+        (_norm_text(ts), _norm_text(ev), _norm_text(u), _norm_value(v), _norm_text(d), _norm_text(rc))
+        for ts, ev, u, v, d, rc in log_rows
+    )
+    incoming = Counter(r.key() for r in batch.logs)
+    added = incoming - current
+    removed = current - incoming
+    dates = sorted({k[0][:10] for k in list(added) + list(removed)})
+
+    summary = {
+        "dry_run": True,
+        "rows": batch.rows,
+        "logs": {
+            "current": sum(current.values()),
+            "new": sum(incoming.values()),
+            "added": sum(added.values()),
+            "removed": sum(removed.values()),
+            "unchanged": sum((current & incoming).values()),
+        },
+        "dates_changed": dates,
+        "maintenance": {"current": int(mnt_count or 0), "new": len(batch.maintenance)},
+        "drivers": {"added": sorted(batch.drivers - drivers), "removed": sorted(drivers - batch.drivers)},
+        "personnel": {"added": sorted(batch.personnel - personnel), "removed": sorted(personnel - batch.personnel)},
+        "cleared": cleared,
+        "events": {
+            "rows": batch.events,
+            "duplicates": batch.events_duplicates,
+            "supplemented": batch.supplemented,
+        },
+    }
+    logger.info(
+        f"🔎 Dry-run імпорту: подій +{summary['logs']['added']} / -{summary['logs']['removed']} "
+        f"(без змін {summary['logs']['unchanged']}), змінених днів {len(dates)}"
+    )
+    return summary
 
-    _clear_db()
 
-    client = make_client()
-    ss = open_spreadsheet(client)
+def full_import(dry_run: bool = False) -> dict:
+    """Повний імпорт з Google Sheets в БД.
+
+    Конвеєр: одне читання основної вкладки (A-AC) -> типізовані записи
+    (ImportedLog / ImportedMaintenance) -> executemany у staging-таблиці ->
+    заміна даних БД однією транзакцією (помилка посередині нічого не змінює).
+    Вкладка LOGS_SHEET_NAME (якщо є) — джерело правди для logs: ID зберігаються,
+    тож повторний імпорт ідемпотентний; основна вкладка лише доповнює (_merge_events).
+
+    У тій самій транзакції відновлює generator_state (паливо з врахуванням витрат,
+    мотогодини, ТО) з імпортованих logs.
+    dry_run=True — нічого не пише, повертає diff з поточною БД (див. _diff_batch).
+    """
+    logger.info(f"📥 Починаємо {'dry-run ' if dry_run else ''}імпорт з Sheets в БД...")
+
+    ss = open_spreadsheet()
     main_sheet = open_main_worksheet(ss)
 
-    _import_main_sheet(main_sheet)
-    _import_events_sheet(ss)
+    batch = _parse_main_sheet(main_sheet)
+    _merge_events(batch, *_parse_events_sheet(ss))
+    if dry_run:
+        return _diff_batch(batch)
 
-    _restore_generator_state()
+    _apply_batch(batch)
 
     logger.info("✅ Імпорт завершено!")
+    return {
+        "dry_run": False,
+        "rows": batch.rows,
+        "logs": len(batch.logs),
+        "maintenance": len(batch.maintenance),
+        "drivers": len(batch.drivers),
+        "personnel": len(batch.personnel),
+        "events": batch.events,
+        "supplemented": batch.supplemented,
+    }
@@ -4,10 +4,12 @@ This package is the canonical implementation used by services.google_sync.
 It also re-exports the historical API that previously lived in services/sheets_sync.py.
 """
 
+from .batch import SheetWritePlan
 from .refill import parse_refill_value, update_refill_aggregates_for_date
 from .logs_tab import ensure_logs_worksheet, ensure_logs_header, upsert_log_row
 
 __all__ = [
+    "SheetWritePlan",
     "parse_refill_value",
     "update_refill_aggregates_for_date",
     "ensure_logs_worksheet",
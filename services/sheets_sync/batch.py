@@ -0,0 +1,109 @@
+"""План записів у worksheet: замість окремого update на кожну клітинку/рядок
+клітинки збираються, коалесуються і відправляються одним values_batch_update.
+
+- повторний запис у ту саму клітинку — перемагає останній;
+- сусідні клітинки рядка — один діапазон (B5:C5), однакові діапазони
+  в сусідніх рядках — один прямокутник (A10:H14);
+- valueInputOption один на запит (USER_ENTERED), тому "сирі" значення (raw=True)
+  екрануються апострофом — Sheets збереже їх як текст (апостроф не видно);
+- після успішного flush() записане одразу потрапляє в дзеркало основної вкладки
+  (google_sync_parts.mirror), без повторного читання;
+- flush_async() — той самий запит з event loop через async-клієнт (без потоку
+  пулу "sheets"), для циклу синку.
+"""
+
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from services.google_sync_parts.async_client import get_async_client
+from services.google_sync_parts.mirror import get_mirror
+
+
+def _raw_text(value) -> str:
+    s = "" if value is None else str(value)
+    return f"'{s}" if s else s
+
+
+class SheetWritePlan:
+    """Зібрані записи в один worksheet; flush() — один запит до API."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._cells = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def set(self, row: int, col: int, value, *, raw: bool = False):
+        self._cells[(int(row), int(col))] = _raw_text(value) if raw else ("" if value is None else value)
+
+    def set_row(self, row: int, first_col: int, values: list, *, raw: bool = False):
+        for i, v in enumerate(values):
+            self.set(row, first_col + i, v, raw=raw)
+
+    def max_row(self) -> int:
+        return max((r for r, _ in self._cells), default=0)
+
+    def _row_runs(self) -> dict:
+        """{row: [(first_col, last_col, [values...]), ...]} — неперервні шматки кожного рядка."""
+        runs = {}
+        for row, col in sorted(self._cells):
+            row_runs = runs.setdefault(row, [])
+            v = self._cells[(row, col)]
+            if row_runs and row_runs[-1][1] == col - 1:
+                c1, _, vals = row_runs[-1]
+                vals.append(v)
+                row_runs[-1] = (c1, col, vals)
+            else:
+                row_runs.append((col, col, [v]))
+        return runs
+
+    def ranges(self) -> list[dict]:
+        """Діапазони для values_batch_update: однакові колонки в сусідніх рядках — один блок."""
+        blocks = []
+        open_blocks = {}
+        for row, row_runs in sorted(self._row_runs().items()):
+            for c1, c2, vals in row_runs:
+                block = open_blocks.get((c1, c2))
+                if block is not None and block["last_row"] == row - 1:
+                    block["values"].append(vals)
+                    block["last_row"] = row
+                else:
+                    block = {"first_row": row, "last_row": row, "c1": c1, "c2": c2, "values": [vals]}
+                    open_blocks[(c1, c2)] = block
+                    blocks.append(block)
+
+        title = getattr(self.ws, "title", "")
+        return [
+            {
+                "range": absolute_range_name(
+                    title,
+                    f"{rowcol_to_a1(b['first_row'], b['c1'])}:{rowcol_to_a1(b['last_row'], b['c2'])}",
+                ),
+                "values": b["values"],
+            }
+            for b in blocks
+        ]
+
+    def flush(self) -> int:
+        """Відправляє план одним values_batch_update. Повертає к-сть запитів (0 або 1)."""
+        if not self._cells:
+            return 0
+        self.ws.spreadsheet.values_batch_update(
+            {
+                "valueInputOption": "USER_ENTERED",
+                "data": self.ranges(),
+            }
+        )
+        get_mirror().apply_cells(self.ws, self._cells)
+        self._cells.clear()
+        return 1
+
+    async def flush_async(self) -> int:
+        """Як flush(), але з event loop (async_client.values_batch_update)."""
+        if not self._cells:
+            return 0
+        cells = dict(self._cells)
+        await get_async_client().values_batch_update(self.ranges(), spreadsheet_id=self.ws.spreadsheet_id)
+        get_mirror().apply_cells(self.ws, cells)
+        self._cells.clear()
+        return 1
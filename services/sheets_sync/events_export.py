@@ -0,0 +1,161 @@
+"""Експорт вкладки журналу подій (LOGS_SHEET_NAME) блоками logs.id.
+
+Розкладка та сама, що й у циклі синку (logs_tab): рядок = logs.id + 1,
+колонки A..H (ID, дата/час, тип, користувач, літри, чек, водій, значення).
+Тому блок [k*N+1 .. (k+1)*N] завжди займає ті самі рядки, і його можна
+переписати окремо, не чіпаючи решту вкладки (і ручні правки в ній).
+
+Режими:
+- "append"  — дописати лише події новіші за high-water mark (дефолт);
+- "verify"  — перерахувати контрольні суми блоків з БД і переписати ті, що
+              відрізняються від записаних (видалені/змінені/перенумеровані логи);
+- "rewrite" — очистити вкладку і записати все заново (явна опція).
+"""
+
+import hashlib
+import json
+import logging
+
+import config
+import database.db_api as db
+
+from .batch import SheetWritePlan
+from .logs_tab import ensure_logs_header, ensure_logs_rows, log_row_values, logs_row_for_id
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MODES = ("append", "verify", "rewrite")
+_ROW_WIDTH = 8
+
+
+def _chunk_size() -> int:
+    try:
+        return max(1, int(getattr(config, "EVENTS_EXPORT_CHUNK", 500) or 500))
+    except Exception:
+        return 500
+
+
+def sheet_key_for(ws) -> str:
+    return f"{getattr(ws, 'spreadsheet_id', '') or config.SHEET_ID}:{getattr(ws, 'title', '')}"
+
+
+def _chunk_bounds(chunk: int, size: int) -> tuple[int, int]:
+    return chunk * size + 1, (chunk + 1) * size
+
+
+def _chunk_values(chunk: int, size: int, upto_id: int) -> tuple[list, int]:
+    """Рядки блоку з БД (id без події — порожній рядок) до upto_id включно і к-сть подій."""
+    first_id, last_id = _chunk_bounds(chunk, size)
+    last_id = min(last_id, upto_id)
+    by_id = {int(r[0]): r for r in db.get_logs_by_id_range(first_id, last_id)}
+
+    values = []
+    for lid in range(first_id, last_id + 1):
+        r = by_id.get(lid)
+        if r is None:
+            values.append([""] * _ROW_WIDTH)
+        else:
+            _, ltype, ltime, luser, lval, ldriver, lreceipt = r
+            values.append(log_row_values(lid, ltime or "", ltype or "", luser or "", lval or "", ldriver or "", lreceipt or ""))
+    return values, len(by_id)
+
+
+def _checksum(values: list) -> str:
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _write_rows(ws, first_id: int, values: list, blank_to_id: int | None = None):
+    """Пише values у рядки подій з first_id (один запит); blank_to_id — далі очищає до цього id."""
+    plan = SheetWritePlan(ws)
+    row = logs_row_for_id(first_id)
+    for i, vals in enumerate(values):
+        plan.set_row(row + i, 1, vals)
+    if blank_to_id is not None:
+        for lid in range(first_id + len(values), blank_to_id + 1):
+            plan.set_row(logs_row_for_id(lid), 1, [""] * _ROW_WIDTH)
+    if len(plan):
+        ensure_logs_rows(ws, plan.max_row())
+        plan.flush()
+
+
+def export_events_tab(ws, mode: str = "append") -> dict:
+    """Експорт журналу у вкладку ws. Повертає статистику {mode, chunks_written, rows_written, high_water_mark}."""
+    mode = (mode or "append").lower()
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Невідомий режим експорту журналу: {mode!r}")
+
+    size = _chunk_size()
+    key = sheet_key_for(ws)
+    max_id = db.get_logs_max_id()
+
+    if mode == "rewrite":
+        ws.clear()
+        db.clear_export_chunks(key)
+        # заголовок перевіряється раз на об'єкт worksheet — після clear() форсуємо
+        try:
+            ws._logs_header_ready = False
+        except Exception:
+            pass
+
+    ensure_logs_header(ws)
+
+    stored = db.get_export_chunks(key)
+    hwm = max((c["max_id"] for c in stored.values()), default=0)
+    last_chunk = (max_id - 1) // size if max_id > 0 else -1
+
+    written_chunks = 0
+    written_rows = 0
+    new_state = {}
+
+    if mode == "verify":
+        chunks = range(0, last_chunk + 1)
+    else:
+        first_new = hwm + 1
+        chunks = range((first_new - 1) // size, last_chunk + 1) if max_id >= first_new else range(0)
+
+    for chunk in chunks:
+        values, n_events = _chunk_values(chunk, size, max_id)
+        checksum = _checksum(values)
+        info = stored.get(chunk)
+        first_id, _ = _chunk_bounds(chunk, size)
+        chunk_max = first_id + len(values) - 1
+
+        if mode == "verify":
+            if info and info["checksum"] == checksum and info["max_id"] == chunk_max:
+                continue
+            # блок відрізняється: переписуємо повністю (і чистимо хвіст, якщо раніше був довшим)
+            _write_rows(ws, first_id, values, blank_to_id=max(chunk_max, info["max_id"] if info else 0))
+            written_rows += len(values)
+        else:
+            # дописуємо лише новіші за high-water mark рядки блоку
+            start = max(first_id, hwm + 1)
+            tail = values[start - first_id:]
+            _write_rows(ws, start, tail)
+            written_rows += len(tail)
+
+        written_chunks += 1
+        new_state[chunk] = {"checksum": checksum, "max_id": chunk_max, "rows": n_events}
+        # стан зберігаємо після кожного блоку: обірваний експорт продовжиться з місця зупинки
+        db.save_export_chunks(key, {chunk: new_state[chunk]})
+
+    if mode == "verify":
+        # блоки за межами поточного журналу (логи видалили) — очищаємо рядки і стан
+        stale = {c: None for c in stored if c > last_chunk}
+        for chunk in sorted(stale):
+            first_id, _ = _chunk_bounds(chunk, size)
+            _write_rows(ws, first_id, [], blank_to_id=stored[chunk]["max_id"])
+            written_chunks += 1
+        db.save_export_chunks(key, stale)
+
+    result = {
+        "mode": mode,
+        "chunks_written": written_chunks,
+        "rows_written": written_rows,
+        "high_water_mark": max_id,
+    }
+    logger.info(
+        f"✅ Журнал ({getattr(ws, 'title', '')}, {mode}): блоків записано {written_chunks}, "
+        f"рядків {written_rows}, до logs.id={max_id}"
+    )
+    return result
@@ -1,4 +1,5 @@
 import config
+from services.google_sync_parts.session import get_session
 
 from .refill import parse_refill_value
 
@@ -7,10 +8,12 @@ def ensure_logs_worksheet(ss):
     """Повертає worksheet для журналу подій. Якщо не існує — створює."""
     title = (getattr(config, "LOGS_SHEET_NAME", None) or "ПОДІЇ").strip()
     try:
-        return ss.worksheet(title)
+        return get_session().worksheet(title, key=ss.id)
     except Exception:
         try:
-            return ss.add_worksheet(title=title, rows=5000, cols=10)
+            ws = ss.add_worksheet(title=title, rows=5000, cols=10)
+            get_session().remember_worksheet(ws)
+            return ws
         except Exception:
             # якщо не можемо створити — просто не будемо вести журнал
             return None
@@ -70,6 +73,11 @@ def ensure_logs_header(ws):
     if not ws:
         return
 
+    # Worksheet закешований сесією: заголовок/формат перевіряємо раз на об'єкт,
+    # а не щоциклу (після invalidate сесії буде новий об'єкт — перевіримо знову)
+    if getattr(ws, "_logs_header_ready", False):
+        return
+
     # Українські назви колонок
     header = [
         "ID",
@@ -105,6 +113,11 @@ def ensure_logs_header(ws):
 
     _format_logs_header(ws)
 
+    try:
+        ws._logs_header_ready = True
+    except Exception:
+        pass
+
 
 def ensure_logs_rows(ws, needed_row: int):
     """Гарантує, що worksheet має мінімум needed_row рядків."""
@@ -163,21 +176,16 @@ def _event_type_human(ltype: str) -> str:
     return code
 
 
-def upsert_log_row(ws, lid: int, ltime: str, ltype: str, luser: str, lval: str, ldriver: str):
-    """Idempotent write у вкладку логів: один log_id = один рядок."""
-    if not ws:
-        return
-
-    row = logs_row_for_id(lid)
-    ensure_logs_rows(ws, row)
-
+def log_row_values(lid: int, ltime: str, ltype: str, luser: str, lval: str, ldriver: str, lreceipt: str = "") -> list:
+    """Значення рядка вкладки логів (A..H) для події."""
     liters = 0.0
     receipt = ""
 
     if (ltype or "") == "refill":
         liters, receipt = parse_refill_value(lval)
+        receipt = str(lreceipt or "").strip() or receipt
 
-    values = [
+    return [
         str(lid),
         ltime or "",
         _event_type_human(ltype),
@@ -188,8 +196,17 @@ def upsert_log_row(ws, lid: int, ltime: str, ltype: str, luser: str, lval: str,
         lval or "",
     ]
 
+
+def upsert_log_row(ws, lid: int, ltime: str, ltype: str, luser: str, lval: str, ldriver: str, lreceipt: str = ""):
+    """Idempotent write у вкладку логів: один log_id = один рядок."""
+    if not ws:
+        return
+
+    row = logs_row_for_id(lid)
+    ensure_logs_rows(ws, row)
+
     ws.update(
         range_name=f"A{row}:H{row}",
-        values=[values],
+        values=[log_row_values(lid, ltime, ltype, luser, lval, ldriver, lreceipt)],
         value_input_option="USER_ENTERED",
     )
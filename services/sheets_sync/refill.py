@@ -1,9 +1,9 @@
 import logging
 
-from gspread.utils import rowcol_to_a1
-
 import database.db_api as db
 
+from .batch import SheetWritePlan
+
 
 def parse_refill_value(value_raw: str | None) -> tuple[float, str]:
     liters = 0.0
@@ -31,17 +31,25 @@ def parse_refill_value(value_raw: str | None) -> tuple[float, str]:
     return liters, receipt
 
 
-def update_refill_aggregates_for_date(sheet, row: int, date_str: str):
-    """Idempotent update: агрегуємо заправки з БД, а не додаємо до поточного значення в Sheet."""
+# Колонки основної вкладки з агрегатами заправок за день
+REFILL_TOTAL_COL = 14  # N: привезено палива (сума)
+REFILL_RECEIPTS_COL = 16  # P: номери чеків (через кому)
+REFILL_DRIVERS_COL = 27  # AA: водії/хто привіз (через кому)
+
+
+def refill_aggregates_for_date(date_str: str) -> dict:
+    """Агрегати заправок за дату з БД: {колонка: значення} для N, P, AA."""
     refills = db.get_refills_for_date(date_str)
 
     total_liters = 0.0
     receipts = []
     drivers = []
 
-    for ts, user_name, value, driver_name in refills:
+    for ts, user_name, value, driver_name, receipt_number in refills:
         l, r = parse_refill_value(value)
         total_liters += float(l or 0.0)
+        # номер чека пишеться в logs.receipt_number; "л|чек" у value — старий формат
+        r = str(receipt_number or "").strip() or r
         if r and r not in receipts:
             receipts.append(r)
         if driver_name:
@@ -49,32 +57,25 @@ def update_refill_aggregates_for_date(sheet, row: int, date_str: str):
             if d and d not in drivers:
                 drivers.append(d)
 
-    # N(14): Привезено палива (сума)
-    try:
-        sheet.update(
-            range_name=rowcol_to_a1(row, 14),
-            values=[[str(round(total_liters, 2)).replace(".", ",")]],
-            value_input_option='USER_ENTERED'
-        )
-    except Exception as e:
-        logging.error(f"❌ Refill total update error date={date_str}: {e}")
+    return {
+        REFILL_TOTAL_COL: str(round(total_liters, 2)).replace(".", ","),
+        REFILL_RECEIPTS_COL: ", ".join(receipts),
+        REFILL_DRIVERS_COL: ", ".join(drivers),
+    }
 
-    # P(16): Номер чека (всі через кому)
-    try:
-        sheet.update(
-            range_name=rowcol_to_a1(row, 16),
-            values=[[", ".join(receipts)]],
-            value_input_option='USER_ENTERED'
-        )
-    except Exception as e:
-        logging.error(f"❌ Refill receipt update error date={date_str}: {e}")
 
-    # AA(27): водії/хто привіз (через кому)
+def plan_refill_aggregates_for_date(plan, row: int, date_str: str):
+    """Додає агрегати заправок за дату в план записів (SheetWritePlan)."""
+    for col, value in refill_aggregates_for_date(date_str).items():
+        # чеки/водії — текст (номер чека "0012" не повинен стати числом 12)
+        plan.set(row, col, value, raw=col != REFILL_TOTAL_COL)
+
+
+def update_refill_aggregates_for_date(sheet, row: int, date_str: str):
+    """Idempotent update: агрегуємо заправки з БД, а не додаємо до поточного значення в Sheet."""
+    plan = SheetWritePlan(sheet)
     try:
-        sheet.update(
-            range_name=rowcol_to_a1(row, 27),
-            values=[[", ".join(drivers)]],
-            value_input_option='USER_ENTERED'
-        )
+        plan_refill_aggregates_for_date(plan, row, date_str)
+        plan.flush()
     except Exception as e:
-        logging.error(f"❌ Refill drivers update error date={date_str}: {e}")
+        logging.error(f"❌ Refill aggregates update error date={date_str}: {e}")
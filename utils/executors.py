@@ -0,0 +1,265 @@
+"""Іменовані обмежені пули потоків для блокуючої роботи (замість asyncio.to_thread).
+
+Дефолтний executor asyncio спільний для всього: довгий експорт у Sheets міг
+зайняти всі його потоки, і швидкі читання дашборда стояли в черзі. Тому:
+- "sheets" — невеликий пул для gspread (SHEETS_EXECUTOR_WORKERS) з лімітом
+  черги (SHEETS_EXECUTOR_QUEUE) і таймаутом для читань на шляху користувача
+  (SHEETS_EXECUTOR_TIMEOUT_SEC);
+- "db" — пул database.db_async (DB_ASYNC_WORKERS).
+
+Пріоритети: PRIORITY_USER (кнопки/дашборд) < PRIORITY_BACKGROUND (цикл синку,
+дзеркало) < PRIORITY_ADMIN (повний експорт/імпорт). З черги першим береться
+найвищий пріоритет; фонові й адмін-задачі разом займають не більше workers-1
+потоків, тож один потік завжди лишається для користувачів, навіть коли синк
+чекає в throttle/backoff (тому пул "sheets" — мінімум 2 потоки, а в пул з одного
+потоку фонові й адмін-задачі не приймаються).
+
+    from utils.executors import PRIORITY_ADMIN, sheets_executor
+
+    rows = await sheets_executor().run(load_rows, timeout=20)
+    await sheets_executor().run(full_export, "append", priority=PRIORITY_ADMIN)
+
+stats() кожного пулу: глибина черги, зайняті потоки, час очікування в черзі.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import config
+
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 5
+PRIORITY_ADMIN = 10
+
+
+class ExecutorError(RuntimeError):
+    """Задачу не виконано через стан пулу (а не через помилку самої задачі)."""
+
+
+class ExecutorBusy(ExecutorError):
+    """Черга пулу заповнена."""
+
+
+class ExecutorTimeout(ExecutorError, TimeoutError):
+    """Задача не завершилась за timeout (з урахуванням очікування в черзі)."""
+
+
+class _Task:
+    __slots__ = ("priority", "seq", "fn", "args", "future", "enqueued")
+
+    def __init__(self, priority, seq, fn, args, future):
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class BoundedExecutor:
+    """Пул потоків з пріоритетною чергою, лімітом глибини і статистикою."""
+
+    def __init__(self, name: str, workers: int, max_queue: int = 0):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))  # 0 — без ліміту
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._threads = []
+        self._busy = 0
+        self._busy_low = 0  # зайнято задачами з priority >= PRIORITY_BACKGROUND
+        self._closed = False
+        self._stats = Counter()
+        self._wait_max_ms = 0
+
+    # --- потоки пулу ---
+
+    def _low_limit(self) -> int:
+        return self.workers - 1
+
+    def _ensure_threads(self):
+        # під self._cond
+        while len(self._threads) < min(self.workers, self._busy + len(self._heap)):
+            t = threading.Thread(
+                target=self._worker,
+                name=f"{self.name}_{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(t)
+            t.start()
+
+    def _pick(self):
+        """Найпріоритетніша задача, яку можна взяти зараз (під self._cond)."""
+        if not self._heap:
+            return None
+        if self._heap[0].priority < PRIORITY_BACKGROUND or self._busy_low < self._low_limit():
+            return heapq.heappop(self._heap)
+        # ліміт фонових/адмін-задач вичерпано: шукаємо задачу користувача
+        for i, task in enumerate(self._heap):
+            if task.priority < PRIORITY_BACKGROUND:
+                self._heap[i] = self._heap[-1]
+                self._heap.pop()
+                heapq.heapify(self._heap)
+                return task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._pick()
+                while task is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    task = self._pick()
+                low = task.priority >= PRIORITY_BACKGROUND
+                self._busy += 1
+                self._busy_low += int(low)
+                waited_ms = int((time.monotonic() - task.enqueued) * 1000)
+                self._stats["wait_ms_total"] += waited_ms
+                self._wait_max_ms = max(self._wait_max_ms, waited_ms)
+
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        task.future.set_result(task.fn(*task.args))
+                    except BaseException as e:
+                        task.future.set_exception(e)
+                else:
+                    with self._cond:
+                        self._stats["cancelled"] += 1
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._busy_low -= int(low)
+                    self._stats["done"] += 1
+                    self._cond.notify_all()
+
+    # --- API ---
+
+    def submit(self, fn, *args, priority: int = PRIORITY_USER) -> Future:
+        with self._cond:
+            if self._closed:
+                raise ExecutorError(f"Пул {self.name} зупинено")
+            if priority >= PRIORITY_BACKGROUND and self._low_limit() < 1:
+                raise ExecutorError(f"Пул {self.name} з одного потоку не приймає фонові/адмін-задачі")
+            if self.max_queue and len(self._heap) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise ExecutorBusy(f"Черга пулу {self.name} заповнена ({len(self._heap)})")
+            future = Future()
+            heapq.heappush(self._heap, _Task(priority, next(self._seq), fn, args, future))
+            self._stats["submitted"] += 1
+            self._stats["queue_max"] = max(self._stats["queue_max"], len(self._heap))
+            self._ensure_threads()
+            self._cond.notify()
+            return future
+
+    async def run(self, fn, *args, priority: int = PRIORITY_USER, timeout: float | None = None):
+        """Виконує fn(*args) у пулі; timeout — загальний (черга + виконання), None — без ліміту."""
+        future = self.submit(fn, *args, priority=priority)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            # ще в черзі — знімаємо; вже виконується — потік доробить, результат відкинемо
+            future.cancel()
+            with self._cond:
+                self._stats["timeouts"] += 1
+            raise ExecutorTimeout(f"Задача в пулі {self.name} не завершилась за {timeout} с") from None
+
+    def stats(self) -> dict:
+        with self._cond:
+            done = self._stats["done"]
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queued": len(self._heap),
+                "queue_max": self._stats["queue_max"],
+                "submitted": self._stats["submitted"],
+                "rejected": self._stats["rejected"],
+                "timeouts": self._stats["timeouts"],
+                "wait_avg_ms": int(self._stats["wait_ms_total"] / done) if done else 0,
+                "wait_max_ms": self._wait_max_ms,
+            }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True):
+        with self._cond:
+            self._closed = True
+            if cancel_futures:
+                for task in self._heap:
+                    task.future.cancel()
+                self._heap.clear()
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                t.join()
+
+
+# --- іменовані пули ---
+
+_LOCK = threading.Lock()
+_POOLS: dict[str, BoundedExecutor] = {}
+
+
+def _cfg_int(name: str, default: int) -> int:
+    try:
+        return int(getattr(config, name, default))
+    except Exception:
+        return default
+
+
+def get_executor(name: str, workers: int, max_queue: int = 0) -> BoundedExecutor:
+    """Пул за іменем (створюється при першому зверненні)."""
+    ex = _POOLS.get(name)
+    if ex is not None:
+        return ex
+    with _LOCK:
+        ex = _POOLS.get(name)
+        if ex is None:
+            ex = _POOLS[name] = BoundedExecutor(name, workers, max_queue)
+        return ex
+
+
+def sheets_executor() -> BoundedExecutor:
+    return get_executor(
+        "sheets",
+        max(2, _cfg_int("SHEETS_EXECUTOR_WORKERS", 3)),
+        max(0, _cfg_int("SHEETS_EXECUTOR_QUEUE", 20)),
+    )
+
+
+def sheets_read_timeout() -> float | None:
+    """Таймаут читань Sheets на шляху користувача (0 — без таймауту)."""
+    try:
+        t = float(getattr(config, "SHEETS_EXECUTOR_TIMEOUT_SEC", 30))
+    except Exception:
+        t = 30.0
+    return t if t > 0 else None
+
+
+def executors_stats() -> dict:
+    with _LOCK:
+        pools = dict(_POOLS)
+    return {name: ex.stats() for name, ex in sorted(pools.items())}
+
+
+def shutdown_executors(wait: bool = False, name: str | None = None):
+    """Зупиняє всі пули (або один за іменем) — при завершенні процесу."""
+    with _LOCK:
+        names = [n for n in _POOLS if name is None or n == name]
+        pools = [_POOLS.pop(n) for n in names]
+    for ex in pools:
+        try:
+            ex.shutdown(wait=wait)
+        except Exception as e:
+            logging.warning(f"⚠️ Не вдалося зупинити пул {ex.name}: {e}")
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime, date, timedelta
+import functools
 import re
+import threading
+import time
+
+import config
 
 
 def sheet_name_to_month(sheet_name: str) -> int | None:
@@ -87,18 +92,159 @@ def try_parse_date_from_cell(value, sheet_month: int | None, sheet_year: int) ->
     return None
 
 
+@functools.lru_cache(maxsize=8192)
+def _parse_cell_cached(s: str, sheet_month: int | None, sheet_year: int) -> date | None:
+    return try_parse_date_from_cell(s, sheet_month=sheet_month, sheet_year=sheet_year)
+
+
+# Після промаху індекс перечитується не частіше, ніж раз на N секунд
+# (щоб щойно доданий рядок дати знаходився, але без запиту на кожен промах).
+_MISS_REFRESH_SEC = 30.0
+
+
+def _index_ttl() -> float:
+    try:
+        return float(getattr(config, "SHEETS_DATE_INDEX_TTL_SEC", 300) or 0)
+    except Exception:
+        return 300.0
+
+
+class DateIndex:
+    """Індекс дата -> рядок для колонки A одного worksheet.
+
+    Одне читання колонки (col_values(1)); клітинки парсяться memoized-парсером.
+    Спершу бінарний пошук (для відсортованої колонки парсяться лише проби);
+    якщо він не знайшов дату — будується повна мапа {date: row}.
+    """
+
+    def __init__(self, values: list):
+        self.values = ["" if v is None else str(v) for v in values]
+        self.built_ts = time.monotonic()
+        # (sheet_month, sheet_year) -> {date: row}
+        self._maps = {}
+
+    def age(self) -> float:
+        return time.monotonic() - self.built_ts
+
+    def _parse(self, pos: int, sheet_month, sheet_year) -> date | None:
+        return _parse_cell_cached(self.values[pos].strip(), sheet_month, sheet_year)
+
+    def _bisect(self, target: date, sheet_month, sheet_year) -> int | None:
+        """Бінарний пошук (позиція 0-based) з пропуском порожніх/не-дат. Лише для відсортованої колонки."""
+        lo, hi = 0, len(self.values)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            j = mid
+            d = None
+            while j < hi:
+                d = self._parse(j, sheet_month, sheet_year)
+                if d is not None:
+                    break
+                j += 1
+            if d is None:
+                hi = mid
+                continue
+            if d == target:
+                # перший рядок з цією датою (як у лінійному пошуку)
+                k = j - 1
+                while k >= 0:
+                    dk = self._parse(k, sheet_month, sheet_year)
+                    if dk is not None and dk != target:
+                        break
+                    if dk == target:
+                        j = k
+                    k -= 1
+                return j
+            if d < target:
+                lo = j + 1
+            else:
+                hi = mid
+        return None
+
+    def _build(self, sheet_month, sheet_year) -> dict:
+        rows = {}
+        for pos in range(len(self.values)):
+            d = self._parse(pos, sheet_month, sheet_year)
+            if d is not None:
+                rows.setdefault(d, pos + 1)
+        return rows
+
+    def row_for(self, target: date, sheet_name: str) -> int | None:
+        sheet_month = sheet_name_to_month(sheet_name)
+        key = (sheet_month, target.year)
+
+        rows = self._maps.get(key)
+        if rows is None:
+            pos = self._bisect(target, sheet_month, target.year)
+            if pos is not None:
+                return pos + 1
+            # не знайшли: або дати немає, або колонка не відсортована — будуємо мапу
+            rows = self._maps[key] = self._build(sheet_month, target.year)
+        return rows.get(target)
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEXES: dict = {}
+
+
+def _ws_key(ws):
+    ws_id = getattr(ws, "id", None)
+    if ws_id is None:
+        return ("obj", id(ws))
+    return (getattr(ws, "spreadsheet_id", None), ws_id)
+
+
+def get_date_index(ws, *, refresh: bool = False) -> DateIndex:
+    """Індекс колонки A для ws (перечитує колонку, якщо минув TTL або refresh=True)."""
+    key = _ws_key(ws)
+    ttl = _index_ttl()
+    with _INDEX_LOCK:
+        idx = _INDEXES.get(key)
+    if idx is not None and not refresh and ttl > 0 and idx.age() < ttl:
+        return idx
+
+    idx = DateIndex(ws.col_values(1))
+    with _INDEX_LOCK:
+        _INDEXES[key] = idx
+    return idx
+
+
+def seed_date_index(ws, values: list) -> DateIndex:
+    """Кладе в кеш індекс, побудований з уже прочитаної колонки A (без запиту до API)."""
+    idx = DateIndex(values)
+    with _INDEX_LOCK:
+        _INDEXES[_ws_key(ws)] = idx
+    return idx
+
+
+def peek_row_by_date(ws, target_date: date, sheet_name: str) -> int | None:
+    """Рядок дати з уже закешованого (не простроченого) індексу; без запитів до API."""
+    ttl = _index_ttl()
+    with _INDEX_LOCK:
+        idx = _INDEXES.get(_ws_key(ws))
+    if idx is None or ttl <= 0 or idx.age() >= ttl:
+        return None
+    return idx.row_for(target_date, sheet_name)
+
+
+def invalidate_date_index(ws=None):
+    """Скидає індекс ws (після запису в колонку A) або всі індекси (ws=None)."""
+    with _INDEX_LOCK:
+        if ws is None:
+            _INDEXES.clear()
+        else:
+            _INDEXES.pop(_ws_key(ws), None)
+
+
 def find_row_by_date_in_column_a(ws, target_date: date, sheet_name: str) -> int | None:
     """Шукає рядок за датою в колонці A.
 
     ws: gspread worksheet (або сумісний об'єкт з col_values(1)).
+    Колонка читається через закешований DateIndex (TTL config.SHEETS_DATE_INDEX_TTL_SEC).
     """
-    col_a = ws.col_values(1)
-    sheet_month = sheet_name_to_month(sheet_name)
-    sheet_year = target_date.year
-
-    for idx, cell_value in enumerate(col_a, start=1):
-        d = try_parse_date_from_cell(cell_value, sheet_month=sheet_month, sheet_year=sheet_year)
-        if d == target_date:
-            return idx
-
-    return None
+    idx = get_date_index(ws)
+    row = idx.row_for(target_date, sheet_name)
+    if row is None and idx.age() >= _MISS_REFRESH_SEC:
+        # рядок дати могли додати вручну після побудови індексу
+        row = get_date_index(ws, refresh=True).row_for(target_date, sheet_name)
+    return row